@@ -0,0 +1,188 @@
+"""Batched HTTP API for model evaluation, mounted on the dashboard's Flask server.
+
+    POST /api/v1/evaluate?years=10&discount_rate=0.08
+
+The body is a batch of scenarios, either JSON ({"scenarios": [{...}, ...]}
+or column-wise {"columns": {"crew_count": [...], ...}}) or an Apache Arrow
+IPC stream (Content-Type: application/vnd.apache.arrow.stream). Fields are
+the scenario_engine inputs and constants; missing, null or (for sidebar
+inputs) 0 ones take the dashboard defaults, values the dashboard cannot
+produce are rejected with 400, and any other field (e.g. an id) is echoed
+back. The results are the
+same columns as batch_cli.py writes, returned column-wise as JSON or, when the
+client sends Accept: application/vnd.apache.arrow.stream, as an Arrow IPC
+stream. Bodies may be gzip-encoded in both directions. No figures or tables
+are built.
+
+    GET /api/v1/fields  lists the accepted fields with their defaults.
+"""
+import gzip
+import io
+import json
+import zlib
+
+import numpy as np
+from flask import jsonify, request
+
+import batch_cli
+import scenario_engine
+
+API_PREFIX = '/api/v1'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+MAX_SCENARIOS = 100_000
+MAX_YEARS = 100
+MAX_BODY_BYTES = 64 << 20  # request body after decompression; 100,000 JSON scenarios with every field fit
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 1  # model output is full-precision floats: higher levels cost 3-4x the CPU for ~6% smaller bodies
+
+
+class BadRequest(ValueError):
+    """Invalid request; the message is returned to the client."""
+    status = 400
+
+
+class PayloadTooLarge(BadRequest):
+    status = 413
+
+
+class NotAcceptable(BadRequest):
+    status = 406
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return pyarrow
+
+
+def _read_capped(stream):
+    body = stream.read(MAX_BODY_BYTES + 1)
+    if len(body) > MAX_BODY_BYTES:
+        raise PayloadTooLarge(f"request body exceeds {MAX_BODY_BYTES} bytes")
+    return body
+
+
+def _request_body():
+    """The request body, gunzipped if needed; both sizes are capped so a small gzip bomb cannot exhaust memory."""
+    if (request.content_length or 0) > MAX_BODY_BYTES:
+        raise PayloadTooLarge(f"request body exceeds {MAX_BODY_BYTES} bytes")
+    body = _read_capped(request.stream)
+    if request.content_encoding == 'gzip':
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(body)) as f:
+                return _read_capped(f)
+        except (OSError, EOFError, zlib.error) as exc:
+            raise BadRequest(f"invalid gzip body: {exc}") from None
+    return body
+
+
+def _read_columns(body, content_type):
+    """{field: list or array} from a JSON or Arrow IPC request body."""
+    if content_type == ARROW_STREAM:
+        pa = _arrow()
+        if pa is None:
+            raise BadRequest("Arrow input needs pyarrow on the server")
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+        except pa.ArrowException as exc:
+            raise BadRequest(f"invalid Arrow stream: {exc}") from None
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    try:
+        payload = json.loads(body)
+    except ValueError as exc:
+        raise BadRequest(f"invalid JSON: {exc}") from None
+    if not isinstance(payload, dict):
+        raise BadRequest("body must be a JSON object")
+    if 'columns' in payload:
+        columns = payload['columns']
+        if not isinstance(columns, dict) or not all(isinstance(v, list) for v in columns.values()):
+            raise BadRequest("'columns' must map field names to lists")
+        if len({len(v) for v in columns.values()}) > 1:
+            raise BadRequest("all columns must have the same length")
+        return columns
+    scenarios = payload.get('scenarios')
+    if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+        raise BadRequest("body needs 'scenarios' (a list of objects) or 'columns'")
+    names = list(dict.fromkeys(k for s in scenarios for k in s)) or ['crew_count']  # all defaults
+    return {name: [s.get(name) for s in scenarios] for name in names}
+
+
+def _query_number(name, cast, default, lo, hi):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        value = cast(value)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a number") from None
+    if not lo <= value <= hi:
+        raise BadRequest(f"'{name}' must be between {lo} and {hi}")
+    return value
+
+
+def evaluate(columns, years=10, discount_rate=None):
+    """Model outputs for a batch of raw scenario columns (see batch_cli.evaluate_chunk)."""
+    n = len(next(iter(columns.values()), []))
+    if n == 0:
+        raise BadRequest("no scenarios given")
+    if n > MAX_SCENARIOS:
+        raise BadRequest(f"at most {MAX_SCENARIOS} scenarios per request")
+    try:
+        return batch_cli.evaluate_chunk(columns, years, discount_rate)
+    except (TypeError, ValueError) as exc:
+        raise BadRequest(str(exc)) from None
+
+
+def _json_body(out):
+    # NaN (e.g. an IRR that does not exist) and infinities become null: JSON has no literal for either
+    columns = {k: (np.where(np.isfinite(v), v, None) if v.dtype.kind == 'f' else v).tolist() if isinstance(v, np.ndarray) else v
+               for k, v in out.items()}
+    return json.dumps({'count': len(out['total_capex']), 'columns': columns}, separators=(',', ':')).encode()
+
+
+def _arrow_body(pa, out):
+    """Arrow IPC stream of the output columns; raises NotAcceptable if a passthrough column has no Arrow type."""
+    try:
+        table = pa.table({k: pa.array(v) for k, v in out.items()})
+    except (pa.ArrowException, TypeError) as exc:
+        raise NotAcceptable(f"results cannot be sent as Arrow ({exc}); request JSON instead") from None
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _respond(server, body, mimetype):
+    response = server.response_class(body, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    if len(body) >= GZIP_MIN_BYTES and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def register_api(server, prefix=API_PREFIX):
+    """Mount the evaluation endpoints on a Flask server."""
+
+    @server.route(f'{prefix}/evaluate', methods=['POST'], endpoint='api_evaluate')
+    def api_evaluate():
+        try:
+            years = _query_number('years', int, 10, 1, MAX_YEARS)
+            discount_rate = _query_number('discount_rate', float, None, -0.99, 10.0)
+            out = evaluate(_read_columns(_request_body(), request.mimetype), years, discount_rate)
+            if request.accept_mimetypes.best_match(['application/json', ARROW_STREAM]) == ARROW_STREAM:
+                pa = _arrow()
+                if pa is None:
+                    raise NotAcceptable("Arrow output needs pyarrow on the server")
+                return _respond(server, _arrow_body(pa, out), ARROW_STREAM)
+        except BadRequest as exc:
+            return jsonify(error=str(exc)), exc.status
+        return _respond(server, _json_body(out), 'application/json')
+
+    @server.route(f'{prefix}/fields', endpoint='api_fields')
+    def api_fields():
+        return jsonify(inputs=scenario_engine.DEFAULT_INPUTS, params=scenario_engine.DEFAULT_PARAMS,
+                       max_scenarios=MAX_SCENARIOS, max_years=MAX_YEARS)
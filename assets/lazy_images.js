@@ -0,0 +1,32 @@
+// Lazy-load <img data-src="..." data-srcset="..."> elements once they come near the viewport.
+(function () {
+    function load(img) {
+        if (img.dataset.srcset) {
+            img.srcset = img.dataset.srcset;
+        }
+        img.src = img.dataset.src;
+    }
+
+    var observer = 'IntersectionObserver' in window ? new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                load(entry.target);
+            }
+        });
+    }, {rootMargin: '200px'}) : null;
+
+    // Dash renders the layout after this script runs, so watch for new images.
+    function scan() {
+        document.querySelectorAll('img[data-src]:not([data-lazy-bound])').forEach(function (img) {
+            img.setAttribute('data-lazy-bound', '');
+            if (observer) {
+                observer.observe(img);
+            } else {
+                load(img);
+            }
+        });
+    }
+
+    new MutationObserver(scan).observe(document.documentElement, {childList: true, subtree: true});
+})();
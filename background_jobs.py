@@ -0,0 +1,116 @@
+"""Background callbacks for the expensive dashboard analyses.
+
+Jobs run in their own process through Dash's DiskcacheManager (diskcache +
+multiprocess, no broker), so server threads stay free for the cheap callbacks
+while a job runs. On top of Dash's manager:
+
+- identical requests that arrive while a job is running (same callback and
+  inputs, e.g. several tabs or users on the default scenario) attach to that
+  job instead of starting another one, and a finished result is reused
+  without starting a process at all;
+- stale jobs are cancelled: when a client re-triggers the callback mid-run
+  (e.g. a sidebar input changes), Dash terminates that client's previous job;
+  a job shared by several clients is only terminated once the last of them
+  has moved on.
+
+Callbacks registered here deliberately have no `cancel` inputs: the renderer
+sends a cancel for every other callback those inputs trigger, which would
+count one client several times.
+
+Without diskcache, multiprocess and psutil (pip install "dash[diskcache]"),
+make_manager() returns None and register_callback() falls back to an
+ordinary synchronous callback.
+"""
+import os
+from pathlib import Path
+
+from dash import DiskcacheManager
+
+CACHE_DIR = Path(__file__).parent / '.cache' / 'jobs'
+RESULT_TTL = 600  # seconds a finished result stays reusable
+JOB_TTL = 3600    # upper bound on how long job bookkeeping is kept
+POLL_INTERVAL = 500  # ms between the browser's progress/result polls
+NO_PROCESS = 0  # job id handed out when a finished result is reused
+
+
+class CoalescingDiskcacheManager(DiskcacheManager):
+    """DiskcacheManager that runs at most one job per cache key and reuses finished results."""
+
+    def call_job_fn(self, key, job_fn, args, context):
+        import diskcache
+
+        # The lock keeps two clients from starting the same job; the transactions make checking for a result or
+        # a running job and registering as one of its waiters atomic with respect to terminate_job()
+        with diskcache.Lock(self.handle, f'{key}-lock', expire=30):
+            with self.handle.transact():
+                if self.result_ready(key):
+                    return NO_PROCESS
+                job = self.handle.get(f'{key}-job')
+                if job is not None and self.handle.get(f'job-{job}-waiters') and self.job_running(job):
+                    self.handle.incr(f'job-{job}-waiters')
+                    return job
+            # Started outside the transaction: the job process writes to the same cache
+            job = super().call_job_fn(key, job_fn, args, context)
+            with self.handle.transact():
+                self.handle.set(f'{key}-job', job, expire=JOB_TTL)
+                self.handle.set(f'job-{job}-waiters', 1, expire=JOB_TTL)
+        return job
+
+    def terminate_job(self, job):
+        if job is None or int(job) == NO_PROCESS:
+            return
+        with self.handle.transact():
+            if self.handle.decr(f'job-{int(job)}-waiters', default=1) > 0:
+                return  # another client is still waiting for this job
+            self.handle.delete(f'job-{int(job)}-waiters')  # no client can attach to it any more
+        super().terminate_job(job)
+
+    def job_running(self, job):
+        return int(job) != NO_PROCESS and super().job_running(job)
+
+    def get_result(self, key, job):
+        result = super().get_result(key, job)
+        if isinstance(result, dict) and 'background_callback_error' in result:
+            self.clear_cache_entry(key)  # let the next request retry instead of replaying the error
+        return result
+
+    def get_progress(self, key):
+        # Keep the value so every client attached to the job sees it (the job overwrites it)
+        return self.handle.get(self._make_progress_key(key))
+
+
+def make_manager(cache_dir=CACHE_DIR, cache_by=(), expire=RESULT_TTL):
+    """A coalescing manager backed by cache_dir, or None if its dependencies are missing.
+
+    cache_by are zero-argument functions whose values are part of every cache
+    key (e.g. a model version); results are kept for `expire` seconds.
+    """
+    try:
+        import diskcache
+        import multiprocess  # noqa: F401 - needed by DiskcacheManager
+        import psutil  # noqa: F401
+    except ImportError:
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    # A cache_by list (even an empty one) makes Dash keep results after the first read, which attached clients rely on
+    return CoalescingDiskcacheManager(diskcache.Cache(str(cache_dir)), cache_by=list(cache_by), expire=expire)
+
+
+def _no_progress(*_):
+    pass
+
+
+def register_callback(app, manager, func, *dependencies, progress=None, progress_default=None, running=None, **kwargs):
+    """Register func as a background callback, or as a plain one when manager is None.
+
+    func takes a set_progress function as its first argument, like any Dash
+    background callback with `progress`; in the synchronous fallback it is a
+    no-op and `running` is still applied.
+    """
+    if manager is None:
+        def run(*args):
+            return func(_no_progress, *args)
+        run.__name__ = func.__name__
+        return app.callback(*dependencies, running=running, **kwargs)(run)
+    return app.callback(*dependencies, background=True, manager=manager, interval=POLL_INTERVAL, progress=progress,
+                        progress_default=progress_default, running=running, **kwargs)(func)
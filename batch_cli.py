@@ -0,0 +1,258 @@
+"""Headless batch runner for the Space Game Arena model.
+
+Streams scenarios from CSV, JSONL or Parquet in chunks, evaluates each chunk
+with the vectorized scenario engine and appends the results to a CSV or
+Parquet file, so memory stays bounded by the chunk size. Only NumPy and,
+when installed, pyarrow (required for Parquet, used for fast CSV I/O) are
+imported; Dash and Plotly never are.
+
+Input columns are scenario_engine fields (crew_count, include_spectators,
+ticket_price, revenue_growth, ...); missing columns, empty cells and sidebar
+inputs left at 0 fall back to the dashboard defaults, and values the dashboard
+cannot produce (negative counts or prices, non-finite numbers) are rejected
+(scenario_engine.normalize_fields). Any other column (e.g. a scenario id) is
+copied to the output unchanged.
+
+    python batch_cli.py scenarios.csv -o results.parquet --years 10 --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import finance_metrics
+import scenario_engine
+
+MODEL_FIELDS = {**scenario_engine.DEFAULT_INPUTS, **scenario_engine.DEFAULT_PARAMS}
+TRUE_STRINGS = {'1', 'true', 'yes', 'y', 't', 'on'}
+
+
+def _arrow():
+    """pyarrow with its csv/parquet modules loaded, or None if it is not installed (imported on first use)."""
+    try:
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return pyarrow
+
+
+def _format(path, override=None):
+    fmt = override or Path(path).suffix.lstrip('.').lower()
+    if fmt in ('ndjson', 'json'):
+        fmt = 'jsonl'
+    if fmt not in ('csv', 'jsonl', 'parquet'):
+        raise SystemExit(f"cannot tell the format of '{path}'; pass --input-format/--output-format")
+    return fmt
+
+
+# Readers: each yields {column: list or array} chunks of roughly chunk_size rows
+
+def _read_csv(path, chunk_size):
+    pa = _arrow()
+    if pa is not None:
+        # Blocks are sized in bytes; ~64 bytes per scenario row
+        reader = pa.csv.open_csv(path, read_options=pa.csv.ReadOptions(block_size=max(chunk_size * 64, 1 << 20)))
+        for batch in reader:
+            yield _batch_to_columns(batch)
+        return
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield dict(zip(header, map(list, zip(*rows))))
+                rows = []
+        if rows:
+            yield dict(zip(header, map(list, zip(*rows))))
+
+
+def _read_jsonl(path, chunk_size):
+    with open(path) as f:
+        records = []
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+            if len(records) == chunk_size:
+                yield _records_to_columns(records)
+                records = []
+        if records:
+            yield _records_to_columns(records)
+
+
+def _records_to_columns(records):
+    names = list(dict.fromkeys(k for r in records for k in r))
+    return {name: [r.get(name) for r in records] for name in names}
+
+
+def _read_parquet(path, chunk_size):
+    pa = _arrow()
+    if pa is None:
+        raise SystemExit("Parquet input needs pyarrow (pip install pyarrow)")
+    for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield _batch_to_columns(batch)
+
+
+def _batch_to_columns(batch):
+    return {name: column.to_numpy(zero_copy_only=False) for name, column in zip(batch.schema.names, batch.columns)}
+
+
+READERS = {'csv': _read_csv, 'jsonl': _read_jsonl, 'parquet': _read_parquet}
+
+
+def _model_column(name, values):
+    """Parse one input column into a float/bool array, filling blanks with the default."""
+    default = MODEL_FIELDS[name]
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        # Null cells arrive as NaN from pyarrow; NaN is truthy, so blank flags are filled before the cast
+        values = values.astype(float)
+        if name in scenario_engine.FLAG_INPUTS:
+            return np.where(np.isnan(values), bool(default), values != 0)
+        return np.where(np.isnan(values), float(default), values)
+    blank = lambda v: v is None or v == '' or (isinstance(v, float) and np.isnan(v))
+    if name in scenario_engine.FLAG_INPUTS:
+        return np.array([default if blank(v) else (str(v).strip().lower() in TRUE_STRINGS if isinstance(v, str) else bool(v))
+                         for v in values], dtype=bool)
+    return np.array([default if blank(v) else float(v) for v in values], dtype=float)
+
+
+def evaluate_chunk(columns, years=10, discount_rate=None):
+    """Evaluate one chunk of raw columns; returns output columns (passthrough first)."""
+    passthrough = {k: v for k, v in columns.items() if k not in MODEL_FIELDS}
+    inputs = scenario_engine.normalize_fields(**{k: _model_column(k, v) for k, v in columns.items() if k in MODEL_FIELDS})
+    if not inputs:
+        n = len(next(iter(columns.values())))
+        inputs = {'crew_count': np.full(n, float(MODEL_FIELDS['crew_count']))}
+    result = scenario_engine.evaluate(years=years, **inputs)
+
+    out = dict(passthrough)
+    for key in ('total_capex', 'year1_opex', 'annual_opex', 'year1_revenue', 'annual_amortization'):
+        out[key] = result[key]
+    for key in ('revenues', 'net_no_amort'):
+        for year in range(years):
+            out[f'{key}_y{year + 1}'] = result[key][:, year]
+    out['cumulative_net_no_amort'] = result['net_no_amort'].sum(axis=1)
+    if discount_rate is not None:
+        out.update(finance_metrics.summarize(finance_metrics.cash_flows(result), discount_rate))
+    return out
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._path = path
+        self._writer = self._file = self._header = self._schema = None
+
+    def write(self, columns):
+        pa = _arrow()
+        if pa is not None:
+            table = _to_table(pa, columns, self._schema)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pa.csv.CSVWriter(self._path, table.schema)
+            self._writer.write_table(table)
+            return
+        if self._writer is None:
+            self._file = open(self._path, 'w', newline='')
+            self._writer = csv.writer(self._file)
+            self._header = list(columns)
+            self._writer.writerow(self._header)
+        data = [c.tolist() if isinstance(c, np.ndarray) else c for c in (columns[k] for k in self._header)]
+        self._writer.writerows(zip(*data))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        self._pa = _arrow()
+        if self._pa is None:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)")
+        self._path, self._writer, self._schema = path, None, None
+
+    def write(self, columns):
+        table = _to_table(self._pa, columns, self._schema)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._pa.parquet.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _to_table(pa, columns, schema=None):
+    """Arrow table for one chunk, cast to the schema of the first chunk so all chunks match."""
+    table = pa.table({k: pa.array(v) for k, v in columns.items()})
+    return table.cast(schema) if schema is not None else table
+
+
+WRITERS = {'csv': _CsvWriter, 'parquet': _ParquetWriter}
+
+
+def run(input_path, output_path, input_format=None, output_format=None, chunk_size=100_000, years=10,
+        discount_rate=None, workers=1):
+    """Stream input_path through the model into output_path; returns the number of rows written."""
+    chunks = READERS[_format(input_path, input_format)](input_path, chunk_size)
+    out_format = _format(output_path, output_format)
+    if out_format not in WRITERS:
+        raise SystemExit("output must be CSV or Parquet")
+    writer = WRITERS[out_format](output_path)
+    rows = 0
+
+    def emit(out):
+        nonlocal rows
+        writer.write(out)
+        rows += len(out['total_capex'])
+
+    try:
+        if workers <= 1:
+            for chunk in chunks:
+                emit(evaluate_chunk(chunk, years, discount_rate))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # At most two chunks per worker in flight keeps memory bounded; results are written in input order
+                pending = []
+                for chunk in chunks:
+                    pending.append(pool.submit(evaluate_chunk, chunk, years, discount_rate))
+                    if len(pending) >= 2 * workers:
+                        emit(pending.pop(0).result())
+                for future in pending:
+                    emit(future.result())
+    finally:
+        writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate Space Game Arena scenarios in bulk without the dashboard.")
+    parser.add_argument('input', help="scenario file (.csv, .jsonl or .parquet)")
+    parser.add_argument('-o', '--output', required=True, help="result file (.csv or .parquet)")
+    parser.add_argument('--input-format', choices=sorted(READERS))
+    parser.add_argument('--output-format', choices=sorted(WRITERS))
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="rows per chunk (default: 100000)")
+    parser.add_argument('--years', type=int, default=10, help="projection horizon in years (default: 10)")
+    parser.add_argument('--discount-rate', type=float, help="also compute NPV/IRR/payback at this annual rate, e.g. 0.08")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes (0: one per CPU; default: 1)")
+    args = parser.parse_args(argv)
+    try:
+        rows = run(args.input, args.output, args.input_format, args.output_format, args.chunk_size, args.years,
+                   args.discount_rate, args.workers or os.cpu_count() or 1)
+    except ValueError as exc:
+        raise SystemExit(f"invalid scenario: {exc}") from None
+    print(f"{rows} scenarios -> {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
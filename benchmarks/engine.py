@@ -0,0 +1,81 @@
+"""Micro-benchmarks of the model math, without Dash or Plotly.
+
+Times scenario_engine.evaluate and finance_metrics.summarize (NPV, IRR,
+payback, breakeven) on batches of 1, 1,000 and 1,000,000 random sidebar
+configurations, plus the batched analyses behind the dashboard: monthly
+projections, Monte Carlo, the sensitivity sweeps and the optimizer, all
+in-process (one worker) so results do not depend on the core count.
+
+    python benchmarks/engine.py [--sizes 1 1000 1000000] [--json engine.json]
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from timing import median_ms
+
+import finance_metrics
+import monte_carlo
+import optimizer
+import scenario_engine
+import sensitivity
+import timeseries
+
+SIZES = (1, 1_000, 1_000_000)
+LARGE = 100_000  # batches from this size on are timed once per sample, with fewer samples
+TIMESERIES_MAX = 1_000  # 600 periods per scenario: larger batches only measure memory bandwidth
+MONTE_CARLO_DRAWS = 100_000
+
+
+def random_inputs(n, seed=0):
+    """n random sidebar configurations within the dcc.Input bounds, as evaluate() columns."""
+    rng = np.random.default_rng(seed)
+    bounds = sensitivity.INPUT_BOUNDS
+    columns = {name: rng.integers(low, high + 1, n) for name, (low, high) in bounds.items() if name != 'ticket_price'}
+    columns['ticket_price'] = rng.uniform(*bounds['ticket_price'], n)
+    columns.update({flag: rng.random(n) < 0.5 for flag in scenario_engine.FLAG_INPUTS})
+    columns['manual_amort_M'] = rng.uniform(100.0, 1000.0, n)
+    return columns
+
+
+def measure(sizes=SIZES, repeat=5):
+    """Median milliseconds per call, keyed '<benchmark>_ms'."""
+    results = {}
+    for n in sizes:
+        samples = repeat if n < LARGE else max(repeat // 2, 1)
+        columns = random_inputs(n)
+        results[f'evaluate_n{n}_ms'] = median_ms(lambda: scenario_engine.evaluate(**columns), samples)
+        flows = finance_metrics.cash_flows(scenario_engine.evaluate(**columns))
+        results[f'summarize_n{n}_ms'] = median_ms(lambda: finance_metrics.summarize(flows, 0.08), samples)
+        if n <= TIMESERIES_MAX:
+            results[f'timeseries_n{n}_ms'] = median_ms(lambda: timeseries.project(50, 12, **columns), samples)
+        del columns, flows
+
+    inputs = scenario_engine.normalize_inputs()
+    # The sweeps are memoized; clearing the caches before each call times the computation through the public API
+    results['tornado_ms'] = median_ms(lambda: (sensitivity.cache_clear(), sensitivity.tornado(inputs, 10.0)), repeat)
+    results['heatmap_200x200_ms'] = median_ms(
+        lambda: (sensitivity.cache_clear(), sensitivity.heatmap(inputs, 'crew_count', 'ticket_price', 10.0, steps=200)), repeat)
+    results[f'monte_carlo_{MONTE_CARLO_DRAWS // 1000}k_ms'] = median_ms(
+        lambda: monte_carlo.simulate(inputs, draws=MONTE_CARLO_DRAWS, workers=1, seed=0), repeat)
+    results['optimizer_npv_ms'] = median_ms(lambda: optimizer.optimize('npv', workers=1), repeat)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the model math on batches of scenarios.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="batch sizes (default: 1 1000 1000000)")
+    parser.add_argument('--repeat', type=int, default=5, help="samples per benchmark (default: 5)")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = measure(args.sizes, args.repeat)
+    for name, value in results.items():
+        print(f"{name:28}{value:>12.3f}ms")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
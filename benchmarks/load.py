@@ -0,0 +1,302 @@
+"""Load test of the Dash callback endpoint.
+
+Starts the dashboard in a separate process (werkzeug, threaded, HTTP/1.1
+keep-alive) and replays sidebar sessions against /_dash-update-component
+from concurrent clients. Each client is one browser tab: it edits a random
+sidebar input (mostly counts and the ticket price, sometimes a checkbox),
+then sends every callback that listens to it the way the Dash renderer would,
+with the current values of all inputs and state, and follows chained updates
+(e.g. mc-request -> risk bands). Requests of one edit are sent one after
+another on the client's connection. Callbacks run in the request thread
+(create_app(background=False)), so the sensitivity and Monte Carlo work is
+part of the measured latency.
+
+Reports request latency percentiles, throughput and per-edit latency (all
+callbacks of one edit answered) for each concurrency level.
+
+The background-callback path is timed separately (measure_jobs): the Monte
+Carlo bands are requested from a server with create_app(background=True) and
+polled until the job's result arrives, next to the same requests answered
+inline. Every job runs in a fresh process and starts its own simulation
+worker pool, so the difference is the per-job overhead.
+
+    python benchmarks/load.py --clients 1 4 16 --edits 20 [--job-runs 5] [--json load.json]
+"""
+import argparse
+import http.client
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from timing import ROOT, percentile
+
+import scenario_engine
+
+CLIENTS = (1, 4, 16)
+EDITS = 20  # per client and concurrency level
+WARMUP_EDITS = 10
+MAX_CHAIN = 5  # rounds of chained callbacks followed per edit
+JOB_RUNS = 5  # Monte Carlo requests per mode in measure_jobs, after one warm-up
+JOB_DRAWS = 100_000
+JOB_POLL = 0.02  # seconds between result polls (the browser waits background_jobs.POLL_INTERVAL)
+
+SERVER = """
+import logging, sys
+sys.path.insert(0, sys.argv[1])
+from werkzeug.serving import WSGIRequestHandler, make_server
+import financial_model
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+app = financial_model.create_app(layout_cache_dir=None, background=sys.argv[2] == '1')
+server = make_server('127.0.0.1', 0, app.server, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+def _clip(value, low, high):
+    return min(max(value, low), high)
+
+
+def _toggle(rng, value):
+    return [] if value else [1]
+
+
+# Sidebar edits: component id -> (relative frequency, new value from (rng, current value))
+SIDEBAR_EDITS = {
+    'crew-count': (3, lambda rng, v: _clip((v or 15) + rng.choice((-3, -2, -1, 1, 2, 3)), 1, 50)),
+    'contestant-count': (3, lambda rng, v: _clip((v or 12) + rng.choice((-3, -2, -1, 1, 2, 3)), 1, 50)),
+    'include-spectators': (1, _toggle),
+    'spectator-count': (2, lambda rng, v: _clip((v or 0) + rng.choice((-20, -10, 10, 20)), 0, 200)),
+    'ticket-price': (3, lambda rng, v: _clip((v or 60.0) + rng.choice((-10.0, -5.0, -0.5, 0.5, 5.0, 10.0)), 0.0, 200.0)),
+    'scale-capex': (1, _toggle),
+    'use-amort': (1, _toggle),
+    'amort-years': (1, lambda rng, v: _clip((v or 10) + rng.choice((-5, -1, 1, 5)), 1, 50)),
+    'discount-rate': (1, lambda rng, v: _clip((v or 8.0) + rng.choice((-0.5, 0.5)), 0.0, 20.0)),
+    'mc-enable': (0.5, _toggle),
+}
+
+
+def start_server(background=False):
+    """Run the dashboard in a child process; returns (process, port)."""
+    process = subprocess.Popen([sys.executable, '-c', SERVER, str(ROOT), '1' if background else '0'], stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        process.wait()
+        raise RuntimeError(f"dashboard server exited with code {process.returncode}")
+    return process, int(line)
+
+
+def layout_props(node, props=None):
+    """{(component id, prop): value} for every component with an id in a serialized layout."""
+    props = {} if props is None else props
+    if isinstance(node, list):
+        for child in node:
+            layout_props(child, props)
+    elif isinstance(node, dict) and 'props' in node:
+        if isinstance(node['props'].get('id'), str):
+            props.update({(node['props']['id'], name): value for name, value in node['props'].items()})
+        for value in node['props'].values():
+            layout_props(value, props)
+    return props
+
+
+def parse_outputs(output):
+    """[(component id, property)] of a dependency's output string, e.g. '..a.b...c.d@hash..'."""
+    parts = output[2:-2].split('...') if output.startswith('..') else [output]
+    return [tuple(part.rsplit('.', 1)) for part in parts]
+
+
+class Callback:
+    """One server-side callback from /_dash-dependencies."""
+
+    def __init__(self, dependency):
+        self.output = dependency['output']
+        self.outputs = parse_outputs(self.output)
+        self.multi = self.output.startswith('..')
+        self.inputs = [(i['id'], i['property']) for i in dependency['inputs']]
+        self.state = [(s['id'], s['property']) for s in dependency['state']]
+        self.name = ','.join(f"{id}.{prop.split('@')[0]}" for id, prop in self.outputs)
+
+    def body(self, values, changed):
+        outputs = [{'id': id, 'property': prop} for id, prop in self.outputs]
+        return {'output': self.output, 'outputs': outputs if self.multi else outputs[0],
+                'inputs': [{'id': id, 'property': prop, 'value': values.get((id, prop))} for id, prop in self.inputs],
+                'state': [{'id': id, 'property': prop, 'value': values.get((id, prop))} for id, prop in self.state],
+                'changedPropIds': sorted(changed)}
+
+
+class Session:
+    """A browser tab: its own component values, connection and random edits."""
+
+    def __init__(self, port, callbacks, values, seed):
+        self.port, self.callbacks, self.values = port, callbacks, dict(values)
+        self.rng = random.Random(seed)
+        self.connection = http.client.HTTPConnection('127.0.0.1', port)
+        self.requests, self.edits, self.errors = [], [], 0  # requests: (callback name, seconds)
+
+    def post(self, callback, changed):
+        body = json.dumps(callback.body(self.values, changed))
+        start = time.perf_counter()
+        try:
+            self.connection.request('POST', '/_dash-update-component', body, {'Content-Type': 'application/json'})
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()  # reconnects on the next request
+            self.errors += 1
+            return {}
+        self.requests.append((callback.name, time.perf_counter() - start))
+        if response.status == 204:  # every output was no_update
+            return {}
+        if response.status != 200:
+            self.errors += 1
+            return {}
+        return json.loads(data).get('response', {})
+
+    def edit(self):
+        names = list(SIDEBAR_EDITS)
+        component = self.rng.choices(names, weights=[SIDEBAR_EDITS[name][0] for name in names])[0]
+        self.values[(component, 'value')] = SIDEBAR_EDITS[component][1](self.rng, self.values.get((component, 'value')))
+        start = time.perf_counter()
+        changed = {(component, 'value')}
+        for _ in range(MAX_CHAIN):
+            updated = set()
+            for callback in self.callbacks:
+                if changed.isdisjoint(callback.inputs):
+                    continue
+                for id, props in self.post(callback, {f'{id}.{prop}' for id, prop in changed & set(callback.inputs)}).items():
+                    for prop, value in props.items():
+                        if isinstance(value, dict) and '__dash_patch_update' in value:
+                            continue  # Patch deltas only matter to the browser's copy of the figure
+                        self.values[(id, prop)] = value
+                        updated.add((id, prop))
+            if not updated:
+                break
+            changed = updated
+        self.edits.append(time.perf_counter() - start)
+
+    def run(self, edits, think=0.0):
+        for _ in range(edits):
+            self.edit()
+            if think:
+                time.sleep(think)
+        self.connection.close()
+
+
+def run_level(port, callbacks, values, clients, edits, seed, think=0.0):
+    """Run `clients` concurrent sessions of `edits` edits each; returns the summary for this level."""
+    sessions = [Session(port, callbacks, values, seed * 1000 + i) for i in range(clients)]
+    threads = [threading.Thread(target=session.run, args=(edits, think)) for session in sessions]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    requests = [r for session in sessions for r in session.requests]
+    latencies = [seconds for _, seconds in requests]
+    edit_latencies = [seconds for session in sessions for seconds in session.edits]
+    by_callback = {}
+    for name, seconds in requests:
+        by_callback.setdefault(name, []).append(seconds)
+    return {
+        'requests': len(requests), 'errors': sum(session.errors for session in sessions),
+        'throughput_rps': len(requests) / elapsed,
+        **{f'p{q}_ms': percentile(latencies, q) * 1000 for q in (50, 90, 99)},
+        'max_ms': max(latencies, default=float('nan')) * 1000,
+        'edit_p50_ms': percentile(edit_latencies, 50) * 1000, 'edit_p99_ms': percentile(edit_latencies, 99) * 1000,
+        'callbacks': {name: {'requests': len(samples), 'p50_ms': percentile(samples, 50) * 1000, 'p99_ms': percentile(samples, 99) * 1000}
+                      for name, samples in sorted(by_callback.items())},
+    }
+
+
+def measure(clients=CLIENTS, edits=EDITS, seed=0, think=0.0):
+    """Per concurrency level ('clients_<n>'): latency percentiles, throughput and per-callback latencies."""
+    process, port = start_server()
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        connection.request('GET', '/_dash-layout')
+        values = layout_props(json.loads(connection.getresponse().read()))
+        connection.request('GET', '/_dash-dependencies')
+        callbacks = [Callback(d) for d in json.loads(connection.getresponse().read()) if d.get('clientside_function') is None]
+        connection.close()
+        Session(port, callbacks, values, seed=-1).run(WARMUP_EDITS)  # imports and first-call costs in the server
+        return {f'clients_{n}': run_level(port, callbacks, values, n, edits, seed, think) for n in clients}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def post_job(connection, output, request):
+    """Seconds until the Monte Carlo bands for `request` arrive, following a background job's polls if one starts."""
+    body = json.dumps({'output': output, 'outputs': {'id': 'profit-chart', 'property': output.split('.', 1)[1]},
+                       'inputs': [{'id': 'mc-request', 'property': 'data', 'value': request}],
+                       'changedPropIds': ['mc-request.data']})
+    path = '/_dash-update-component'
+    start = time.perf_counter()
+    while True:
+        connection.request('POST', path, body, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"Monte Carlo callback failed with status {response.status}")
+        if 'response' in data:
+            return time.perf_counter() - start
+        if 'cacheKey' in data:
+            path = '/_dash-update-component?' + urlencode({'cacheKey': data['cacheKey'], 'job': data['job']})
+        time.sleep(JOB_POLL)
+
+
+def measure_jobs(runs=JOB_RUNS, draws=JOB_DRAWS):
+    """Monte Carlo band latency ('background' job vs 'inline' callback): p50/max ms over `runs` requests."""
+    # Random ticket prices keep both the result cache and the job store (kept across runs in .cache/jobs) cold
+    rng = random.Random()
+    requests = [{'enabled': True, 'draws': draws, 'inputs': scenario_engine.normalize_inputs(ticket_price=rng.uniform(20.0, 200.0))}
+                for _ in range(runs + 1)]
+    results = {}
+    for mode in ('inline', 'background'):
+        process, port = start_server(background=mode == 'background')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/_dash-dependencies')
+            output = next(d['output'] for d in json.loads(connection.getresponse().read())
+                          if [i['id'] for i in d['inputs']] == ['mc-request'])
+            samples = [post_job(connection, output, request) for request in requests][1:]  # the first one warms up
+            connection.close()
+        finally:
+            process.terminate()
+            process.wait()
+        results[mode] = {'p50_ms': percentile(samples, 50) * 1000, 'max_ms': max(samples) * 1000}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay sidebar sessions against the Dash callback endpoint.")
+    parser.add_argument('--clients', type=int, nargs='+', default=list(CLIENTS), help="concurrency levels (default: 1 4 16)")
+    parser.add_argument('--edits', type=int, default=EDITS, help=f"sidebar edits per client and level (default: {EDITS})")
+    parser.add_argument('--think', type=float, default=0.0, help="seconds between a client's edits (default: 0)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--job-runs', type=int, default=JOB_RUNS, help=f"Monte Carlo requests per mode for the background-job timing, 0 to skip (default: {JOB_RUNS})")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = measure(args.clients, args.edits, args.seed, args.think)
+    jobs = measure_jobs(args.job_runs) if args.job_runs else {}
+    print(f"{'clients':>8}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50':>10}{'p90':>10}{'p99':>10}{'edit p50':>11}{'edit p99':>11}")
+    for level, row in results.items():
+        print(f"{level.split('_')[1]:>8}{row['requests']:>10}{row['errors']:>8}{row['throughput_rps']:>9.1f}"
+              + ''.join(f"{row[key]:>8.1f}ms" for key in ('p50_ms', 'p90_ms', 'p99_ms'))
+              + ''.join(f"{row[key]:>9.1f}ms" for key in ('edit_p50_ms', 'edit_p99_ms')))
+    for mode, row in jobs.items():
+        print(f"Monte Carlo {JOB_DRAWS:,} draws, {mode:>10}: p50 {row['p50_ms']:.1f}ms, max {row['max_ms']:.1f}ms")
+    if args.json:
+        Path(args.json).write_text(json.dumps({**results, 'monte_carlo_jobs': jobs} if jobs else results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
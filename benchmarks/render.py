@@ -0,0 +1,89 @@
+"""Figure, table and payload benchmarks for the dashboard.
+
+Times building and serializing what the callbacks send (the main chart and
+projection table, the sensitivity figures, the comparison chart and a
+comparison table page) with the model results already cached, so the numbers
+are the rendering cost alone; goal seek is not cached and is timed as the
+whole callback. The '_bytes' entries are the JSON the browser receives.
+
+The initial page is measured through the Flask test client: the serialized
+layout (raw and gzipped) and the image, which is not inlined but served from
+/images as the original PNG plus WebP variants.
+
+    python benchmarks/render.py [--json render.json]
+"""
+import argparse
+import gzip
+import json
+from pathlib import Path
+
+from timing import median_ms
+
+COMPARE_SCENARIOS = (10, 100)
+
+
+def _scenarios(n):
+    """n saved scenarios ({name: normalized inputs}) spread over crew and ticket price."""
+    import scenario_engine
+    return {f"Scenario {i + 1}": scenario_engine.normalize_inputs(crew_count=5 + i % 30, include_spectators=[1], spectator_count=40,
+                                                                   ticket_price=20.0 + i)
+            for i in range(n)}
+
+
+def measure(repeat=5):
+    """Median milliseconds per build ('<name>_ms') and payload sizes ('<name>_bytes')."""
+    import financial_model as fm
+    import scenario_engine
+    import static_assets
+    from plotly.io.json import to_json_plotly
+
+    results = {}
+
+    def timed(name, build):
+        build()  # fill the model caches and import what the builder needs
+        results[f'{name}_ms'] = median_ms(lambda: to_json_plotly(build()), repeat)
+        results[f'{name}_bytes'] = len(to_json_plotly(build()))
+
+    inputs = scenario_engine.normalize_inputs()
+    sidebar = [15, 12, [], 0, 60.0, [], [1], 10, [], 570.0]  # initial sidebar values, as the callbacks receive them
+    timed('profit_figure', lambda: fm.build_profit_figure(fm.model_row(inputs)))
+    timed('projection_table', lambda: fm.projection_table(fm.model_row(inputs)))
+    timed('sensitivity_figures', lambda: fm.update_sensitivity(lambda *_: None, *sidebar, 10, 'net_no_amort', 'crew_count', 'ticket_price'))
+    timed('goal_seek_callback', lambda: fm.update_goal_seek(*sidebar[:6], fm.DEFAULT_DISCOUNT_RATE, 'ticket_price', 'breakeven', 0))
+    for n in COMPARE_SCENARIOS:
+        scenarios = _scenarios(n)
+        timed(f'compare_figure_n{n}', lambda: fm.build_compare_figure(scenarios, 'cash_position'))
+        timed(f'compare_figure_zoom_n{n}', lambda: fm.build_compare_figure(scenarios, 'cash_position', (10.0, 12.5)))
+        timed(f'compare_table_page_n{n}', lambda: fm.update_compare_table(
+            3, fm.COMPARE_PAGE_SIZE, [{'column_id': 'cash_position', 'direction': 'desc'}], '{year} >= 5', list(scenarios), scenarios))
+
+    # Initial page: a fresh app with the layout cache in memory only
+    app = fm.create_app(layout_cache_dir=None, background=False)
+    client = app.server.test_client()
+    results['index_bytes'] = len(client.get('/').data)
+    layout = client.get('/_dash-layout').data
+    results['layout_bytes'], results['layout_gzip_bytes'] = len(layout), len(gzip.compress(layout))
+    sources = static_assets.image_sources(fm.IMAGE_PATH, app.server)
+    results['layout_build_ms'] = median_ms(lambda: to_json_plotly(fm.build_layout(sources)), repeat)
+    if sources:
+        results['image_png_bytes'] = len(client.get(sources['src']).data)
+        for entry in filter(None, sources['srcset'].split(', ')):
+            url, width = entry.split()
+            results[f'image_webp_{width[:-1]}w_bytes'] = len(client.get(url).data)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time figure/table building and measure dashboard payloads.")
+    parser.add_argument('--repeat', type=int, default=5, help="samples per benchmark (default: 5)")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = measure(args.repeat)
+    for name, value in results.items():
+        print(f"{name:32}" + (f"{value:>12.3f}ms" if name.endswith('_ms') else f"{value:>12,}B"))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
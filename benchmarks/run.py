@@ -0,0 +1,153 @@
+"""Run the benchmark suites, save the results and compare them with a baseline.
+
+Suites:
+  engine   model math on 1 / 1,000 / 1,000,000 scenarios (engine.py)
+  render   figure and table building, layout and image payloads (render.py)
+  startup  process start without a layout cache and with a cold and a warm one (startup.py)
+  load     concurrent sidebar sessions against the callback endpoint, and the
+           Monte Carlo bands as a background job vs inline (load.py)
+
+    python benchmarks/run.py -o baseline.json                # all suites
+    python benchmarks/run.py --suites engine render --compare baseline.json
+    python benchmarks/run.py --results current.json --compare baseline.json   # no new run
+
+Metrics are compared by their name: '_ms' and '_bytes' values and error
+counts are flagged when they grow, '_rps' values when they shrink, by more
+than --threshold; anything else (request counts, ...) is informational.
+Timing differences under NOISE_FLOOR_MS are never flagged. The exit status is
+1 if any regression was flagged.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from timing import ROOT
+
+import engine
+import load
+import render
+import startup
+
+SUITES = ('engine', 'render', 'startup', 'load')
+THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.5
+
+
+def run_startup(runs):
+    return {name: {**{f'{phase}_ms': row[phase] * 1000 for phase in startup.PHASES + ('total',)}, 'layout_bytes': row['layout_bytes']}
+            for name, row in startup.measure(runs).items()}
+
+
+def run_suites(suites, quick=False):
+    """{suite: results}; quick trades coverage for a run of about a minute (no 1M batch, fewer samples and clients)."""
+    repeat = 3 if quick else 5
+    runners = {
+        'engine': lambda: engine.measure(engine.SIZES[:2] if quick else engine.SIZES, repeat),
+        'render': lambda: render.measure(repeat),
+        'startup': lambda: run_startup(2 if quick else 5),
+        'load': lambda: {**load.measure((1, 4) if quick else load.CLIENTS, 10 if quick else load.EDITS),
+                         'monte_carlo_jobs': load.measure_jobs(2 if quick else load.JOB_RUNS)},
+    }
+    results = {}
+    for suite in suites:
+        start = time.perf_counter()
+        results[suite] = runners[suite]()
+        print(f"{suite}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return results
+
+
+def environment():
+    import dash
+    import numpy
+    import plotly
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit, 'python': platform.python_version(),
+            'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': numpy.__version__, 'dash': dash.__version__, 'plotly': plotly.__version__}
+
+
+def flatten(results, prefix=''):
+    """{'suite.group.metric': value} for nested result dicts."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def direction(metric):
+    """+1 if larger is better, -1 if smaller is better, 0 if the metric is not compared."""
+    name = metric.rsplit('.', 1)[-1]
+    if name.endswith('_rps'):
+        return 1
+    if name.endswith(('_ms', '_bytes')) or name == 'errors':
+        return -1
+    return 0
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    """[(metric, baseline, current, relative change, regressed)] for the metrics both runs have."""
+    current, baseline = flatten(current), flatten(baseline)
+    rows = []
+    for metric in sorted(current.keys() & baseline.keys()):
+        sign, old, new = direction(metric), baseline[metric], current[metric]
+        if not sign or old is None or new is None or old != old or new != new:
+            continue
+        change = (new - old) / old if old else (0.0 if new == old else float('inf'))
+        worse = -sign * change > threshold
+        if metric.endswith('_ms') and abs(new - old) < NOISE_FLOOR_MS:
+            worse = False
+        rows.append((metric, old, new, change, worse))
+    return rows
+
+
+def report(rows, threshold):
+    flagged = [row for row in rows if row[4]]
+    improved = [row for row in rows if not row[4] and direction(row[0]) * row[3] > threshold]
+    for title, group in (("Regressions", flagged), ("Improvements", improved)):
+        if group:
+            print(f"{title} (> {threshold:.0%}):")
+            for metric, old, new, change, _ in group:
+                print(f"  {metric:64}{old:>14,.2f} -> {new:>14,.2f}  {change:+.1%}")
+    print(f"{len(rows)} metrics compared, {len(flagged)} regressions, {len(improved)} improvements")
+    return flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suites and flag regressions against a baseline.")
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES), help="suites to run (default: all)")
+    parser.add_argument('--quick', action='store_true', help="smaller batches, fewer samples and clients")
+    parser.add_argument('-o', '--output', help="write the results (with environment details) to this JSON file")
+    parser.add_argument('--results', help="compare this saved results file instead of running the suites")
+    parser.add_argument('--compare', metavar='BASELINE', help="flag regressions against this saved results file")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help=f"relative change that counts as a regression (default: {THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    if args.results:
+        saved = json.loads(Path(args.results).read_text())
+    else:
+        saved = {'environment': environment(), 'results': run_suites(args.suites, args.quick)}
+        for metric, value in flatten(saved['results']).items():
+            print(f"{metric:64}{value:>16,.3f}" if isinstance(value, float) else f"{metric:64}{value:>16,}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(saved, indent=2))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline['environment'].get('cpus') != saved['environment'].get('cpus'):
+            print("warning: baseline was recorded on a machine with a different core count", file=sys.stderr)
+        if report(compare(saved['results'], baseline['results'], args.threshold), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Cold-start benchmark for the dashboard.
+
+Every run starts a fresh interpreter and times three phases:
+  import        `import financial_model` (Dash and Plotly are not loaded yet)
+  create_app    financial_model.create_app(): Dash import, component tree, callbacks
+  first_layout  first GET / and /_dash-layout through the Flask test client
+
+without a layout cache (create_app(layout_cache_dir=None): every worker
+builds the initial figures itself, as before the cache existed), with an
+empty cache (first start after a deploy) and with a warm cache (every later
+restart or extra worker).
+
+    python benchmarks/startup.py --runs 5 [--json startup.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PHASES = ('import', 'create_app', 'first_layout')
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+t0 = time.perf_counter()
+import financial_model
+t1 = time.perf_counter()
+app = financial_model.create_app(layout_cache_dir=sys.argv[2] or None)
+t2 = time.perf_counter()
+client = app.server.test_client()
+client.get('/')
+size = len(client.get('/_dash-layout').data)
+t3 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'create_app': t2 - t1, 'first_layout': t3 - t2, 'layout_bytes': size}))
+"""
+
+
+def start_once(cache_dir=None):
+    """Phase timings of one fresh start; cache_dir=None disables the layout cache."""
+    out = subprocess.run([sys.executable, '-c', CHILD, str(ROOT), str(cache_dir or '')], check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def measure(runs=5):
+    """Median seconds per phase (and total) for starts without a layout cache and with a cold and a warm one."""
+    results = {}
+    no_cache = [start_once() for _ in range(runs)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = [start_once(Path(tmp) / f'cold-{i}') for i in range(runs)]
+        warm_dir = Path(tmp) / 'warm'
+        start_once(warm_dir)
+        warm = [start_once(warm_dir) for _ in range(runs)]
+    for name, samples in (('no_cache', no_cache), ('cold_cache', cold), ('warm_cache', warm)):
+        row = {phase: statistics.median(s[phase] for s in samples) for phase in PHASES}
+        row['total'] = statistics.median(sum(s[phase] for phase in PHASES) for s in samples)
+        row['layout_bytes'] = samples[0]['layout_bytes']
+        results[name] = row
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time dashboard cold starts without, with an empty and with a warm layout cache.")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per scenario (default: 5)")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = measure(args.runs)
+    print(f"{'':12}" + ''.join(f"{phase:>14}" for phase in PHASES + ('total',)))
+    for name, row in results.items():
+        print(f"{name:12}" + ''.join(f"{row[phase] * 1000:>12.0f}ms" for phase in PHASES + ('total',)))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
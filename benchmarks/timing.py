@@ -0,0 +1,34 @@
+"""Timing helpers shared by the benchmark scripts.
+
+Importing this module puts the repository root on sys.path, so the scripts
+can be run directly (`python benchmarks/engine.py`) and import the model.
+"""
+import math
+import statistics
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def median_ms(fn, repeat=5):
+    """Median milliseconds per fn() call.
+
+    Each of the `repeat` samples runs fn enough times to take at least 0.2s
+    (timeit's autorange), so sub-millisecond calls are not dominated by timer
+    resolution; slow calls run once per sample.
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return statistics.median(timer.repeat(repeat, number)) / number * 1000
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) of values by nearest rank; NaN for no values."""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
@@ -0,0 +1,81 @@
+"""Vectorized investment metrics over batches of cash-flow series.
+
+Cash flows are (n_scenarios, T) arrays where column 0 is the up-front
+investment (time 0) and column k is the net flow of period k. Every metric is
+computed for all rows at once; IRR uses a batched safeguarded Newton solver
+(Newton steps that leave the bracket fall back to bisection).
+"""
+import numpy as np
+
+IRR_BRACKET = (-0.99, 10.0)
+
+
+def cash_flows(result):
+    """(n, years + 1) cash flows from a scenario_engine.evaluate() result: -CAPEX, then revenue - OPEX."""
+    return np.concatenate([-result['total_capex'][:, None], result['revenues'] - result['opex']], axis=1)
+
+
+def discount_factors(rate, n_periods, periods_per_year=1):
+    """(n, T) or (1, T) factors (1 + rate) ** -(t / periods_per_year); rate may be per scenario."""
+    rate = np.atleast_1d(np.asarray(rate, dtype=float))[:, None]
+    return (1 + rate) ** -(np.arange(n_periods) / periods_per_year)
+
+
+def npv(flows, rate, periods_per_year=1):
+    """Net present value of each row at an annual discount rate."""
+    return (flows * discount_factors(rate, flows.shape[1], periods_per_year)).sum(axis=1)
+
+
+def irr(flows, periods_per_year=1, tol=1e-10, max_iter=100):
+    """Annual internal rate of return of each row (NaN where the NPV does not change sign in the bracket)."""
+    flows = np.asarray(flows, dtype=float)
+    t = np.arange(flows.shape[1])
+
+    def value_and_slope(rows, r):
+        d = (1 + r)[:, None] ** -t
+        return (flows[rows] * d).sum(axis=1), (-t * flows[rows] * d).sum(axis=1) / (1 + r)
+
+    # Solve for the per-period rate, then annualize
+    rows = np.arange(flows.shape[0])
+    lo = np.full(len(rows), (1 + IRR_BRACKET[0]) ** (1 / periods_per_year) - 1)
+    hi = np.full(len(rows), (1 + IRR_BRACKET[1]) ** (1 / periods_per_year) - 1)
+    f_lo, _ = value_and_slope(rows, lo)
+    f_hi, _ = value_and_slope(rows, hi)
+    rate = np.full(len(rows), np.nan)
+    keep = np.sign(f_lo) * np.sign(f_hi) < 0
+    rows, lo, hi, f_lo = rows[keep], lo[keep], hi[keep], f_lo[keep]
+    x = 0.5 * (lo + hi)
+    for _ in range(max_iter):
+        if not len(rows):
+            break
+        f, slope = value_and_slope(rows, x)
+        below = np.sign(f) == np.sign(f_lo)
+        lo, f_lo, hi = np.where(below, x, lo), np.where(below, f, f_lo), np.where(below, hi, x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = x - f / slope
+        new_x = np.where(np.isfinite(step) & (step > lo) & (step < hi), step, 0.5 * (lo + hi))
+        done = (np.abs(new_x - x) <= tol * (1 + np.abs(x))) | (hi - lo <= tol * (1 + np.abs(x))) | (f == 0)
+        rate[rows[done]] = new_x[done]
+        rows, x, lo, hi, f_lo = rows[~done], new_x[~done], lo[~done], hi[~done], f_lo[~done]
+    rate[rows] = x
+    return (1 + rate) ** periods_per_year - 1
+
+
+def payback_period(flows, rate=None, periods_per_year=1):
+    """Years until cumulative (discounted, if rate is given) cash turns non-negative; NaN if never."""
+    if rate is not None:
+        flows = flows * discount_factors(rate, flows.shape[1], periods_per_year)
+    cumulative = np.cumsum(flows, axis=1) >= 0
+    reached = cumulative.any(axis=1)
+    first = np.argmax(cumulative, axis=1)
+    return np.where(reached, first / periods_per_year, np.nan)
+
+
+def summarize(flows, discount_rate=0.08, periods_per_year=1):
+    """NPV, IRR, discounted payback and breakeven year for every row."""
+    return {
+        'npv': npv(flows, discount_rate, periods_per_year),
+        'irr': irr(flows, periods_per_year),
+        'discounted_payback': payback_period(flows, discount_rate, periods_per_year),
+        'breakeven_year': payback_period(flows, None, periods_per_year),
+    }
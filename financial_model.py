@@ -1,22 +1,33 @@
-import dash
-from dash import dcc, html, Input, Output, State, dash_table
-import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-import pandas as pd
-
-# Add this import at the top with other imports
 import base64
+import functools
 from pathlib import Path
 
-# Initialize the Dash app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.CYBORG])
+import numpy as np
+
+import finance_metrics
+import goal_seek
+import instrumentation
+import monte_carlo
+import optimizer
+import result_cache
+import scenario_compare
+import scenario_engine
+import sensitivity
+
+# Callbacks mark their phases with instrumentation.phase(), timed only when metrics are on (SGA_METRICS)
+
+# Dash, Dash Bootstrap Components and Plotly are only imported by create_app() and the builders below, so importing
+# this module stays cheap; the module-level `app` and `server` are created on first access (see __getattr__)
 
-# Constants
-baseline_crew, baseline_contestants, baseline_spectators = 15, 12, 50
-capex_phase1, capex_phase2_additional, capex_per_extra_person = 5.7e9, 1.4e9, 20e6
-crew_cost_per, contestant_cost_per, spectator_transport_cost_per = 65e6, 65e6, 55e6
-crew_salary_per, prize_pool_per_contestant, cargo_per_person, docked_vehicle_cost = 0.317e6, 1.667e6, 1.5e6, 44e6
-sponsorship, broadcasting, vr_ar, merchandising, revenue_growth = 600e6, 550e6, 100e6, 200e6, 0.10
+# Finished dashboard results keyed on normalized inputs (SGA_RESULT_CACHE_SIZE/_TTL/_PATH)
+dashboard_cache = result_cache.from_env()
+# Monte Carlo risk distributions (SGA_MC_DISTRIBUTIONS: JSON file, see monte_carlo.load_distributions)
+risk_distributions = monte_carlo.from_env()
+
+# Serialized layout, keyed by a hash of everything it is built from (see create_app)
+LAYOUT_CACHE_DIR = Path(__file__).parent / '.cache' / 'layout'
+# Modules whose code or constants end up in the layout: the initial results, figures and dropdown options
+LAYOUT_MODULES = (scenario_engine, finance_metrics, sensitivity, goal_seek, scenario_compare)
 
 # Styling
 SIDEBAR_STYLE = {
@@ -36,6 +47,10 @@ CONTENT_STYLE = {
     'minHeight': '100vh', 'transition': 'all 0.3s ease',
 }
 
+# Progress bars of the background jobs are only shown while a job runs
+PROGRESS_STYLE = {'height': '14px', 'marginBottom': '10px'}
+PROGRESS_HIDDEN = {**PROGRESS_STYLE, 'display': 'none'}
+
 TOGGLE_BUTTON_STYLE = {
     'position': 'fixed', 'top': '20px', 'background': 'linear-gradient(135deg, #1b2733, #2c3e50)',
     'color': 'white', 'border': 'none', 'padding': '10px 15px', 'cursor': 'pointer',
@@ -54,27 +69,42 @@ TOOLTIPS = {
     'amort-years': "Annual amortization = total CAPEX / this number. Default 10 years gives 5.7B/10 = 570M.",
     'manual-amort': "Enter an explicit annual amortization amount instead of dividing CAPEX by amortization period.",
     'manual-amort-value': "Enter annual amortization (in MILLIONS USD). Example: 570 => $570M/year.",
+    'discount-rate': "Annual discount rate (%) used for NPV and discounted payback.",
+    'mc-enable': "Draws growth, revenue streams and transport costs from distributions and shows P5/P50/P95 bands on the chart.",
+    'mc-draws': "Number of Monte Carlo samples. Work is split across CPU cores; memory use does not grow with this number.",
     'total-capex': "Total upfront capital expenditure. Covers R&D, habitat, life support & integration.",
     'year1-opex': "Operating expenses in Year 1 (crew deployment, transport, salaries, cargo, prize pool).",
     'recurring-opex': "Annual recurring operating expenses from Year 2 onwards.",
     'year1-revenue': "Revenue in Year 1 = ticket revenue + sponsorship + broadcasting + VR/AR + merchandising.",
+    'npv': "Net present value over 10 years: -CAPEX at start, then revenue - OPEX each year, discounted at the sidebar rate.",
+    'irr': "Internal rate of return of the same 10-year cash flows (the discount rate at which NPV is zero).",
+    'discounted-payback': "First year in which discounted cumulative cash flow (after CAPEX) turns non-negative.",
+    'breakeven': "First year in which undiscounted cumulative cash flow (after CAPEX) turns non-negative.",
+    'goal-value': "For NPV: target NPV in MILLIONS USD. For margin: target cumulative net margin in %. Ignored for breakeven.",
+    'sens-pct': "Each parameter is moved down and up by this percentage; bars show the change in 10-year cumulative profit.",
+    'opt-objective': "Searches crew 1-50, contestants 1-50, spectators 0-200, ticket prices $0-200M (step $5M) and both flags; "
+                     "the chart shows the best result at each CAPEX level (Pareto front).",
+    'compare-name': "Saves the current sidebar settings under this name (kept in this browser). Saving an existing name overwrites it.",
 }
 
-# Add this function after your constants and before the sidebar definitions
-def encode_image(image_path):
-    """Encode image to base64 for display"""
-    try:
-        with open(image_path, 'rb') as f:
-            encoded = base64.b64encode(f.read()).decode()
-        return f"data:image/png;base64,{encoded}"
-    except FileNotFoundError:
-        return None
+# Served from a cached static route (resized WebP variants + original PNG), lazy-loaded by assets/lazy_images.js
+IMAGE_PATH = Path(__file__).parent / "one_page_finance.png"
 
-# Define your image path (modify 'your_image.png' to your actual image filename)
-IMAGE_PATH = Path(__file__).parent / "one_page_finance.png"  # Change filename as needed
-encoded_image = encode_image(IMAGE_PATH)
+def create_metric_card(title, tooltip_key, metric_id, value, gradient):
+    from dash import html
+    import dash_bootstrap_components as dbc
+    return dbc.Col(dbc.Card([dbc.CardBody([
+        html.Div([
+            html.H6([f"{title} ", html.Span("ℹ️", id=f"{tooltip_key}-tooltip-icon", style={'cursor': 'pointer'})],
+                   className="text-white", style={'marginBottom': '8px'}),
+            dbc.Tooltip(TOOLTIPS[tooltip_key], target=f"{tooltip_key}-tooltip-icon", placement="top"),
+            html.H4(value, id=metric_id, className="text-white", style={'fontWeight': 'bold'})
+        ])
+    ])], style={'background': gradient, 'border': 'none'}), width=3)
 
 def create_input_with_tooltip(label, input_id, tooltip_text, input_component):
+    from dash import html
+    import dash_bootstrap_components as dbc
     return html.Div([
         dbc.Label([label, html.Span(" ℹ️", id=f"{input_id}-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px'})], 
                   className="text-white-50"),
@@ -82,276 +112,483 @@ def create_input_with_tooltip(label, input_id, tooltip_text, input_component):
         input_component,
     ], className='mb-3')
 
-# Left Sidebar
-left_sidebar = html.Div([
-    html.H3("⚙️ Parameters", className="text-white mb-4"),
-    html.Div([
-        create_input_with_tooltip("Crew Members", "crew-count", TOOLTIPS['crew-count'],
-            dcc.Input(id='crew-count', type='number', value=15, min=1, max=50, className='form-control form-control-sm',
-                     style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
-        create_input_with_tooltip("Contestants", "contestant-count", TOOLTIPS['contestant-count'],
-            dcc.Input(id='contestant-count', type='number', value=12, min=1, max=50, className='form-control form-control-sm',
-                     style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
-        html.Div([
-            dbc.Checklist(id='include-spectators', options=[{'label': ' Enable Spectators (Phase 2)', 'value': 1}],
-                         value=[], className='text-white', style={'fontSize': '0.9rem'}),
-            html.Span(" ℹ️", id="include-spectators-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
-            dbc.Tooltip(TOOLTIPS['include-spectators'], target="include-spectators-tooltip-icon", placement="right"),
-        ], className='mb-3'),
-        create_input_with_tooltip("Spectators", "spectator-count", TOOLTIPS['spectator-count'],
-            dcc.Input(id='spectator-count', type='number', value=0, min=0, max=200, className='form-control form-control-sm',
-                     style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
-        create_input_with_tooltip("Ticket Price / Spectator ($M)", "ticket-price", TOOLTIPS['ticket-price'],
-            dcc.Input(id='ticket-price', type='number', value=60.0, step=0.5, className='form-control form-control-sm',
-                     style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
-        html.Div([
-            dbc.Checklist(id='scale-capex', options=[{'label': ' Scale CAPEX for extra capacity', 'value': 1}],
-                         value=[], className='text-white', style={'fontSize': '0.9rem'}),
-            html.Span(" ℹ️", id="scale-capex-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
-            dbc.Tooltip(TOOLTIPS['scale-capex'], target="scale-capex-tooltip-icon", placement="right"),
-        ], className='mb-3'),
-        html.Hr(className='bg-secondary'),
-        html.H5("CAPEX Amortization", className="text-white mb-3", style={'fontSize': '1rem'}),
-        html.Div([
-            dbc.Checklist(id='use-amort', options=[{'label': ' Amortize CAPEX', 'value': 1}],
-                         value=[1], className='text-white', style={'fontSize': '0.9rem'}),
-            html.Span(" ℹ️", id="use-amort-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
-            dbc.Tooltip(TOOLTIPS['use-amort'], target="use-amort-tooltip-icon", placement="right"),
-        ], className='mb-3'),
-        create_input_with_tooltip("Amortization Period (years)", "amort-years", TOOLTIPS['amort-years'],
-            dcc.Input(id='amort-years', type='number', value=10, min=1, max=50, className='form-control form-control-sm',
-                     style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+# name -> (label, display scale, unit)
+GOAL_PARAMS = {
+    'ticket_price': ("Ticket Price / Spectator", 1.0, "$M"),
+    'spectator_count': ("Spectators per Event", 1.0, "spectators"),
+    'contestant_cost_per': ("Contestant Cost (per person)", 1e6, "$M"),
+}
+SENSITIVITY_OPTIONS = [{'label': name.replace('_', ' ').title(), 'value': name} for name in sensitivity.SENSITIVITY_PARAMS]
+
+# Dashboard builders
+YEARS = list(range(1, 11))
+DEFAULT_DISCOUNT_RATE = 8.0
+RISK_BANDS = (('revenues', "Revenue", '0,212,255'), ('net_no_amort', "Net Profit", '255,107,107'))
+# Profit chart traces in drawing order (also their uids); Patch updates address traces by their index here
+PROFIT_TRACES = tuple(f'{key}_{q}' for key, _, _ in RISK_BANDS for q in ('p95', 'p5', 'p50')) + ('revenues', 'net_no_amort')
+TRACE_INDEX = {uid: i for i, uid in enumerate(PROFIT_TRACES)}
+SENSITIVITY_DEFAULTS = (10, 'net_no_amort', 'ticket_price', 'spectator_count')  # pct, metric, heatmap x and y
+GOAL_SEEK_DEFAULTS = ('ticket_price', 'breakeven', 0)  # param, target, value
+# Heatmap grid per axis; the initial layout ships a coarse preview, the first sensitivity update the full grid
+HEATMAP_STEPS, HEATMAP_PREVIEW_STEPS = 200, 25
+COMPARE_PAGE_SIZE = 100
+OPTIMIZER_OBJECTIVES = [{'label': 'Maximize 10-Year NPV', 'value': 'npv'}, {'label': 'Earliest Breakeven Year', 'value': 'breakeven_year'}]
+COMPARE_SERIES_OPTIONS = [{'label': label, 'value': name} for name, label in scenario_compare.SERIES.items()]
+
+def model_row(inputs):
+    """Headline numbers and $M projections for one set of normalized inputs (cached)."""
+    def compute():
+        result = scenario_engine.evaluate(**inputs)
+        row = {k: float(result[k][0]) for k in ('total_capex', 'year1_opex', 'annual_opex', 'year1_revenue')}
+        row.update({k: (result[k][0] / 1e6).tolist() for k in ('revenues', 'net_no_amort')})
+        return row
+    with instrumentation.phase('model'):
+        return dashboard_cache.get_or_compute(dashboard_cache.make_key('model', tuple(sorted(inputs.items()))), compute)
+
+def risk_bands(inputs, draws, progress=None):
+    """P5/P50/P95 ($M) per year for revenue and net profit (cached); progress(done, draws) is passed to the simulation."""
+    def compute():
+        risk = monte_carlo.simulate(inputs, risk_distributions, draws=draws, progress=progress)
+        return {key: (risk[key] / 1e6).tolist() for key, _, _ in RISK_BANDS}
+    with instrumentation.phase('model'):
+        return dashboard_cache.get_or_compute(dashboard_cache.make_key('risk', tuple(sorted(inputs.items())), tuple(sorted(risk_distributions.items())), draws), compute)
+
+def investment_metrics(inputs, discount_rate):
+    """Formatted NPV, IRR, discounted payback and breakeven year (cached)."""
+    def compute():
+        summary = finance_metrics.summarize(finance_metrics.cash_flows(scenario_engine.evaluate(**inputs)), discount_rate)
+        npv, irr, payback, breakeven = (float(summary[k][0]) for k in ('npv', 'irr', 'discounted_payback', 'breakeven_year'))
+        return (billions(npv), "n/a" if irr != irr else f"{irr:.1%}",
+                f"Year {payback:.0f}" if payback == payback else "> 10 yrs", f"Year {breakeven:.0f}" if breakeven == breakeven else "> 10 yrs")
+    with instrumentation.phase('model'):
+        return dashboard_cache.get_or_compute(dashboard_cache.make_key('finance', tuple(sorted(inputs.items())), discount_rate), compute)
+
+def billions(value):
+    return f"${value/1e9:.2f}B"
+
+def table_column(values):
+    return [f"{v:,.0f}" for v in values]
+
+def build_profit_figure(row):
+    """Chart skeleton: hidden P95/P5/P50 traces per risk band, then revenue and net profit."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for key, name, color in RISK_BANDS:
+        fig.add_trace(go.Scatter(x=YEARS, y=[], mode="lines", line=dict(width=0), showlegend=False, hoverinfo='skip', visible=False,
+                                 uid=f'{key}_p95'))
+        fig.add_trace(go.Scatter(x=YEARS, y=[], mode="lines", line=dict(width=0), fill='tonexty',
+                                 fillcolor=f'rgba({color},0.2)', name=f"{name} P5–P95 ($M)", visible=False, uid=f'{key}_p5'))
+        fig.add_trace(go.Scatter(x=YEARS, y=[], mode="lines", name=f"{name} P50 ($M)", line=dict(color=f'rgb({color})', dash='dot'), visible=False,
+                                 uid=f'{key}_p50'))
+    fig.add_trace(go.Scatter(x=YEARS, y=row['revenues'], mode="lines+markers", name="Revenue ($M)", line=dict(color='#00d4ff'), uid='revenues'))
+    fig.add_trace(go.Scatter(x=YEARS, y=row['net_no_amort'], mode="lines+markers", name="Net Profit (No Amort) ($M)", line=dict(color='#ff6b6b'),
+                             uid='net_no_amort'))
+    fig.update_layout(template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0.3)',
+                      font=dict(color='white'), xaxis=dict(title="Year", gridcolor='rgba(255,255,255,0.1)'),
+                      yaxis=dict(title="Amount ($M)", gridcolor='rgba(255,255,255,0.1)'), legend=dict(bgcolor='rgba(0,0,0,0.5)'))
+    return fig
+
+def projection_table(row):
+    from dash import dash_table
+    records = [{"Year": year, "Revenue ($M)": rev, "Net Profit (No Amort) ($M)": net}
+               for year, rev, net in zip(YEARS, table_column(row['revenues']), table_column(row['net_no_amort']))]
+    return dash_table.DataTable(id='projection-table-data', data=records, columns=[{"name": i, "id": i} for i in records[0]],
+                                style_table={'overflowX': 'auto'},
+                                style_cell={'backgroundColor': 'rgba(0,0,0,0.3)', 'color': 'white',
+                                          'border': '1px solid rgba(255,255,255,0.1)', 'textAlign': 'center', 'padding': '10px'},
+                                style_header={'backgroundColor': 'rgba(0,0,0,0.5)', 'fontWeight': 'bold',
+                                            'border': '1px solid rgba(255,255,255,0.2)'})
+
+def typed_array(values):
+    """Plotly typed-array spec (base64 float32): a quarter of the size of a JSON list and decoded without parsing."""
+    return {'dtype': 'f4', 'bdata': base64.b64encode(np.ascontiguousarray(values, dtype='<f4')).decode()}
+
+@functools.cache
+def compare_figure_layout():
+    import plotly.graph_objects as go
+    return go.Layout(template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0.3)', font=dict(color='white'),
+                     xaxis=dict(title="Year", gridcolor='rgba(255,255,255,0.1)'), yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+                     legend=dict(bgcolor='rgba(0,0,0,0.5)'), hovermode='closest', uirevision='compare').to_plotly_json()
+
+def build_compare_figure(scenarios, series, x_range=None):
+    """WebGL line per saved scenario, min/max-downsampled to the visible x range.
+
+    The figure is a plain dict: validating hundreds of go.Scattergl traces
+    costs more than computing them.
+    """
+    layout = compare_figure_layout()
+    label = scenario_compare.SERIES[series]
+    if not scenarios:
+        return {'data': [], 'layout': {**layout, 'title': {'text': "Save scenarios to compare them"}}}
+    with instrumentation.phase('model'):
+        names, result = scenario_compare.project(scenarios)
+    with instrumentation.phase('downsample'):
+        xs, ys = scenario_compare.downsample(result['time'], result[series], x_range=x_range)
+    with instrumentation.phase('figure'):
+        data = [{'type': 'scattergl', 'mode': 'lines', 'name': name, 'x': typed_array(x), 'y': typed_array(y),
+                 'hovertemplate': "Year %{x:.2f}<br>$%{y:,.1f}M"} for name, x, y in zip(names, xs, ys)]
+    return {'data': data, 'layout': {**layout, 'title': {'text': f"{label} ($M, monthly)"},
+                                     'yaxis': {**layout['yaxis'], 'title': {'text': f"{label} ($M)"}}}}
+
+def compare_table():
+    from dash import dash_table
+    from dash.dash_table.Format import Format, Group, Scheme
+    money = Format(precision=1, scheme=Scheme.fixed, group=Group.yes)
+    columns = ([{'name': "Scenario", 'id': 'scenario', 'type': 'text'}, {'name': "Year", 'id': 'year', 'type': 'numeric'},
+                {'name': "Month", 'id': 'month', 'type': 'numeric'}] +
+               [{'name': f"{label} ($M)", 'id': name, 'type': 'numeric', 'format': money} for name, label in scenario_compare.SERIES.items()])
+    # Paging, sorting and filtering run on the server (update_compare_table); only the rows in view are rendered
+    return dash_table.DataTable(id='compare-table', columns=columns, data=[], page_action='custom', page_current=0,
+                                page_size=COMPARE_PAGE_SIZE, page_count=1, sort_action='custom', sort_mode='multi', sort_by=[],
+                                filter_action='custom', filter_query='', virtualization=True, fixed_rows={'headers': True},
+                                style_table={'height': '420px', 'overflowY': 'auto'},
+                                style_cell={'backgroundColor': 'rgba(0,0,0,0.3)', 'color': 'white', 'minWidth': '110px',
+                                            'border': '1px solid rgba(255,255,255,0.1)', 'textAlign': 'center', 'padding': '6px'},
+                                style_filter={'backgroundColor': 'rgba(255,255,255,0.08)'},
+                                style_header={'backgroundColor': 'rgba(0,0,0,0.5)', 'fontWeight': 'bold',
+                                              'border': '1px solid rgba(255,255,255,0.2)'})
+
+
+# Layout: the static sidebars are built once per process; the initial figure is only built when the layout
+# has to be serialized, i.e. not when the cached layout JSON is served
+@functools.cache
+def build_left_sidebar():
+    from dash import dcc, html
+    import dash_bootstrap_components as dbc
+    return html.Div([
+        html.H3("⚙️ Parameters", className="text-white mb-4"),
         html.Div([
-            dbc.Checklist(id='manual-amort', options=[{'label': ' Manual override', 'value': 1}],
-                         value=[], className='text-white', style={'fontSize': '0.9rem'}),
-            html.Span(" ℹ️", id="manual-amort-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
-            dbc.Tooltip(TOOLTIPS['manual-amort'], target="manual-amort-tooltip-icon", placement="right"),
-        ], className='mb-3'),
-        create_input_with_tooltip("Manual Annual Amortization ($M)", "manual-amort-value", TOOLTIPS['manual-amort-value'],
-            dcc.Input(id='manual-amort-value', type='number', value=570.0, step=1.0, className='form-control form-control-sm',
-                     style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
-    ], style={'background': 'rgba(255, 255, 255, 0.06)', 'borderRadius': '10px', 'padding': '15px'}),
-], id='left-sidebar', style=LEFT_SIDEBAR_STYLE)
-
-# Right Sidebar
-# Right Sidebar
-right_sidebar = html.Div([
-    html.H4("📖 Space Game Arena – Concept Summary", className="text-white mb-4", style={'fontSize': '1.1rem'}),
+            create_input_with_tooltip("Crew Members", "crew-count", TOOLTIPS['crew-count'],
+                dcc.Input(id='crew-count', type='number', value=15, min=1, max=50, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            create_input_with_tooltip("Contestants", "contestant-count", TOOLTIPS['contestant-count'],
+                dcc.Input(id='contestant-count', type='number', value=12, min=1, max=50, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            html.Div([
+                dbc.Checklist(id='include-spectators', options=[{'label': ' Enable Spectators (Phase 2)', 'value': 1}],
+                             value=[], className='text-white', style={'fontSize': '0.9rem'}),
+                html.Span(" ℹ️", id="include-spectators-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
+                dbc.Tooltip(TOOLTIPS['include-spectators'], target="include-spectators-tooltip-icon", placement="right"),
+            ], className='mb-3'),
+            create_input_with_tooltip("Spectators", "spectator-count", TOOLTIPS['spectator-count'],
+                dcc.Input(id='spectator-count', type='number', value=0, min=0, max=200, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            create_input_with_tooltip("Ticket Price / Spectator ($M)", "ticket-price", TOOLTIPS['ticket-price'],
+                dcc.Input(id='ticket-price', type='number', value=60.0, min=0, step=0.5, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            html.Div([
+                dbc.Checklist(id='scale-capex', options=[{'label': ' Scale CAPEX for extra capacity', 'value': 1}],
+                             value=[], className='text-white', style={'fontSize': '0.9rem'}),
+                html.Span(" ℹ️", id="scale-capex-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
+                dbc.Tooltip(TOOLTIPS['scale-capex'], target="scale-capex-tooltip-icon", placement="right"),
+            ], className='mb-3'),
+            html.Hr(className='bg-secondary'),
+            html.H5("CAPEX Amortization", className="text-white mb-3", style={'fontSize': '1rem'}),
+            html.Div([
+                dbc.Checklist(id='use-amort', options=[{'label': ' Amortize CAPEX', 'value': 1}],
+                             value=[1], className='text-white', style={'fontSize': '0.9rem'}),
+                html.Span(" ℹ️", id="use-amort-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
+                dbc.Tooltip(TOOLTIPS['use-amort'], target="use-amort-tooltip-icon", placement="right"),
+            ], className='mb-3'),
+            create_input_with_tooltip("Amortization Period (years)", "amort-years", TOOLTIPS['amort-years'],
+                dcc.Input(id='amort-years', type='number', value=10, min=1, max=50, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            html.Div([
+                dbc.Checklist(id='manual-amort', options=[{'label': ' Manual override', 'value': 1}],
+                             value=[], className='text-white', style={'fontSize': '0.9rem'}),
+                html.Span(" ℹ️", id="manual-amort-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
+                dbc.Tooltip(TOOLTIPS['manual-amort'], target="manual-amort-tooltip-icon", placement="right"),
+            ], className='mb-3'),
+            create_input_with_tooltip("Manual Annual Amortization ($M)", "manual-amort-value", TOOLTIPS['manual-amort-value'],
+                dcc.Input(id='manual-amort-value', type='number', value=570.0, min=0, step=1.0, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            html.Hr(className='bg-secondary'),
+            html.H5("Investment Metrics", className="text-white mb-3", style={'fontSize': '1rem'}),
+            create_input_with_tooltip("Discount Rate (%)", "discount-rate", TOOLTIPS['discount-rate'],
+                dcc.Input(id='discount-rate', type='number', value=DEFAULT_DISCOUNT_RATE, min=0, max=100, step=0.5, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            html.Hr(className='bg-secondary'),
+            html.H5("Monte Carlo Risk", className="text-white mb-3", style={'fontSize': '1rem'}),
+            html.Div([
+                dbc.Checklist(id='mc-enable', options=[{'label': ' Show risk bands', 'value': 1}],
+                             value=[], className='text-white', style={'fontSize': '0.9rem'}),
+                html.Span(" ℹ️", id="mc-enable-tooltip-icon", style={'cursor': 'pointer', 'marginLeft': '5px', 'color': '#f0f0f0'}),
+                dbc.Tooltip(TOOLTIPS['mc-enable'], target="mc-enable-tooltip-icon", placement="right"),
+            ], className='mb-3'),
+            create_input_with_tooltip("Draws", "mc-draws", TOOLTIPS['mc-draws'],
+                dcc.Input(id='mc-draws', type='number', value=100000, min=1000, max=5000000, step=1000, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+            dbc.Progress(id='mc-progress', value=0, striped=True, animated=True, style=PROGRESS_HIDDEN),
+        ], style={'background': 'rgba(255, 255, 255, 0.06)', 'borderRadius': '10px', 'padding': '15px'}),
+    ], id='left-sidebar', style=LEFT_SIDEBAR_STYLE)
+
+@functools.cache
+def build_right_sidebar():
+    from dash import html
+    return html.Div([
+        html.H4("📖 Space Game Arena – Concept Summary", className="text-white mb-4", style={'fontSize': '1.1rem'}),
     
-    html.Div([
-        html.H6("Core Assumptions", className="text-white mt-2 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ul([
-            html.Li([html.Strong("Location:"), " Suborbital station (safer + cheaper vs. LEO)."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Mass:"), " ~300 t base module; expandable to ~400 t."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Usable Area:"), " ~9,500 sq ft across multiple decks."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Crew:"), " 15–17 (ops, coaches, medical, engineers, mission control)."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Transport:"), " SpaceX Starship-class for cargo; Crew Dragon for people."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Compliance:"), " Human-rated, NASA/FAA/ESA standards."], className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+        html.Div([
+            html.H6("Core Assumptions", className="text-white mt-2 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ul([
+                html.Li([html.Strong("Location:"), " Suborbital station (safer + cheaper vs. LEO)."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Mass:"), " ~300 t base module; expandable to ~400 t."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Usable Area:"), " ~9,500 sq ft across multiple decks."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Crew:"), " 15–17 (ops, coaches, medical, engineers, mission control)."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Transport:"), " SpaceX Starship-class for cargo; Crew Dragon for people."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Compliance:"), " Human-rated, NASA/FAA/ESA standards."], className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+        
+            html.H6("Deck Layout (Modular Station Design)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ul([
+                html.Li([html.Strong("Deck A — Play Arena #1 (2,600 sq ft):"), " Physical, open competitions."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Deck B — Play Arena #2 (2,200 sq ft):"), " Puzzle/object-interaction games."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Deck C — Spectator & Media (2,000 sq ft, 40–80 seats):"), " Live viewing & broadcasting."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Deck D — Crew/Medical/Control (2,768 sq ft):"), " Quarters, medbay, operations."], className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+        
+            html.H6("CAPEX (Upfront Investment)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ul([
+                html.Li([html.Strong("Without spectator module (~300 t):"), " ~$5.7B."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("With spectator module (~400 t):"), " ~$7.2B."], className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+            html.P("Breakdown: R&D, habitat construction, life support, medical & ops, launches, regulatory/legal.", 
+                   className="text-white-50", style={'fontSize': '0.75rem', 'fontStyle': 'italic', 'marginLeft': '20px'}),
         
-        html.H6("Deck Layout (Modular Station Design)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ul([
-            html.Li([html.Strong("Deck A — Play Arena #1 (2,600 sq ft):"), " Physical, open competitions."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Deck B — Play Arena #2 (2,200 sq ft):"), " Puzzle/object-interaction games."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Deck C — Spectator & Media (2,000 sq ft, 40–80 seats):"), " Live viewing & broadcasting."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Deck D — Crew/Medical/Control (2,768 sq ft):"), " Quarters, medbay, operations."], className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+            html.H6("OPEX (Transport & Operations)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ul([
+                html.Li([html.Strong("Crew Deployment (one-time, 15 seats):"), " ~$975M."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Contestants (12 per year, 3-month stay):"), " ~$780M/year."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Cargo (food, supplies, spares):"), " ~$60M/year."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Docked safety vehicle (Crew Dragon):"), " ~$44M/year (amortized)."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Crew Salaries (15 people):"), " ~$15M/year."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Contestant Compensation:"), " ~$2.4M/year."], className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+            html.P(
+                [html.Strong("➡ Year 1 Total:"), " ~$1.87B (includes initial crew deployment)."], 
+                style={
+                    'color': '#00ffff',            # bright cyan for vibrancy
+                    'fontSize': '0.85rem',         # slightly larger for readability
+                    'marginLeft': '20px',
+                    'marginTop': '8px',
+                    'fontWeight': '500'
+                }
+            ),
+            html.P(
+                [html.Strong("➡ Recurring Annual OPEX:"), " ~$902M."], 
+                style={
+                    'color': '#00ffff',            # bright cyan for vibrancy
+                    'fontSize': '0.85rem',
+                    'marginLeft': '20px',
+                    'fontWeight': '500'
+                }
+            ),
+
+        
+            html.H6("Contestant Journey", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ol([
+                html.Li([html.Strong("Earth → Suborbital Station"), " via Crew Dragon (12 contestants)."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Stay Duration:"), " ~3 months."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Gameplay Areas:"), html.Ul([
+                    html.Li("Deck A (physical games).", className="text-white-50"),
+                    html.Li("Deck B (puzzles & interaction).", className="text-white-50"),
+                    html.Li("Deck D (crew support & safety).", className="text-white-50"),
+                ], style={'fontSize': '0.75rem', 'marginTop': '5px', 'paddingLeft': '20px'})], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Return to Earth"), " after contest."], className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+        
+            html.H6("Audience Journey", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ol([
+                html.Li([html.Strong("Ticket Purchase (Earth):"), " Online, TV, OTT platforms, YouTube."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Viewing Options:"), html.Ul([
+                    html.Li([html.Strong("Remote Streaming:"), " Live broadcast via TV, YouTube, OTT."], className="text-white-50"),
+                    html.Li([html.Strong("Onboard Viewing (Deck C):"), " Limited 40–80 seats, flown via Crew Dragon."], className="text-white-50"),
+                ], style={'fontSize': '0.75rem', 'marginTop': '5px', 'paddingLeft': '20px'})], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Spectators Return"), " to Earth after live experience."], className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
+        
+            html.H6("Revenue Streams", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ul([
+                html.Li("Broadcast Rights (TV & OTT).", className="text-white-50 mb-1"),
+                html.Li("Advertising & Sponsorship.", className="text-white-50 mb-1"),
+                html.Li("Ticket Sales (OTT/streaming).", className="text-white-50 mb-1"),
+                html.Li("Onboard Spectator Seats (future expansion).", className="text-white-50 mb-1"),
+                html.Li("Merchandise & Licensing.", className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
         
-        html.H6("CAPEX (Upfront Investment)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ul([
-            html.Li([html.Strong("Without spectator module (~300 t):"), " ~$5.7B."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("With spectator module (~400 t):"), " ~$7.2B."], className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
-        html.P("Breakdown: R&D, habitat construction, life support, medical & ops, launches, regulatory/legal.", 
-               className="text-white-50", style={'fontSize': '0.75rem', 'fontStyle': 'italic', 'marginLeft': '20px'}),
+            html.H6("Financial Outlook (10-Year Model)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
+            html.Ul([
+                html.Li([html.Strong("Revenue Growth:"), " +10% annually."], className="text-white-50 mb-1"),
+                html.Li([html.Strong("Profitability:"), html.Ul([
+                    html.Li([html.Strong("With amortization (CAPEX spread):"), " Breakeven ~Year 7–8."], className="text-white-50"),
+                    html.Li([html.Strong("Without amortization:"), " Breakeven later (after CAPEX fully absorbed)."], className="text-white-50"),
+                ], style={'fontSize': '0.75rem', 'marginTop': '5px', 'paddingLeft': '20px'})], className="text-white-50 mb-1"),
+                html.Li([html.Strong("By Year 10:"), " Business turns profitable with strong recurring margins."], className="text-white-50 mb-1"),
+            ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
         
-        html.H6("OPEX (Transport & Operations)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ul([
-            html.Li([html.Strong("Crew Deployment (one-time, 15 seats):"), " ~$975M."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Contestants (12 per year, 3-month stay):"), " ~$780M/year."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Cargo (food, supplies, spares):"), " ~$60M/year."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Docked safety vehicle (Crew Dragon):"), " ~$44M/year (amortized)."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Crew Salaries (15 people):"), " ~$15M/year."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Contestant Compensation:"), " ~$2.4M/year."], className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
-        html.P(
-            [html.Strong("➡ Year 1 Total:"), " ~$1.87B (includes initial crew deployment)."], 
+        ], style={'background': 'rgba(255, 255, 255, 0.06)', 'borderRadius': '10px', 'padding': '15px'}),
+    ], id='right-sidebar', style=RIGHT_SIDEBAR_STYLE)
+
+def build_content(inputs, initial_row, initial_investment, image_sources):
+    from dash import dcc, html
+    import dash_bootstrap_components as dbc
+    from layout_cache import Deferred
+    return html.Div([
+        html.H1(
+            "🚀 Space Game Arena: Play in Orbit",
             style={
-                'color': '#00ffff',            # bright cyan for vibrancy
-                'fontSize': '0.85rem',         # slightly larger for readability
-                'marginLeft': '20px',
-                'marginTop': '8px',
-                'fontWeight': '500'
+                'color': '#00CED1',             # DarkTurquoise — vibrant but readable
+                'fontSize': '3rem',             # larger font for visibility
+                'fontWeight': '700',
+                'textAlign': 'center',
+                'marginBottom': '20px',
+                'textShadow': '0 0 8px rgba(0, 206, 209, 0.6)'  # soft glow matching text color
             }
         ),
-        html.P(
-            [html.Strong("➡ Recurring Annual OPEX:"), " ~$902M."], 
+
+        html.H3(
+            "📊 Key Financial Metrics",
             style={
-                'color': '#00ffff',            # bright cyan for vibrancy
-                'fontSize': '0.85rem',
-                'marginLeft': '20px',
-                'fontWeight': '500'
+                'color': '#FFA500',             # Orange — high contrast
+                'fontSize': '2rem',             # larger font
+                'fontWeight': '600',
+                'textAlign': 'center',
+                'marginBottom': '16px',
+                'textShadow': '0 0 6px rgba(255, 165, 0, 0.5)'  # soft glow
             }
         ),
 
-        
-        html.H6("Contestant Journey", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ol([
-            html.Li([html.Strong("Earth → Suborbital Station"), " via Crew Dragon (12 contestants)."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Stay Duration:"), " ~3 months."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Gameplay Areas:"), html.Ul([
-                html.Li("Deck A (physical games).", className="text-white-50"),
-                html.Li("Deck B (puzzles & interaction).", className="text-white-50"),
-                html.Li("Deck D (crew support & safety).", className="text-white-50"),
-            ], style={'fontSize': '0.75rem', 'marginTop': '5px', 'paddingLeft': '20px'})], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Return to Earth"), " after contest."], className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
-        
-        html.H6("Audience Journey", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ol([
-            html.Li([html.Strong("Ticket Purchase (Earth):"), " Online, TV, OTT platforms, YouTube."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Viewing Options:"), html.Ul([
-                html.Li([html.Strong("Remote Streaming:"), " Live broadcast via TV, YouTube, OTT."], className="text-white-50"),
-                html.Li([html.Strong("Onboard Viewing (Deck C):"), " Limited 40–80 seats, flown via Crew Dragon."], className="text-white-50"),
-            ], style={'fontSize': '0.75rem', 'marginTop': '5px', 'paddingLeft': '20px'})], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Spectators Return"), " to Earth after live experience."], className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
-        
-        html.H6("Revenue Streams", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ul([
-            html.Li("Broadcast Rights (TV & OTT).", className="text-white-50 mb-1"),
-            html.Li("Advertising & Sponsorship.", className="text-white-50 mb-1"),
-            html.Li("Ticket Sales (OTT/streaming).", className="text-white-50 mb-1"),
-            html.Li("Onboard Spectator Seats (future expansion).", className="text-white-50 mb-1"),
-            html.Li("Merchandise & Licensing.", className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
-        
-        html.H6("Financial Outlook (10-Year Model)", className="text-white mt-3 mb-2", style={'fontSize': '0.95rem', 'fontWeight': 'bold'}),
-        html.Ul([
-            html.Li([html.Strong("Revenue Growth:"), " +10% annually."], className="text-white-50 mb-1"),
-            html.Li([html.Strong("Profitability:"), html.Ul([
-                html.Li([html.Strong("With amortization (CAPEX spread):"), " Breakeven ~Year 7–8."], className="text-white-50"),
-                html.Li([html.Strong("Without amortization:"), " Breakeven later (after CAPEX fully absorbed)."], className="text-white-50"),
-            ], style={'fontSize': '0.75rem', 'marginTop': '5px', 'paddingLeft': '20px'})], className="text-white-50 mb-1"),
-            html.Li([html.Strong("By Year 10:"), " Business turns profitable with strong recurring margins."], className="text-white-50 mb-1"),
-        ], style={'fontSize': '0.8rem', 'paddingLeft': '20px'}),
-        
-    ], style={'background': 'rgba(255, 255, 255, 0.06)', 'borderRadius': '10px', 'padding': '15px'}),
-], id='right-sidebar', style=RIGHT_SIDEBAR_STYLE)
-
-# Toggle Buttons
-left_toggle = html.Button("◀", id='left-toggle', style={**TOGGLE_BUTTON_STYLE, 'left': '290px'})
-right_toggle = html.Button("▶", id='right-toggle', style={**TOGGLE_BUTTON_STYLE, 'right': '330px'})
-
-# Main Content
-content = html.Div([
-    html.H1(
-        "🚀 Space Game Arena: Play in Orbit",
-        style={
-            'color': '#00CED1',             # DarkTurquoise — vibrant but readable
-            'fontSize': '3rem',             # larger font for visibility
-            'fontWeight': '700',
-            'textAlign': 'center',
-            'marginBottom': '20px',
-            'textShadow': '0 0 8px rgba(0, 206, 209, 0.6)'  # soft glow matching text color
-        }
-    ),
-
-    html.H3(
-        "📊 Key Financial Metrics",
-        style={
-            'color': '#FFA500',             # Orange — high contrast
-            'fontSize': '2rem',             # larger font
-            'fontWeight': '600',
-            'textAlign': 'center',
-            'marginBottom': '16px',
-            'textShadow': '0 0 6px rgba(255, 165, 0, 0.5)'  # soft glow
-        }
-    ),
-
-    dbc.Row([
-        dbc.Col(dbc.Card([dbc.CardBody([
-            html.Div([
-                html.H6(["Total CAPEX ", html.Span("ℹ️", id="total-capex-tooltip-icon", style={'cursor': 'pointer'})], 
-                       className="text-white", style={'marginBottom': '8px'}),
-                dbc.Tooltip(TOOLTIPS['total-capex'], target="total-capex-tooltip-icon", placement="top"),
-                html.H4(id='metric-capex', className="text-white", style={'fontWeight': 'bold'})
-            ])
-        ])], style={'background': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)', 'border': 'none'}), width=3),
-        
-        dbc.Col(dbc.Card([dbc.CardBody([
-            html.Div([
-                html.H6(["Year 1 OPEX ", html.Span("ℹ️", id="year1-opex-tooltip-icon", style={'cursor': 'pointer'})], 
-                       className="text-white", style={'marginBottom': '8px'}),
-                dbc.Tooltip(TOOLTIPS['year1-opex'], target="year1-opex-tooltip-icon", placement="top"),
-                html.H4(id='metric-year1-opex', className="text-white", style={'fontWeight': 'bold'})
-            ])
-        ])], style={'background': 'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)', 'border': 'none'}), width=3),
-        
-        dbc.Col(dbc.Card([dbc.CardBody([
-            html.Div([
-                html.H6(["Recurring OPEX ", html.Span("ℹ️", id="recurring-opex-tooltip-icon", style={'cursor': 'pointer'})], 
-                       className="text-white", style={'marginBottom': '8px'}),
-                dbc.Tooltip(TOOLTIPS['recurring-opex'], target="recurring-opex-tooltip-icon", placement="top"),
-                html.H4(id='metric-recurring-opex', className="text-white", style={'fontWeight': 'bold'})
-            ])
-        ])], style={'background': 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)', 'border': 'none'}), width=3),
-        
-        dbc.Col(dbc.Card([dbc.CardBody([
-            html.Div([
-                html.H6(["Year 1 Revenue ", html.Span("ℹ️", id="year1-revenue-tooltip-icon", style={'cursor': 'pointer'})], 
-                       className="text-white", style={'marginBottom': '8px'}),
-                dbc.Tooltip(TOOLTIPS['year1-revenue'], target="year1-revenue-tooltip-icon", placement="top"),
-                html.H4(id='metric-revenue', className="text-white", style={'fontWeight': 'bold'})
-            ])
-        ])], style={'background': 'linear-gradient(135deg, #30cfd0 0%, #330867 100%)', 'border': 'none'}), width=3),
-    ], className="mb-4"),
-    # ADD these lines right after the above line and BEFORE dcc.Graph:
-html.Div([
-    html.Img(
-        src=encoded_image if encoded_image else "",
-        style={
-            'width': '100%',
-            'maxWidth': '800px',
-            'height': 'auto',
-            'display': 'block',
-            'margin': '0 auto 20px auto',
-            'borderRadius': '10px',
-            'boxShadow': '0 4px 6px rgba(0,0,0,0.3)'
-        }
-    ) if encoded_image else html.Div(
-        "Image not found",
-        style={'textAlign': 'center', 'color': '#ff6b6b', 'marginBottom': '20px'}
-    )
-], style={'marginBottom': '20px'}),
-    html.H3("📈 10-Year Trends", className="text-white mb-3"),
-    dcc.Graph(id='profit-chart', style={'height': '500px'}),
-    html.H3("📋 Projection Table", className="text-white mt-4 mb-3"),
-    html.Div(id='projection-table'),
-], id='main-content', style=CONTENT_STYLE)
-
-# Layout
-app.layout = html.Div([left_toggle, right_toggle, left_sidebar, content, right_sidebar,
-                       dcc.Store(id='left-sidebar-state', data=True), dcc.Store(id='right-sidebar-state', data=True)])
+        dbc.Row([
+            create_metric_card("Total CAPEX", 'total-capex', 'metric-capex', billions(initial_row['total_capex']),
+                               'linear-gradient(135deg, #667eea 0%, #764ba2 100%)'),
+            create_metric_card("Year 1 OPEX", 'year1-opex', 'metric-year1-opex', billions(initial_row['year1_opex']),
+                               'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)'),
+            create_metric_card("Recurring OPEX", 'recurring-opex', 'metric-recurring-opex', billions(initial_row['annual_opex']),
+                               'linear-gradient(135deg, #fa709a 0%, #fee140 100%)'),
+            create_metric_card("Year 1 Revenue", 'year1-revenue', 'metric-revenue', billions(initial_row['year1_revenue']),
+                               'linear-gradient(135deg, #30cfd0 0%, #330867 100%)'),
+        ], className="mb-4"),
+        dbc.Row([
+            create_metric_card("10-Year NPV", 'npv', 'metric-npv', initial_investment[0], 'linear-gradient(135deg, #43e97b 0%, #38f9d7 100%)'),
+            create_metric_card("IRR", 'irr', 'metric-irr', initial_investment[1], 'linear-gradient(135deg, #4facfe 0%, #00f2fe 100%)'),
+            create_metric_card("Discounted Payback", 'discounted-payback', 'metric-discounted-payback', initial_investment[2],
+                               'linear-gradient(135deg, #a18cd1 0%, #fbc2eb 100%)'),
+            create_metric_card("Breakeven", 'breakeven', 'metric-breakeven', initial_investment[3], 'linear-gradient(135deg, #f6d365 0%, #fda085 100%)'),
+        ], className="mb-4"),
+        # ADD these lines right after the above line and BEFORE dcc.Graph:
+    html.Div([
+        html.Img(
+            alt="Space Game Arena one-page financial summary",
+            width=image_sources['width'], height=image_sources['height'],
+            sizes="(max-width: 800px) 100vw, 800px",
+            style={
+                'width': '100%',
+                'maxWidth': '800px',
+                'height': 'auto',
+                'display': 'block',
+                'margin': '0 auto 20px auto',
+                'borderRadius': '10px',
+                'boxShadow': '0 4px 6px rgba(0,0,0,0.3)'
+            },
+            **{'data-src': image_sources['src'], 'data-srcset': image_sources['srcset']}
+        ) if image_sources else html.Div(
+            "Image not found",
+            style={'textAlign': 'center', 'color': '#ff6b6b', 'marginBottom': '20px'}
+        )
+    ], style={'marginBottom': '20px'}),
+        html.H3("📈 10-Year Trends", className="text-white mb-3"),
+        dcc.Graph(id='profit-chart', figure=Deferred(build_profit_figure, initial_row), style={'height': '500px'}),
+        html.H3("📋 Projection Table", className="text-white mt-4 mb-3"),
+        html.Div(projection_table(initial_row), id='projection-table'),
+        html.H3("🌪️ Sensitivity Analysis", className="text-white mt-4 mb-3"),
+        dbc.Row([
+            dbc.Col(create_input_with_tooltip("Perturbation (±%)", "sens-pct", TOOLTIPS['sens-pct'],
+                dcc.Input(id='sens-pct', type='number', value=SENSITIVITY_DEFAULTS[0], min=1, max=100, step=1, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})), width=3),
+            dbc.Col([dbc.Label("Profit Measure", className="text-white-50"),
+                     dcc.Dropdown(id='sens-metric', options=[{'label': 'Net Profit (No Amort)', 'value': 'net_no_amort'},
+                                                             {'label': 'Net Profit (With Amort)', 'value': 'net_with_amort'}],
+                                  value=SENSITIVITY_DEFAULTS[1], clearable=False)], width=3),
+            dbc.Col([dbc.Label("Heatmap X", className="text-white-50"),
+                     dcc.Dropdown(id='heatmap-x', options=SENSITIVITY_OPTIONS, value=SENSITIVITY_DEFAULTS[2], clearable=False)], width=3),
+            dbc.Col([dbc.Label("Heatmap Y", className="text-white-50"),
+                     dcc.Dropdown(id='heatmap-y', options=SENSITIVITY_OPTIONS, value=SENSITIVITY_DEFAULTS[3], clearable=False)], width=3),
+        ], className="mb-3"),
+        dbc.Progress(id='sens-progress', value=0, striped=True, animated=True, style=PROGRESS_HIDDEN),
+        dbc.Row([
+            dbc.Col(dcc.Graph(id='tornado-chart', figure=Deferred(tornado_figure, inputs, *SENSITIVITY_DEFAULTS[:2]), style={'height': '600px'}),
+                    width=6),
+            dbc.Col(dcc.Graph(id='sensitivity-heatmap', figure=Deferred(heatmap_figure, inputs, *SENSITIVITY_DEFAULTS, HEATMAP_PREVIEW_STEPS), style={'height': '600px'}),
+                    width=6),
+        ]),
+        html.H3("🎯 Goal Seek", className="text-white mt-4 mb-3"),
+        dbc.Row([
+            dbc.Col([dbc.Label("Solve For", className="text-white-50"),
+                     dcc.Dropdown(id='goal-param', options=[{'label': label, 'value': name} for name, (label, _, _) in GOAL_PARAMS.items()],
+                                  value=GOAL_SEEK_DEFAULTS[0], clearable=False)], width=4),
+            dbc.Col([dbc.Label("Target", className="text-white-50"),
+                     dcc.Dropdown(id='goal-target', options=[{'label': 'Breakeven by year N', 'value': 'breakeven'},
+                                                             {'label': 'NPV by year N', 'value': 'npv'},
+                                                             {'label': 'Cumulative margin by year N', 'value': 'margin'}],
+                                  value=GOAL_SEEK_DEFAULTS[1], clearable=False)], width=4),
+            dbc.Col(create_input_with_tooltip("Target Value", "goal-value", TOOLTIPS['goal-value'],
+                dcc.Input(id='goal-value', type='number', value=GOAL_SEEK_DEFAULTS[2], step=1, className='form-control form-control-sm',
+                         style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})), width=4),
+        ], className="mb-3"),
+        dcc.Graph(id='goal-seek-chart', figure=Deferred(goal_seek_figure, inputs, DEFAULT_DISCOUNT_RATE / 100, *GOAL_SEEK_DEFAULTS),
+                  style={'height': '450px'}),
+        html.H3("🧭 Optimizer", className="text-white mt-4 mb-3"),
+        dbc.Row([
+            dbc.Col(create_input_with_tooltip("Objective", "opt-objective", TOOLTIPS['opt-objective'],
+                dcc.Dropdown(id='opt-objective', options=OPTIMIZER_OBJECTIVES, value='npv', clearable=False)), width=4),
+            dbc.Col(dbc.Button("🔍 Optimize", id='opt-run', color='info', size='sm'), width=2, className='d-flex align-items-center'),
+            dbc.Col(html.Div(id='opt-best', className="text-white-50", style={'fontSize': '0.9rem'}), width=6,
+                    className='d-flex align-items-center'),
+        ], className="mb-3"),
+        dbc.Progress(id='opt-progress', value=0, striped=True, animated=True, style=PROGRESS_HIDDEN),
+        dcc.Graph(id='opt-front', style={'height': '450px'}),
+        html.H3("🧪 Scenario Comparison", className="text-white mt-4 mb-3"),
+        dbc.Row([
+            dbc.Col(create_input_with_tooltip("Scenario Name", "compare-name", TOOLTIPS['compare-name'],
+                dcc.Input(id='compare-name', type='text', value='', placeholder="e.g. 40 spectators, $80M", debounce=True,
+                          className='form-control form-control-sm', style={'background': '#2c3e50', 'color': 'white', 'border': '1px solid #4a5f7f'})),
+                    width=4),
+            dbc.Col([dbc.Button("💾 Save Scenario", id='compare-save', color='info', size='sm', className='me-2'),
+                     dbc.Button("🗑️ Delete Selected", id='compare-delete', color='secondary', size='sm')],
+                    width=4, className='d-flex align-items-center'),
+            dbc.Col([dbc.Label("Series", className="text-white-50"),
+                     dcc.Dropdown(id='compare-series', options=COMPARE_SERIES_OPTIONS, value='cash_position', clearable=False)], width=4),
+        ], className="mb-3"),
+        dcc.Dropdown(id='compare-select', options=[], value=[], multi=True, placeholder="Saved scenarios to overlay", className="mb-3"),
+        dcc.Graph(id='compare-chart', style={'height': '500px'}),
+        html.Div(id='compare-table-count', className="text-white-50 mt-3 mb-2"),
+        compare_table(),
+    ], id='main-content', style=CONTENT_STYLE)
+
+def build_layout(image_sources):
+    from dash import dcc, html
+    # The layout ships with results for the initial sidebar and control values, so no model callback runs on page load
+    inputs = scenario_engine.normalize_inputs()
+    content = build_content(inputs, model_row(inputs), investment_metrics(inputs, DEFAULT_DISCOUNT_RATE / 100), image_sources)
+    left_toggle = html.Button("◀", id='left-toggle', style={**TOGGLE_BUTTON_STYLE, 'left': '290px'})
+    right_toggle = html.Button("▶", id='right-toggle', style={**TOGGLE_BUTTON_STYLE, 'right': '330px'})
+    return html.Div([left_toggle, right_toggle, build_left_sidebar(), content, build_right_sidebar(),
+                     dcc.Store(id='left-sidebar-state', data=True), dcc.Store(id='right-sidebar-state', data=True),
+                     dcc.Store(id='mc-request'), dcc.Store(id='saved-scenarios', storage_type='local')])
 
 # Sidebar toggle callbacks
-@app.callback([Output('left-sidebar', 'style'), Output('left-toggle', 'children'), Output('left-toggle', 'style'), Output('left-sidebar-state', 'data')],
-              [Input('left-toggle', 'n_clicks')], [State('left-sidebar-state', 'data')])
 def toggle_left_sidebar(n_clicks, is_open):
     if n_clicks is None:
         return LEFT_SIDEBAR_STYLE, "◀", {**TOGGLE_BUTTON_STYLE, 'left': '290px'}, True
     is_open = not is_open
     return (LEFT_SIDEBAR_STYLE, "◀", {**TOGGLE_BUTTON_STYLE, 'left': '290px'}, True) if is_open else (LEFT_SIDEBAR_COLLAPSED, "▶", {**TOGGLE_BUTTON_STYLE, 'left': '10px'}, False)
 
-@app.callback([Output('right-sidebar', 'style'), Output('right-toggle', 'children'), Output('right-toggle', 'style'), Output('right-sidebar-state', 'data')],
-              [Input('right-toggle', 'n_clicks')], [State('right-sidebar-state', 'data')])
 def toggle_right_sidebar(n_clicks, is_open):
     if n_clicks is None:
         return RIGHT_SIDEBAR_STYLE, "▶", {**TOGGLE_BUTTON_STYLE, 'right': '330px'}, True
     is_open = not is_open
     return (RIGHT_SIDEBAR_STYLE, "▶", {**TOGGLE_BUTTON_STYLE, 'right': '330px'}, True) if is_open else (RIGHT_SIDEBAR_COLLAPSED, "◀", {**TOGGLE_BUTTON_STYLE, 'right': '10px'}, False)
 
-@app.callback(Output('main-content', 'style'), [Input('left-sidebar-state', 'data'), Input('right-sidebar-state', 'data')])
 def adjust_content_margins(left_open, right_open):
     style = CONTENT_STYLE.copy()
     if not left_open:
@@ -360,83 +597,337 @@ def adjust_content_margins(left_open, right_open):
         style['marginRight'] = '20px'
     return style
 
-# Main calculation callback
-@app.callback([Output('metric-capex', 'children'), Output('metric-year1-opex', 'children'), Output('metric-recurring-opex', 'children'),
-               Output('metric-revenue', 'children'), Output('profit-chart', 'figure'), Output('projection-table', 'children')],
-              [Input('crew-count', 'value'), Input('contestant-count', 'value'), Input('include-spectators', 'value'),
-               Input('spectator-count', 'value'), Input('ticket-price', 'value'), Input('scale-capex', 'value'),
-               Input('use-amort', 'value'), Input('amort-years', 'value'), Input('manual-amort', 'value'), Input('manual-amort-value', 'value')])
-def update_dashboard(crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex, use_amort, amort_years, manual_amort, manual_amort_M):
-    crew_count = crew_count or 15
-    contestant_count = contestant_count or 12
-    spectator_count = spectator_count or 0
-    ticket_price = ticket_price or 60.0
-    amort_years = amort_years or 10
-    manual_amort_M = manual_amort_M or 570.0
-    
-    include_spec = len(include_spectators) > 0
-    scale_cap = len(scale_capex) > 0
-    use_am = len(use_amort) > 0
-    manual_am = len(manual_amort) > 0
-    
-    # CAPEX
-    total_capex = capex_phase1 + (capex_phase2_additional if include_spec else 0)
-    if scale_cap:
-        extra_people = max(crew_count - baseline_crew, 0) + max(contestant_count - baseline_contestants, 0) + max(spectator_count - baseline_spectators, 0)
-        total_capex += extra_people * capex_per_extra_person
-    
-    # OPEX
-    year1_opex = (crew_count * crew_cost_per + contestant_count * contestant_cost_per + 
-                  (spectator_count * spectator_transport_cost_per if include_spec else 0) +
-                  crew_count * crew_salary_per + contestant_count * prize_pool_per_contestant +
-                  (crew_count + contestant_count + (spectator_count if include_spec else 0)) * cargo_per_person + docked_vehicle_cost)
-    
-    annual_opex = (contestant_count * contestant_cost_per + 
-                   (spectator_count * spectator_transport_cost_per if include_spec else 0) +
-                   crew_count * crew_salary_per + contestant_count * prize_pool_per_contestant +
-                   (crew_count + contestant_count + (spectator_count if include_spec else 0)) * cargo_per_person + docked_vehicle_cost)
-    
-    # Revenue
-    ticket_revenue = spectator_count * ticket_price * 1e6 if include_spec else 0
-    year1_revenue = ticket_revenue + sponsorship + broadcasting + vr_ar + merchandising
-    
-    years = list(range(1, 11))
-    revenues = [year1_revenue * ((1 + revenue_growth) ** (i - 1)) for i in years]
-    
-    # Amortization
-    annual_amortization = manual_amort_M * 1e6 if manual_am else (total_capex / amort_years if use_am else 0.0)
-    
-    # Profit
-    net_no_amort = []
-    for i, rev in enumerate(revenues, start=1):
-        opex = year1_opex if i == 1 else annual_opex
-        capex_this_year = total_capex if (i == 1 and not use_am) else 0.0
-        net_no_amort.append(rev - opex - capex_this_year)
-    
-    # Convert to millions
-    revenues_M = [r / 1e6 for r in revenues]
-    net_no_amort_M = [n / 1e6 for n in net_no_amort]
-    
-    # Chart
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=years, y=revenues_M, mode="lines+markers", name="Revenue ($M)", line=dict(color='#00d4ff')))
-    fig.add_trace(go.Scatter(x=years, y=net_no_amort_M, mode="lines+markers", name="Net Profit (No Amort) ($M)", line=dict(color='#ff6b6b')))
-    fig.update_layout(template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0.3)',
-                      font=dict(color='white'), xaxis=dict(title="Year", gridcolor='rgba(255,255,255,0.1)'),
-                      yaxis=dict(title="Amount ($M)", gridcolor='rgba(255,255,255,0.1)'), legend=dict(bgcolor='rgba(0,0,0,0.5)'))
-    
-    # Table
-    df = pd.DataFrame({"Year": years, "Revenue ($M)": [f"{v:,.0f}" for v in revenues_M],
-                       "Net Profit (No Amort) ($M)": [f"{v:,.0f}" for v in net_no_amort_M]})
-    
-    table = dash_table.DataTable(data=df.to_dict('records'), columns=[{"name": i, "id": i} for i in df.columns],
-                                 style_table={'overflowX': 'auto'},
-                                 style_cell={'backgroundColor': 'rgba(0,0,0,0.3)', 'color': 'white',
-                                           'border': '1px solid rgba(255,255,255,0.1)', 'textAlign': 'center', 'padding': '10px'},
-                                 style_header={'backgroundColor': 'rgba(0,0,0,0.5)', 'fontWeight': 'bold',
-                                             'border': '1px solid rgba(255,255,255,0.2)'})
-    
-    return f"${total_capex/1e9:.2f}B", f"${year1_opex/1e9:.2f}B", f"${annual_opex/1e9:.2f}B", f"${year1_revenue/1e9:.2f}B", fig, table
+# Model callbacks: each output only listens to the inputs it depends on, and the chart/table
+# are updated with Patch deltas instead of being rebuilt
+def update_capex_metric(crew_count, contestant_count, include_spectators, spectator_count, scale_capex):
+    inputs = scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count, scale_capex=scale_capex)
+    return billions(model_row(inputs)['total_capex'])
+
+def update_opex_metrics(crew_count, contestant_count, include_spectators, spectator_count):
+    row = model_row(scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count))
+    return billions(row['year1_opex']), billions(row['annual_opex'])
+
+def update_investment_metrics(crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex, discount_rate):
+    inputs = scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex)
+    return investment_metrics(inputs, (discount_rate if discount_rate is not None else DEFAULT_DISCOUNT_RATE) / 100)
+
+def update_revenue(include_spectators, spectator_count, ticket_price):
+    from dash import Patch
+    row = model_row(scenario_engine.normalize_inputs(include_spectators=include_spectators, spectator_count=spectator_count,
+                                                     ticket_price=ticket_price))
+    fig, table = Patch(), Patch()
+    fig['data'][TRACE_INDEX['revenues']]['y'] = row['revenues']
+    for i, value in enumerate(table_column(row['revenues'])):
+        table[i]['Revenue ($M)'] = value
+    return billions(row['year1_revenue']), fig, table
+
+def update_net_profit(crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex, use_amort):
+    from dash import Patch
+    row = model_row(scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count, ticket_price,
+                                                     scale_capex, use_amort))
+    fig, table = Patch(), Patch()
+    fig['data'][TRACE_INDEX['net_no_amort']]['y'] = row['net_no_amort']
+    for i, value in enumerate(table_column(row['net_no_amort'])):
+        table[i]['Net Profit (No Amort) ($M)'] = value
+    return fig, table
+
+# Risk bands: a cheap callback turns sidebar changes into a simulation request, so the background job
+# only starts (and re-triggering only cancels the running one) while Monte Carlo is switched on
+def request_risk_bands(crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex, use_amort, amort_years, manual_amort, manual_amort_M,
+                       mc_enable, mc_draws):
+    from dash import ctx, no_update
+    if not mc_enable:
+        return {'enabled': False} if ctx.triggered_id == 'mc-enable' else no_update
+    inputs = scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count, ticket_price,
+                                              scale_capex, use_amort, amort_years, manual_amort, manual_amort_M)
+    return {'enabled': True, 'inputs': inputs, 'draws': int(mc_draws or 100000)}
+
+def update_risk_bands(set_progress, request):
+    from dash import Patch
+    fig = Patch()
+    if request['enabled']:
+        bands = risk_bands(request['inputs'], request['draws'],
+                           progress=lambda done, total: set_progress((round(100 * done / total), f"{done:,} / {total:,} draws")))
+    for key, _, _ in RISK_BANDS:
+        for q in ('p95', 'p5', 'p50'):
+            fig['data'][TRACE_INDEX[f'{key}_{q}']]['visible'] = request['enabled']
+        if request['enabled']:
+            for q, values in zip(('p5', 'p50', 'p95'), bands[key]):
+                fig['data'][TRACE_INDEX[f'{key}_{q}']]['y'] = values
+    return fig
+
+# Sensitivity and goal seek figures (the layout ships them for the initial inputs and control values)
+DARK_LAYOUT = dict(template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0.3)', font=dict(color='white'))
+
+def tornado_figure(inputs, pct, metric):
+    """Tornado chart of the ±pct% swings, largest on top."""
+    import plotly.graph_objects as go
+    with instrumentation.phase('model'):
+        base, rows = sensitivity.tornado(inputs, pct, metric=metric)
+    with instrumentation.phase('figure'):
+        rows = [row for row in rows if row[1] != row[2]][::-1]
+        labels = [name.replace('_', ' ').title() for name, _, _ in rows]
+        fig = go.Figure()
+        fig.add_trace(go.Bar(y=labels, x=[(low - base) / 1e6 for _, low, _ in rows], orientation='h', name=f"-{pct}%", marker_color='#ff6b6b'))
+        fig.add_trace(go.Bar(y=labels, x=[(high - base) / 1e6 for _, _, high in rows], orientation='h', name=f"+{pct}%", marker_color='#00d4ff'))
+        fig.update_layout(**DARK_LAYOUT, barmode='overlay', title=f"10-Year Cumulative Profit vs. Base (${base/1e6:,.0f}M)",
+                          xaxis=dict(title="Change ($M)", gridcolor='rgba(255,255,255,0.1)'), legend=dict(bgcolor='rgba(0,0,0,0.5)'))
+    return fig
+
+def heatmap_figure(inputs, pct, metric, x_param, y_param, steps=HEATMAP_STEPS):
+    """steps x steps heatmap of cumulative profit; values are sent as float32 ($M)."""
+    import plotly.graph_objects as go
+    if x_param == y_param:
+        return go.Figure().update_layout(**DARK_LAYOUT, title="Pick two different parameters")
+    with instrumentation.phase('model'):
+        x_values, y_values, z = sensitivity.heatmap(inputs, x_param, y_param, pct, steps, metric=metric)
+    with instrumentation.phase('figure'):
+        fig = go.Figure(go.Heatmap(x=x_values, y=y_values, z=(z / 1e6).astype(np.float32), colorscale='RdBu', zmid=0, colorbar=dict(title="$M")))
+        fig.update_layout(**DARK_LAYOUT, title="10-Year Cumulative Profit ($M)",
+                          xaxis=dict(title=x_param.replace('_', ' ').title()), yaxis=dict(title=y_param.replace('_', ' ').title()))
+    return fig
+
+def goal_seek_figure(inputs, discount_rate, param, target, goal_value):
+    """Required value of `param` for each target year; discount_rate is a fraction."""
+    import plotly.graph_objects as go
+    goal = {'npv': (goal_value or 0) * 1e6, 'margin': (goal_value or 0) / 100}.get(target, 0.0)
+    with instrumentation.phase('model'):
+        required = goal_seek.solve(param, inputs, target, year=YEARS, goal=goal, discount_rate=discount_rate)
+    label, scale, unit = GOAL_PARAMS[param]
+    with instrumentation.phase('figure'):
+        fig = go.Figure(go.Scatter(x=YEARS, y=required / scale, mode="lines+markers", name=label, line=dict(color='#FFA500'),
+                                   connectgaps=False))
+        title = f"Required {label} vs. Target Year"
+        if param in ('ticket_price', 'spectator_count') and not inputs['include_spectators']:
+            title += " (enable spectators)"
+        fig.update_layout(**DARK_LAYOUT, title=title, xaxis=dict(title="Target Year", gridcolor='rgba(255,255,255,0.1)', dtick=1),
+                          yaxis=dict(title=f"{label} ({unit})", gridcolor='rgba(255,255,255,0.1)'))
+    return fig
+
+# Sensitivity callback
+def update_sensitivity(set_progress, crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex, use_amort,
+                       amort_years, manual_amort, manual_amort_M, pct, metric, x_param, y_param):
+    inputs = scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count, ticket_price,
+                                              scale_capex, use_amort, amort_years, manual_amort, manual_amort_M)
+    pct = pct or SENSITIVITY_DEFAULTS[0]
+    tornado_fig = tornado_figure(inputs, pct, metric)
+    set_progress(50)
+    return tornado_fig, heatmap_figure(inputs, pct, metric, x_param, y_param)
+
+# Goal seek callback
+def update_goal_seek(crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex, discount_rate,
+                     param, target, goal_value):
+    inputs = scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count, ticket_price, scale_capex)
+    rate = (discount_rate if discount_rate is not None else DEFAULT_DISCOUNT_RATE) / 100
+    return goal_seek_figure(inputs, rate, param, target, goal_value)
+
+# Optimizer callback
+def describe_config(point):
+    spectators = f"{point['spectator_count']} spectators at ${point['ticket_price']:,.0f}M" if point['include_spectators'] else "no spectators"
+    return (f"{point['crew_count']} crew, {point['contestant_count']} contestants, {spectators}, "
+            f"CAPEX scaling {'on' if point['scale_capex'] else 'off'}")
+
+def format_objective(objective, value):
+    if objective == 'npv':
+        return billions(value)
+    return "never" if value is None else f"Year {value:.0f}"
+
+def update_optimizer(set_progress, n_clicks, objective, discount_rate):
+    import plotly.graph_objects as go
+    rate = (discount_rate if discount_rate is not None else DEFAULT_DISCOUNT_RATE) / 100
+    with instrumentation.phase('model'):
+        out = optimizer.optimize(objective, discount_rate=rate, progress=lambda settled, space: set_progress(round(100 * settled / space)))
+    front, best = out['front'], out['best']
+    scale = 1e9 if objective == 'npv' else 1.0
+    values = [point[objective] / scale if point[objective] is not None else None for point in front]
+    label = "10-Year NPV ($B)" if objective == 'npv' else "Breakeven Year"
+    with instrumentation.phase('figure'):
+        fig = go.Figure(go.Scatter(x=[point['total_capex'] / 1e9 for point in front], y=values, mode="lines+markers", line=dict(color='#43e97b', shape='hv'),
+                                   name="Pareto front", text=[describe_config(point) for point in front],
+                                   hovertemplate="CAPEX $%{x:.2f}B<br>%{y}<br>%{text}<extra></extra>"))
+        fig.add_trace(go.Scatter(x=[best['total_capex'] / 1e9], y=[best[objective] / scale if best[objective] is not None else None], mode="markers",
+                                 marker=dict(symbol='star', size=16, color='#FFA500'), name="Best", hoverinfo='skip'))
+        fig.update_layout(template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0.3)', font=dict(color='white'),
+                          title=f"{label} vs. CAPEX ({out['stats']['evaluated']:,} of {out['stats']['space']:,} configurations evaluated)",
+                          xaxis=dict(title="Total CAPEX ($B)", gridcolor='rgba(255,255,255,0.1)'),
+                          yaxis=dict(title=label, gridcolor='rgba(255,255,255,0.1)', autorange='reversed' if objective != 'npv' else True),
+                          legend=dict(bgcolor='rgba(0,0,0,0.5)'))
+    return fig, f"Best: {describe_config(best)} → {format_objective(objective, best[objective])} ({billions(best['total_capex'])} CAPEX)"
+
+# Scenario comparison callbacks: saved scenarios live in the browser (localStorage) as normalized inputs
+def save_scenario(save_clicks, delete_clicks, name, selected, saved, crew_count, contestant_count, include_spectators, spectator_count,
+                  ticket_price, scale_capex, use_amort, amort_years, manual_amort, manual_amort_M):
+    from dash import ctx, no_update
+    saved = dict(saved or {})
+    if ctx.triggered_id == 'compare-delete':
+        for key in selected or []:
+            saved.pop(key, None)
+        return saved, no_update
+    name = (name or '').strip()
+    if not name:
+        name = next(f"Scenario {i}" for i in range(len(saved) + 1, 2 * len(saved) + 2) if f"Scenario {i}" not in saved)
+    if name not in saved and len(saved) >= scenario_compare.MAX_SCENARIOS:
+        return no_update, no_update
+    saved[name] = scenario_engine.normalize_inputs(crew_count, contestant_count, include_spectators, spectator_count, ticket_price,
+                                                   scale_capex, use_amort, amort_years, manual_amort, manual_amort_M)
+    return saved, ''
+
+def sync_compare_select(saved, options, selected):
+    """Dropdown options for the saved scenarios; newly saved ones are selected."""
+    saved = saved or {}
+    known = {option['value'] for option in options or []}
+    selected = [name for name in selected or [] if name in saved] + [name for name in saved if name not in known]
+    return [{'label': name, 'value': name} for name in saved], list(dict.fromkeys(selected))
+
+def relayout_x_range(relayout):
+    """Visible x range from a figure's relayoutData, or None when autoscaled or unknown."""
+    relayout = relayout or {}
+    if 'xaxis.range[0]' in relayout:
+        return relayout['xaxis.range[0]'], relayout['xaxis.range[1]']
+    if 'xaxis.range' in relayout:
+        return tuple(relayout['xaxis.range'])
+    return None
+
+def selected_scenarios(selected, saved):
+    saved = saved or {}
+    return {name: saved[name] for name in selected or [] if name in saved}
+
+def update_compare_chart(selected, series, relayout, saved):
+    from dash import ctx, no_update
+    x_range = relayout_x_range(relayout)
+    if ctx.triggered_id == 'compare-chart' and x_range is None and 'xaxis.autorange' not in (relayout or {}):
+        return no_update  # e.g. a legend click or resize: the visible range did not change
+    return build_compare_figure(selected_scenarios(selected, saved), series, x_range)
+
+def update_compare_table(page_current, page_size, sort_by, filter_query, selected, saved):
+    scenarios = selected_scenarios(selected, saved)
+    if not scenarios:
+        return [], 1, "No scenarios selected"
+    with instrumentation.phase('model'):
+        names, result = scenario_compare.project(scenarios)
+    with instrumentation.phase('table'):
+        frame = scenario_compare.table_frame(names, result)
+        records, page_count, n_rows = scenario_compare.query(frame, page_current or 0, page_size or COMPARE_PAGE_SIZE, sort_by, filter_query)
+    return records, page_count, f"{n_rows:,} of {len(frame['year']):,} rows"
+
+
+def register_callbacks(app, manager=None):
+    """Wire up all callbacks; the Monte Carlo and sensitivity ones run as background jobs on `manager` if given."""
+    from dash import Input, Output, State
+    from background_jobs import register_callback
+    # Sidebar inputs shared by the model callbacks, in scenario_engine.normalize_inputs order
+    sidebar_inputs = [Input('crew-count', 'value'), Input('contestant-count', 'value'), Input('include-spectators', 'value'),
+                      Input('spectator-count', 'value'), Input('ticket-price', 'value'), Input('scale-capex', 'value'),
+                      Input('use-amort', 'value'), Input('amort-years', 'value'), Input('manual-amort', 'value'),
+                      Input('manual-amort-value', 'value')]
+
+    # Sidebar toggles
+    app.callback([Output('left-sidebar', 'style'), Output('left-toggle', 'children'), Output('left-toggle', 'style'), Output('left-sidebar-state', 'data')],
+                 [Input('left-toggle', 'n_clicks')], [State('left-sidebar-state', 'data')])(toggle_left_sidebar)
+    app.callback([Output('right-sidebar', 'style'), Output('right-toggle', 'children'), Output('right-toggle', 'style'), Output('right-sidebar-state', 'data')],
+                 [Input('right-toggle', 'n_clicks')], [State('right-sidebar-state', 'data')])(toggle_right_sidebar)
+    app.callback(Output('main-content', 'style'), [Input('left-sidebar-state', 'data'), Input('right-sidebar-state', 'data')])(adjust_content_margins)
+
+    # Model
+    app.callback(Output('metric-capex', 'children'),
+                 [Input('crew-count', 'value'), Input('contestant-count', 'value'), Input('include-spectators', 'value'),
+                  Input('spectator-count', 'value'), Input('scale-capex', 'value')], prevent_initial_call=True)(update_capex_metric)
+    app.callback([Output('metric-year1-opex', 'children'), Output('metric-recurring-opex', 'children')],
+                 [Input('crew-count', 'value'), Input('contestant-count', 'value'), Input('include-spectators', 'value'),
+                  Input('spectator-count', 'value')], prevent_initial_call=True)(update_opex_metrics)
+    app.callback([Output('metric-npv', 'children'), Output('metric-irr', 'children'), Output('metric-discounted-payback', 'children'),
+                  Output('metric-breakeven', 'children')],
+                 [Input('crew-count', 'value'), Input('contestant-count', 'value'), Input('include-spectators', 'value'),
+                  Input('spectator-count', 'value'), Input('ticket-price', 'value'), Input('scale-capex', 'value'),
+                  Input('discount-rate', 'value')], prevent_initial_call=True)(update_investment_metrics)
+    app.callback([Output('metric-revenue', 'children'), Output('profit-chart', 'figure', allow_duplicate=True),
+                  Output('projection-table-data', 'data', allow_duplicate=True)],
+                 [Input('include-spectators', 'value'), Input('spectator-count', 'value'), Input('ticket-price', 'value')],
+                 prevent_initial_call=True)(update_revenue)
+    app.callback([Output('profit-chart', 'figure', allow_duplicate=True), Output('projection-table-data', 'data', allow_duplicate=True)],
+                 [Input('crew-count', 'value'), Input('contestant-count', 'value'), Input('include-spectators', 'value'),
+                  Input('spectator-count', 'value'), Input('ticket-price', 'value'), Input('scale-capex', 'value'),
+                  Input('use-amort', 'value')], prevent_initial_call=True)(update_net_profit)
+    app.callback(Output('mc-request', 'data'),
+                 sidebar_inputs + [Input('mc-enable', 'value'), Input('mc-draws', 'value')], prevent_initial_call=True)(request_risk_bands)
+    register_callback(app, manager, update_risk_bands, Output('profit-chart', 'figure', allow_duplicate=True), Input('mc-request', 'data'),
+                      progress=[Output('mc-progress', 'value'), Output('mc-progress', 'label')], progress_default=[0, ""],
+                      running=[(Output('mc-progress', 'style'), PROGRESS_STYLE, PROGRESS_HIDDEN)], prevent_initial_call=True)
+
+    # Sensitivity and goal seek
+    register_callback(app, manager, update_sensitivity, [Output('tornado-chart', 'figure'), Output('sensitivity-heatmap', 'figure')],
+                      sidebar_inputs + [Input('sens-pct', 'value'), Input('sens-metric', 'value'), Input('heatmap-x', 'value'),
+                                        Input('heatmap-y', 'value')],
+                      progress=Output('sens-progress', 'value'), progress_default=0,
+                      running=[(Output('sens-progress', 'style'), PROGRESS_STYLE, PROGRESS_HIDDEN)], prevent_initial_call=True)
+    app.callback(Output('goal-seek-chart', 'figure'),
+                 [Input('crew-count', 'value'), Input('contestant-count', 'value'), Input('include-spectators', 'value'),
+                  Input('spectator-count', 'value'), Input('ticket-price', 'value'), Input('scale-capex', 'value'),
+                  Input('discount-rate', 'value'), Input('goal-param', 'value'), Input('goal-target', 'value'), Input('goal-value', 'value')],
+                 prevent_initial_call=True)(update_goal_seek)
+
+    # Optimizer
+    register_callback(app, manager, update_optimizer, [Output('opt-front', 'figure'), Output('opt-best', 'children')],
+                      Input('opt-run', 'n_clicks'), [State('opt-objective', 'value'), State('discount-rate', 'value')],
+                      progress=Output('opt-progress', 'value'), progress_default=0,
+                      running=[(Output('opt-progress', 'style'), PROGRESS_STYLE, PROGRESS_HIDDEN), (Output('opt-run', 'disabled'), True, False)],
+                      prevent_initial_call=True)
+
+    # Scenario comparison
+    app.callback([Output('saved-scenarios', 'data'), Output('compare-name', 'value')],
+                 [Input('compare-save', 'n_clicks'), Input('compare-delete', 'n_clicks')],
+                 [State('compare-name', 'value'), State('compare-select', 'value'), State('saved-scenarios', 'data')] +
+                 [State(i.component_id, i.component_property) for i in sidebar_inputs], prevent_initial_call=True)(save_scenario)
+    app.callback([Output('compare-select', 'options'), Output('compare-select', 'value')], [Input('saved-scenarios', 'data')],
+                 [State('compare-select', 'options'), State('compare-select', 'value')])(sync_compare_select)
+    app.callback(Output('compare-chart', 'figure'),
+                 [Input('compare-select', 'value'), Input('compare-series', 'value'), Input('compare-chart', 'relayoutData')],
+                 [State('saved-scenarios', 'data')])(update_compare_chart)
+    app.callback([Output('compare-table', 'data'), Output('compare-table', 'page_count'), Output('compare-table-count', 'children')],
+                 [Input('compare-table', 'page_current'), Input('compare-table', 'page_size'), Input('compare-table', 'sort_by'),
+                  Input('compare-table', 'filter_query'), Input('compare-select', 'value')],
+                 [State('saved-scenarios', 'data')])(update_compare_table)
+
+def create_app(layout_cache_dir=LAYOUT_CACHE_DIR, background=True):
+    """Build the Dash app.
+
+    layout_cache_dir=None keeps the serialized layout in memory only;
+    background=False runs the Monte Carlo and sensitivity callbacks in the
+    request thread (as happens anyway without dash[diskcache]).
+    """
+    import dash
+    import dash_bootstrap_components as dbc
+    import plotly
+    import api
+    import background_jobs
+    import static_assets
+    from layout_cache import CachedLayoutDash, content_key
+
+    app = CachedLayoutDash(__name__, external_stylesheets=[dbc.themes.CYBORG], layout_cache_dir=layout_cache_dir)
+    image_sources = static_assets.image_sources(IMAGE_PATH, app.server)
+    # Everything the serialized layout depends on: this module, LAYOUT_MODULES, the image variants and the
+    # component library versions
+    app.layout_key = content_key(Path(__file__), *(Path(m.__file__) for m in LAYOUT_MODULES), image_sources,
+                                 dash.__version__, dbc.__version__, plotly.__version__)
+    app.layout = build_layout(image_sources)
+    # Finished background results are reused until the model code changes
+    model_version = content_key(*(Path(m.__file__) for m in (scenario_engine, monte_carlo, sensitivity, finance_metrics, optimizer)))
+    register_callbacks(app, background_jobs.make_manager(cache_by=[lambda: model_version]) if background else None)
+    # Batched JSON/Arrow model evaluation for other services (no figures involved)
+    api.register_api(app.server)
+    # Request timings, /metrics and the JSON request log when SGA_METRICS is set; otherwise nothing is hooked in
+    instrumentation.from_env(app.server, caches={'result': dashboard_cache})
+    return app
+
+def __getattr__(name):
+    global app, server
+    if name in ('app', 'server'):  # e.g. gunicorn financial_model:server
+        app = create_app()
+        server = app.server
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
-    app.run(debug=True, port=8050)
+    from werkzeug.serving import WSGIRequestHandler
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'  # keep-alive, so API clients can reuse connections
+    create_app().run(debug=True, port=8050)
@@ -0,0 +1,89 @@
+"""Goal seek: solve one model input for a financial target, holding the rest fixed.
+
+Targets are measured on the cash flows from finance_metrics.cash_flows():
+  breakeven - cumulative cash (after CAPEX) at the end of year N is zero
+  npv       - NPV of years 0..N at the discount rate equals `goal` (dollars)
+  margin    - cumulative net margin (cash after CAPEX / cumulative revenue) by year N equals `goal`
+
+Years and goals may be arrays, so a whole grid of targets (e.g. "required
+ticket price vs. target year") is solved in one call. Where the targets are
+linear in the parameter the root comes from two batched evaluations; otherwise
+all targets are bisected together.
+"""
+import numpy as np
+
+import finance_metrics
+import scenario_engine
+
+TARGETS = ('breakeven', 'npv', 'margin')
+# Search ranges; counts follow the sidebar bounds
+DEFAULT_BOUNDS = {
+    'ticket_price': (0.0, 1000.0), 'spectator_count': (0, 200), 'contestant_count': (1, 50), 'crew_count': (1, 50),
+    'contestant_cost_per': (0.0, 500e6), 'crew_cost_per': (0.0, 500e6), 'spectator_transport_cost_per': (0.0, 500e6),
+    'revenue_growth': (-0.5, 1.0),
+}
+COUNT_PARAMS = ('crew_count', 'contestant_count', 'spectator_count')
+# Parameters that enter CAPEX, OPEX and revenue linearly (counts only while CAPEX scaling is off)
+LINEAR_PARAMS = frozenset(scenario_engine.DEFAULT_PARAMS) - {'revenue_growth', 'baseline_crew', 'baseline_contestants',
+                                                               'baseline_spectators'} | {'ticket_price'}
+
+
+def target_gap(inputs, param, values, target='breakeven', year=10, goal=0.0, discount_rate=0.08):
+    """How far each row is above (+) or below (-) its target when param takes `values`."""
+    values, year, goal = np.broadcast_arrays(np.asarray(values, dtype=float), np.asarray(year), np.asarray(goal, dtype=float))
+    horizon = int(year.max())
+    result = scenario_engine.evaluate(years=horizon, **{**inputs, param: values})
+    flows = finance_metrics.cash_flows(result)
+    at_year = lambda a: np.take_along_axis(a, year[:, None].astype(int), axis=1)[:, 0]
+    if target == 'breakeven':
+        return at_year(np.cumsum(flows, axis=1))
+    if target == 'npv':
+        return at_year(np.cumsum(flows * finance_metrics.discount_factors(discount_rate, horizon + 1), axis=1)) - goal
+    if target == 'margin':
+        revenue = np.concatenate([np.zeros((len(values), 1)), np.cumsum(result['revenues'], axis=1)], axis=1)
+        return at_year(np.cumsum(flows, axis=1)) - goal * at_year(revenue)
+    raise ValueError(f"target must be one of {TARGETS}")
+
+
+def solve(param, inputs, target='breakeven', year=10, goal=0.0, discount_rate=0.08, bounds=None, tol=1e-9, max_iter=100):
+    """Value of `param` at which each target is exactly met.
+
+    inputs are normalized scenario inputs (see scenario_engine.normalize_inputs);
+    year and goal broadcast against each other. Count parameters are rounded
+    to the nearest whole number on the side that still meets the target.
+    Where the target is already met across the whole range the bound on the
+    easy side is returned (lower bound if the gap rises with the parameter,
+    upper bound if it falls); where it cannot be met within the bounds, NaN.
+    """
+    if param not in scenario_engine.DEFAULT_INPUTS and param not in scenario_engine.DEFAULT_PARAMS:
+        raise ValueError(f"unknown parameter '{param}'")
+    year, goal = (a.ravel() for a in np.broadcast_arrays(np.asarray(year), np.asarray(goal, dtype=float)))
+    k = len(year)
+    lo, hi = (float(b) for b in (bounds or DEFAULT_BOUNDS.get(param, (0.0, 2 * scenario_engine.DEFAULT_PARAMS.get(param, 1.0)))))
+    gap = lambda v, y=year, g=goal: target_gap(inputs, param, v, target, y, g, discount_rate)
+
+    both = gap(np.r_[np.full(k, lo), np.full(k, hi)], np.r_[year, year], np.r_[goal, goal])
+    g_lo, g_hi = both[:k], both[k:]
+    crossing = np.sign(g_lo) * np.sign(g_hi) <= 0
+    linear = param in LINEAR_PARAMS or (param in COUNT_PARAMS and not inputs.get('scale_capex', False))
+
+    if linear:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            root = lo - g_lo * (hi - lo) / (g_hi - g_lo)
+    else:
+        a, b = np.full(k, lo), np.full(k, hi)
+        for _ in range(max_iter):
+            mid = 0.5 * (a + b)
+            same_as_lo = np.sign(gap(mid)) == np.sign(g_lo)
+            a, b = np.where(same_as_lo, mid, a), np.where(same_as_lo, b, mid)
+            if np.all(b - a <= tol * (1 + np.abs(mid))):
+                break
+        root = 0.5 * (a + b)
+    rising = g_hi > g_lo
+    root = np.where(crossing & (g_lo != g_hi), root, np.nan)
+    root = np.where((g_lo >= 0) & (g_hi >= 0), np.where(rising, lo, hi), root)
+
+    if param in COUNT_PARAMS:
+        # Round towards the side where the target is met (gap >= 0)
+        root = np.where(rising, np.ceil(root - 1e-9), np.floor(root + 1e-9)) + 0.0
+    return root
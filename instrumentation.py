@@ -0,0 +1,312 @@
+"""Request-level performance instrumentation for the dashboard server.
+
+When enabled (SGA_METRICS=1, see from_env), every request to the Flask
+server is timed and its response size recorded, labelled by route and, for
+Dash callbacks, by the callback's outputs. Code inside a callback marks its
+phases (model math, figure building, table building, ...) with
+`with instrumentation.phase('figure'):`. Everything is exposed as
+Prometheus text on /metrics, together with the hit rates of the registered
+caches, and each request is written as one JSON line to the 'sga.metrics'
+logger. Single requests can be run under cProfile.
+
+When disabled nothing is hooked into the server and phase() returns a shared
+no-op context manager, so the only cost left is that function call.
+
+Metrics live in the process that records them: with several server workers
+each one reports its own, and phases timed inside background jobs (separate
+processes) are not collected.
+"""
+import cProfile
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+METRICS_ROUTE = '/metrics'
+PROFILE_DIR = Path(__file__).parent / '.cache' / 'profiles'
+PROFILE_TOP = 20  # functions per profile in the log
+DASH_UPDATE_ROUTE = '/_dash-update-component'
+
+logger = logging.getLogger('sga.metrics')
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{_labels(self.labels, label_values)} {value}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus text format."""
+
+    def __init__(self, name, help, buckets, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(k, list(v)) for k, v in self._series.items()]
+        for label_values, counts in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labels, label_values, [('le', bound)])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {counts[-1]}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {cumulative}"
+
+
+class Registry:
+    """Metrics plus collectors that produce gauge samples when /metrics is scraped."""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help, labels=()):
+        self.metrics.append(Counter(name, help, labels))
+        return self.metrics[-1]
+
+    def histogram(self, name, help, buckets, labels=()):
+        self.metrics.append(Histogram(name, help, buckets, labels))
+        return self.metrics[-1]
+
+    def add_collector(self, collect):
+        """collect() yields (name, type, help, [(labels dict, value), ...]) at scrape time."""
+        self.collectors.append(collect)
+
+    def render(self):
+        lines = [line for metric in self.metrics for line in metric.render()]
+        for collect in self.collectors:
+            for name, kind, help, samples in collect():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{_labels(labels, labels.values())} {value}" for labels, value in samples]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+REQUEST_SECONDS = registry.histogram('sga_request_duration_seconds', "Request wall time.", DURATION_BUCKETS, ('route', 'callback'))
+RESPONSE_BYTES = registry.histogram('sga_response_bytes', "Response body size.", SIZE_BUCKETS, ('route', 'callback'))
+REQUESTS = registry.counter('sga_requests_total', "Requests by status code.", ('route', 'callback', 'status'))
+PHASE_SECONDS = registry.histogram('sga_callback_phase_seconds', "Time spent in each phase of a callback.", DURATION_BUCKETS,
+                                   ('callback', 'phase'))
+PROFILES = registry.counter('sga_profiled_requests_total', "Requests run under cProfile.", ('route', 'callback'))
+
+_enabled = False
+_NULL = nullcontext()
+_local = threading.local()
+_caches = {}  # name -> cache whose hit rate is exported
+_profile_ids = itertools.count(1)  # with the pid, keeps profile file names unique
+
+
+def enabled():
+    return _enabled
+
+
+def phase(name):
+    """Context manager timing one phase of the current callback (a no-op while instrumentation is off)."""
+    return _timed_phase(name) if _enabled else _NULL
+
+
+@contextmanager
+def _timed_phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PHASE_SECONDS.observe(elapsed, _callback_label(), name)
+        phases = getattr(_local, 'phases', None)
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + elapsed
+
+
+def cache_collector(caches):
+    """Collector for {name: cache}; ResultCache (stats()) and functools.lru_cache (cache_info()) objects are supported."""
+    def collect():
+        hits, misses, size, ratio = [], [], [], []
+        for name, cache in caches.items():
+            if hasattr(cache, 'stats'):
+                stats = cache.stats()
+                cache_hits, cache_misses, cache_size = stats['hits'] + stats['shared_hits'], stats['misses'], stats['size']
+            else:
+                info = cache.cache_info()
+                cache_hits, cache_misses, cache_size = info.hits, info.misses, info.currsize
+            labels = {'cache': name}
+            hits.append((labels, cache_hits))
+            misses.append((labels, cache_misses))
+            size.append((labels, cache_size))
+            ratio.append((labels, cache_hits / (cache_hits + cache_misses) if cache_hits + cache_misses else 0.0))
+        yield 'sga_cache_hits_total', 'counter', "Cache hits.", hits
+        yield 'sga_cache_misses_total', 'counter', "Cache misses.", misses
+        yield 'sga_cache_entries', 'gauge', "Entries currently cached.", size
+        yield 'sga_cache_hit_ratio', 'gauge', "Hits / lookups since start.", ratio
+    return collect
+
+
+registry.add_collector(cache_collector(_caches))
+
+
+def _request_route(request):
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _callback_label():
+    """Outputs of the Dash callback being served ('' outside callback requests).
+
+    Resolved on first use, from the body Dash has parsed by then (Flask caches
+    it), so timing a request never parses its body an extra time.
+    """
+    label = getattr(_local, 'callback', '')
+    if label is None:
+        from flask import request
+        body = request.get_json(silent=True)
+        label = _local.callback = str(body.get('output', '')) if isinstance(body, dict) else ''
+    return label
+
+
+def _profile_requested(request, profile_on_demand, profile_rate):
+    if profile_on_demand and (request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'):
+        return True
+    return profile_rate > 0 and random.random() < profile_rate
+
+
+def _profile_summary(profiler, top=PROFILE_TOP):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({'function': f"{Path(filename).name}:{line}({function})", 'calls': calls,
+                     'own_ms': round(own * 1000, 3), 'cumulative_ms': round(cumulative * 1000, 3)})
+    return sorted(rows, key=lambda row: row['cumulative_ms'], reverse=True)[:top]
+
+
+def instrument(server, caches=None, profile_on_demand=False, profile_rate=0.0, profile_dir=PROFILE_DIR, route=METRICS_ROUTE):
+    """Time every request on a Flask server, mount the Prometheus route and turn phase() on.
+
+    caches maps names to caches whose hit rates are exported.
+    profile_on_demand runs requests sent with `X-Profile: 1` (or ?profile=1)
+    under cProfile; profile_rate profiles that fraction of all requests. The
+    hottest functions go to the request's log line and the full profile to
+    profile_dir/<time>-<pid>-<n>-<route>.prof (None: not written).
+    """
+    global _enabled
+    from flask import g, request
+
+    _caches.update(caches or {})
+
+    @server.before_request
+    def start_request_timer():
+        g.sga_route = _request_route(request)
+        _local.callback = None if g.sga_route.endswith(DASH_UPDATE_ROUTE) else ''
+        _local.phases = {}
+        g.sga_profiler = None
+        if _profile_requested(request, profile_on_demand, profile_rate):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active in this process
+                pass
+            else:
+                g.sga_profiler = profiler
+        g.sga_start = time.perf_counter()
+
+    @server.after_request
+    def record_request(response):
+        if 'sga_start' not in g:
+            return response
+        elapsed = time.perf_counter() - g.sga_start
+        labels = (g.sga_route, _callback_label())
+        size = response.calculate_content_length()
+        REQUEST_SECONDS.observe(elapsed, *labels)
+        REQUESTS.inc(1, *labels, response.status_code)
+        if size is not None:
+            RESPONSE_BYTES.observe(size, *labels)
+        record = {'event': 'request', 'route': g.sga_route, 'callback': labels[1], 'method': request.method,
+                  'status': response.status_code, 'duration_ms': round(elapsed * 1000, 3), 'bytes': size,
+                  'phases_ms': {name: round(t * 1000, 3) for name, t in (getattr(_local, 'phases', None) or {}).items()}}
+        if g.sga_profiler is not None:
+            g.sga_profiler.disable()
+            PROFILES.inc(1, *labels)
+            record['profile'] = _profile_summary(g.sga_profiler)
+            if profile_dir is not None:
+                name = g.sga_route.strip('/').replace('/', '_') or 'index'
+                path = Path(profile_dir) / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_profile_ids)}-{name}.prof"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                g.sga_profiler.dump_stats(path)
+                record['profile_path'] = str(path)
+        _local.callback, _local.phases = '', None
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record, separators=(',', ':')))
+        return response
+
+    @server.route(route, endpoint='metrics')
+    def metrics():
+        return server.response_class(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    _enabled = True
+
+
+def from_env(server, caches=None, prefix='SGA'):
+    """Instrument server if <prefix>_METRICS is set; returns whether it was.
+
+    <prefix>_METRICS_LOG writes the JSON request log to a file ('-': stderr),
+    <prefix>_PROFILE=1 allows per-request profiling via `X-Profile: 1`,
+    <prefix>_PROFILE_RATE profiles that fraction of all requests.
+    """
+    if os.environ.get(f'{prefix}_METRICS', '').lower() not in ('1', 'true', 'yes', 'on'):
+        return False
+    log_path = os.environ.get(f'{prefix}_METRICS_LOG')
+    if log_path and not logger.handlers:
+        handler = logging.StreamHandler() if log_path == '-' else logging.FileHandler(log_path)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    instrument(server, caches, profile_on_demand=os.environ.get(f'{prefix}_PROFILE') == '1',
+               profile_rate=float(os.environ.get(f'{prefix}_PROFILE_RATE', 0)))
+    return True
@@ -0,0 +1,89 @@
+"""Serve the Dash layout from a JSON file cached on disk.
+
+The serialized layout is written once to <layout_cache_dir>/<key>.json, where key is
+a content hash of everything the layout depends on (source files, the image
+digest, library versions). A restarted worker with the same key streams the
+file instead of serializing the component tree again. Expensive layout values
+(e.g. the initial Plotly figure) can be wrapped in Deferred so they are only
+built when the layout actually has to be serialized.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import dash
+from plotly.io.json import to_json_plotly
+
+import instrumentation
+
+
+KEY_FILE = re.compile(r'^[0-9a-f]{16}\.json$')  # <content_key>.json
+
+
+def content_key(*parts):
+    """Short sha256 over files (Path objects, hashed by content) and plain values."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(Path(part).read_bytes() if isinstance(part, Path) else repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+class Deferred:
+    """A layout property value that is computed when the layout is serialized."""
+
+    def __init__(self, build, *args):
+        self._build, self._args = build, args
+
+    def to_plotly_json(self):
+        value = self._build(*self._args)
+        return value.to_plotly_json() if hasattr(value, 'to_plotly_json') else value
+
+
+class CachedLayoutDash(dash.Dash):
+    """Dash app whose /_dash-layout response is read from (or written to) the layout cache."""
+
+    def __init__(self, *args, layout_key=None, layout_cache_dir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.layout_key = layout_key
+        self.layout_cache_dir = Path(layout_cache_dir) if layout_cache_dir else None
+        self._layout_json = None
+
+    @property
+    def layout_cache_path(self):
+        if self.layout_key is None or self.layout_cache_dir is None:
+            return None
+        return self.layout_cache_dir / f'{self.layout_key}.json'
+
+    def layout_json(self):
+        """Serialized layout as bytes: from memory, the cache file, or freshly built (and stored)."""
+        if self._layout_json is None:
+            path = self.layout_cache_path
+            if path is not None and path.exists():
+                self._layout_json = path.read_bytes()
+            else:
+                with instrumentation.phase('layout'):
+                    # get_layout() runs Dash's layout hooks, like Dash.serve_layout
+                    self._layout_json = to_json_plotly(self.get_layout()).encode()
+                if path is not None:
+                    self._write(path, self._layout_json)
+        return self._layout_json
+
+    def serve_layout(self):
+        # Same response as Dash.serve_layout, with the body taken from the cache
+        return self.backend.make_response(self.layout_json(), mimetype='application/json')
+
+    @staticmethod
+    def _write(path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent workers never read a partial file; drop layouts of older builds,
+        # leaving any other files in the directory alone
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        for stale in path.parent.glob('*.json'):
+            if stale != path and KEY_FILE.match(stale.name):
+                stale.unlink(missing_ok=True)
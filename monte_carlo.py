@@ -0,0 +1,219 @@
+"""Monte Carlo risk simulation for the Space Game Arena model.
+
+Model constants are drawn from configurable distributions, evaluated in chunks
+with the vectorized scenario engine (optionally across a process pool) and
+reduced into mergeable quantile sketches, so memory stays bounded no matter
+how many draws are run.
+"""
+import json
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import scenario_engine
+
+# name -> (kind, *args); kinds: fixed(value), uniform(low, high), triangular(low, mode, high),
+# normal(mean, sd), lognormal(median, sigma)
+DEFAULT_DISTRIBUTIONS = {
+    'revenue_growth': ('normal', 0.10, 0.03),
+    'sponsorship': ('triangular', 400e6, 600e6, 750e6),
+    'broadcasting': ('triangular', 350e6, 550e6, 700e6),
+    'vr_ar': ('uniform', 50e6, 150e6),
+    'merchandising': ('uniform', 100e6, 300e6),
+    'crew_cost_per': ('triangular', 55e6, 65e6, 85e6),
+    'contestant_cost_per': ('triangular', 55e6, 65e6, 85e6),
+    'spectator_transport_cost_per': ('triangular', 45e6, 55e6, 75e6),
+    'cargo_per_person': ('triangular', 1.2e6, 1.5e6, 2.0e6),
+}
+DEFAULT_QUANTILES = (0.05, 0.50, 0.95)
+OUTPUTS = ('revenues', 'net_no_amort')
+
+_pools = {}  # workers -> (pid, ProcessPoolExecutor), reused across simulations
+_pools_lock = threading.Lock()
+
+
+def load_distributions(path):
+    """Read distributions from a JSON file mapping constant names to [kind, *args].
+
+    Raises ValueError for unknown constants or distribution kinds, so a bad file
+    fails on load rather than in the first simulation.
+    """
+    with open(path) as f:
+        distributions = {name: tuple(spec) for name, spec in json.load(f).items()}
+    draw(np.random.default_rng(0), distributions, 1)
+    return distributions
+
+
+def from_env(prefix='SGA_MC'):
+    """Distributions from the JSON file named by {prefix}_DISTRIBUTIONS, else DEFAULT_DISTRIBUTIONS."""
+    path = os.environ.get(f'{prefix}_DISTRIBUTIONS')
+    return load_distributions(path) if path else DEFAULT_DISTRIBUTIONS
+
+
+def draw(rng, distributions, n):
+    """Draw n samples for every configured constant."""
+    samples = {}
+    for name, (kind, *args) in distributions.items():
+        if name not in scenario_engine.DEFAULT_PARAMS:
+            raise ValueError(f"'{name}' is not a model constant")
+        if kind == 'fixed':
+            samples[name] = np.full(n, float(args[0]))
+        elif kind == 'uniform':
+            samples[name] = rng.uniform(args[0], args[1], n)
+        elif kind == 'triangular':
+            samples[name] = rng.triangular(args[0], args[1], args[2], n)
+        elif kind == 'normal':
+            samples[name] = rng.normal(args[0], args[1], n)
+        elif kind == 'lognormal':
+            samples[name] = rng.lognormal(math.log(args[0]), args[1], n)
+        else:
+            raise ValueError(f"unknown distribution '{kind}' for '{name}'")
+    return samples
+
+
+class QuantileSketch:
+    """Mergeable relative-error quantile sketch over `columns` parallel streams.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so any quantile
+    is returned within `relative_accuracy` of the true value and the memory
+    footprint is fixed by the value range, not by the number of samples.
+    Magnitudes below `min_value` count as zero; above `max_value` they fall in
+    the last bucket.
+    """
+
+    def __init__(self, columns=1, relative_accuracy=0.005, min_value=1.0, max_value=1e15):
+        self.columns = columns
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._min_value = min_value
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        self.n_buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.positive = np.zeros((columns, self.n_buckets), dtype=np.int64)
+        self.negative = np.zeros((columns, self.n_buckets), dtype=np.int64)
+        self.zero = np.zeros(columns, dtype=np.int64)
+        self.count = 0
+
+    def add(self, values):
+        """Add an (n, columns) block of samples."""
+        values = np.asarray(values, dtype=float).reshape(-1, self.columns)
+        magnitude = np.abs(values)
+        is_zero = magnitude < self._min_value
+        self.zero += is_zero.sum(axis=0)
+        keys = np.ceil(np.log(np.where(is_zero, self._min_value, magnitude)) / self._log_gamma).astype(np.int64)
+        keys = np.clip(keys - self._offset, 0, self.n_buckets - 1) + np.arange(self.columns) * self.n_buckets
+        self.positive += self._counts(keys[(values > 0) & ~is_zero])
+        self.negative += self._counts(keys[(values < 0) & ~is_zero])
+        self.count += values.shape[0]
+        return self
+
+    def _counts(self, flat_keys):
+        return np.bincount(flat_keys, minlength=self.columns * self.n_buckets).reshape(self.columns, self.n_buckets)
+
+    def merge(self, other):
+        """Fold another sketch with the same configuration into this one."""
+        if (other.columns, other.n_buckets, other._offset) != (self.columns, self.n_buckets, self._offset):
+            raise ValueError("cannot merge sketches with different configurations")
+        self.positive += other.positive
+        self.negative += other.negative
+        self.zero += other.zero
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Return an array of shape (len(q), columns) (or (columns,) for a scalar q)."""
+        qs = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.count == 0:
+            raise ValueError("quantile of an empty sketch")
+        keys = np.arange(self.n_buckets) + self._offset
+        bucket_values = 2 * self.gamma ** keys / (self.gamma + 1)
+        values = np.concatenate([-bucket_values[::-1], [0.0], bucket_values])
+        out = np.empty((len(qs), self.columns))
+        for c in range(self.columns):
+            counts = np.concatenate([self.negative[c, ::-1], [self.zero[c]], self.positive[c]])
+            idx = np.searchsorted(np.cumsum(counts), qs * (self.count - 1), side='right')
+            out[:, c] = values[np.minimum(idx, len(values) - 1)]
+        return out if np.ndim(q) else out[0]
+
+
+def _run_chunk(inputs, distributions, n, seed, years, relative_accuracy):
+    """Draw, evaluate and sketch one chunk (runs inside worker processes)."""
+    rng = np.random.default_rng(seed)
+    result = scenario_engine.evaluate(years=years, **inputs, **draw(rng, distributions, n))
+    return {name: QuantileSketch(years, relative_accuracy).add(result[name]) for name in OUTPUTS}
+
+
+def _reduce(totals, partials, sizes, progress=None):
+    done, total = 0, sum(sizes)
+    for partial, n in zip(partials, sizes):
+        for name in OUTPUTS:
+            totals[name].merge(partial[name])
+        done += n
+        if progress is not None:
+            progress(done, total)
+
+
+def _pool(workers):
+    """Process pool with `workers` processes, created on first use and kept for later simulations.
+
+    Spawning the workers costs more than a dashboard-sized simulation, so the
+    pool outlives each call. A pool inherited through fork belongs to the
+    parent and is replaced.
+
+    Reuse only helps within one long-lived process. Dashboard background jobs
+    each run in a fresh process (background_jobs), so every Monte Carlo job
+    starts its own pool: with the default fork start method on Linux that is
+    some 10 ms per worker, far more under spawn (macOS, Windows), where each
+    worker re-imports numpy. benchmarks/load.py (measure_jobs) times it.
+    """
+    with _pools_lock:
+        pid, pool = _pools.get(workers, (None, None))
+        if pool is None or pid != os.getpid():
+            pool = ProcessPoolExecutor(max_workers=workers)
+            _pools[workers] = (os.getpid(), pool)
+        return pool
+
+
+def _discard_pool(workers, pool):
+    with _pools_lock:
+        if _pools.get(workers, (None, None))[1] is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def simulate(inputs, distributions=None, draws=1_000_000, years=10, quantiles=DEFAULT_QUANTILES, chunk_size=100_000,
+             workers=None, seed=None, relative_accuracy=0.005, progress=None):
+    """Run a Monte Carlo simulation around one set of normalized sidebar inputs.
+
+    Returns {'draws': n, 'quantiles': q, 'revenues': (len(q), years), 'net_no_amort': (len(q), years)}.
+    `workers=None` uses every core; `workers=1` runs in-process, otherwise a
+    module-level pool is reused between calls in the same process (see
+    _pool). progress, if given, is called as progress(draws_done, draws) after
+    every chunk. Raises ValueError unless draws is a positive integer.
+    """
+    if int(draws) != draws or draws <= 0:
+        raise ValueError("draws must be a positive integer")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    draws = int(draws)
+    distributions = DEFAULT_DISTRIBUTIONS if distributions is None else distributions
+    sizes = [chunk_size] * (draws // chunk_size) + ([draws % chunk_size] if draws % chunk_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(inputs, distributions, n, s, years, relative_accuracy) for n, s in zip(sizes, seeds)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    totals = {name: QuantileSketch(years, relative_accuracy) for name in OUTPUTS}
+    if workers <= 1:
+        _reduce(totals, map(_run_chunk, *zip(*jobs)), sizes, progress)
+    else:
+        pool = _pool(workers)
+        try:
+            _reduce(totals, pool.map(_run_chunk, *zip(*jobs)), sizes, progress)
+        except BrokenProcessPool:
+            _discard_pool(workers, pool)  # e.g. a worker was killed; the next simulation starts a fresh pool
+            raise
+    return {'draws': draws, 'quantiles': tuple(quantiles),
+            **{name: totals[name].quantile(list(quantiles)) for name in OUTPUTS}}
@@ -0,0 +1,264 @@
+"""Constrained configuration optimizer for the Space Game Arena model.
+
+Searches crew, contestant and spectator counts (within the sidebar bounds),
+a grid of ticket prices and the include_spectators / scale_capex flags for the
+configurations that maximize NPV or minimize the breakeven year, and returns
+the Pareto front of that objective against total CAPEX.
+
+The search is a branch and bound over boxes of the integer space. The model
+is monotone in every decision variable: revenue only grows with spectators
+and ticket price, OPEX and CAPEX only grow with the head counts (CAPEX by
+capex_per_extra_person above the baseline counts when scale_capex is on). So
+an optimistic bound for a whole box comes from two vectorized evaluations,
+its low and high corners: revenue at the high corner, OPEX and CAPEX at the
+low corner. Boxes whose bound is dominated by a configuration already found
+are dropped, the rest are split; boxes of at most block_size points are
+evaluated exhaustively, one vectorized block per task, across a process
+pool. Bounds assume non-negative cost and revenue constants.
+
+    python optimizer.py --objective npv --discount-rate 0.08 --workers 4
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import finance_metrics
+import scenario_engine
+import sensitivity
+
+OBJECTIVES = ('npv', 'breakeven_year')
+DIMENSIONS = ('crew_count', 'contestant_count', 'spectator_count', 'ticket_price')
+FLAGS = ('include_spectators', 'scale_capex')
+DEFAULT_BOUNDS = {name: sensitivity.INPUT_BOUNDS[name] for name in DIMENSIONS[:3]}
+DEFAULT_TICKET_PRICES = np.arange(0.0, sensitivity.INPUT_BOUNDS['ticket_price'][1] + 1, 5.0)
+BLOCK_SIZE = 4096
+
+
+def _score(result, objective, discount_rate, years):
+    """Value to maximize for every scenario: NPV, or minus the breakeven year (years + 1 if never).
+
+    Ties in the breakeven year are broken by NPV, squashed into (-0.5, 0.5) so
+    the year can be read back with round(); both parts are monotone in the
+    cash flows, so box bounds stay valid.
+    """
+    flows = finance_metrics.cash_flows(result)
+    npv = finance_metrics.npv(flows, discount_rate)
+    if objective == 'npv':
+        return npv
+    breakeven = finance_metrics.payback_period(flows)
+    return -np.where(np.isnan(breakeven), years + 1, breakeven) + 0.5 * np.tanh(npv / 1e12)
+
+
+def _configs(grids, lo, hi, flags):
+    """Decision-variable columns for every point of the boxes [lo, hi] (index space) with the given flags."""
+    columns = {name: [] for name in DIMENSIONS + FLAGS}
+    for box_lo, box_hi, box_flags in zip(lo, hi, flags):
+        mesh = np.meshgrid(*(grid[a:b + 1] for grid, a, b in zip(grids, box_lo, box_hi)), indexing='ij')
+        for name, values in zip(DIMENSIONS, mesh):
+            columns[name].append(values.ravel())
+        for name, flag in zip(FLAGS, box_flags):
+            columns[name].append(np.full(mesh[0].size, flag))
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+
+def _evaluate_block(grids, lo, hi, flags, inputs, objective, discount_rate, years):
+    """Exhaustively evaluate a group of boxes; returns their local Pareto front (runs inside worker processes)."""
+    columns = _configs(grids, lo, hi, flags)
+    result = scenario_engine.evaluate(years=years, **{**inputs, **columns})
+    return ParetoFront().add(_score(result, objective, discount_rate, years), result['total_capex'], columns)
+
+
+class ParetoFront:
+    """Configurations not dominated in (score to maximize, CAPEX to minimize); ties keep the first one found."""
+
+    def __init__(self):
+        self.score = np.empty(0)
+        self.capex = np.empty(0)
+        self.columns = None
+
+    def add(self, score, capex, columns):
+        score = np.concatenate([self.score, score])
+        capex = np.concatenate([self.capex, capex])
+        if self.columns is not None:
+            columns = {name: np.concatenate([self.columns[name], columns[name]]) for name in self.columns}
+        order = np.lexsort((-score, capex))
+        best_before = np.maximum.accumulate(np.concatenate([[-np.inf], score[order][:-1]]))
+        keep = order[score[order] > best_before]
+        self.score, self.capex = score[keep], capex[keep]
+        self.columns = {name: np.asarray(columns[name])[keep] for name in DIMENSIONS + FLAGS}
+        return self
+
+    def merge(self, other):
+        return self if other.columns is None else self.add(other.score, other.capex, other.columns)
+
+    def best_score(self, capex):
+        """Best score found at or below each CAPEX (-inf where nothing is that cheap)."""
+        idx = np.searchsorted(self.capex, capex, side='right') - 1
+        return np.where(idx >= 0, self.score[np.maximum(idx, 0)], -np.inf)
+
+
+def _bound(grids, lo, hi, flags, inputs, objective, discount_rate, years):
+    """Optimistic (score, CAPEX) per box, plus both corners as evaluated configurations."""
+    corners = {}
+    for name, index in (('lo', lo), ('hi', hi)):
+        columns = {dim: grid[index[:, d]] for d, (dim, grid) in enumerate(zip(DIMENSIONS, grids))}
+        columns.update({flag: flags[:, f] for f, flag in enumerate(FLAGS)})
+        corners[name] = columns, scenario_engine.evaluate(years=years, **{**inputs, **columns})
+    (lo_columns, lo_result), (hi_columns, hi_result) = corners['lo'], corners['hi']
+    optimistic = {'total_capex': lo_result['total_capex'], 'revenues': hi_result['revenues'], 'opex': lo_result['opex']}
+    front = ParetoFront()
+    for columns, result in (corners['lo'], corners['hi']):
+        front.add(_score(result, objective, discount_rate, years), result['total_capex'], columns)
+    return _score(optimistic, objective, discount_rate, years), lo_result['total_capex'], front
+
+
+def _split(lo, hi):
+    """Halve every box along its longest dimension (in grid points)."""
+    width = hi - lo
+    axis = np.argmax(width, axis=1)
+    rows = np.arange(len(lo))
+    mid = lo[rows, axis] + width[rows, axis] // 2
+    left_hi, right_lo = hi.copy(), lo.copy()
+    left_hi[rows, axis] = mid
+    right_lo[rows, axis] = mid + 1
+    return np.concatenate([lo, right_lo]), np.concatenate([left_hi, hi])
+
+
+def _roots(grids, flags):
+    """One box per flag combination; dimensions that cannot matter for it are pinned to their first value."""
+    lo, hi, root_flags = [], [], []
+    for include_spectators in flags['include_spectators']:
+        for scale_capex in flags['scale_capex']:
+            top = np.array([len(grid) - 1 for grid in grids])
+            if not include_spectators:
+                top[3] = 0  # no ticket revenue
+                if not scale_capex:
+                    top[2] = 0  # spectators change nothing
+            lo.append(np.zeros(len(grids), dtype=int))
+            hi.append(top)
+            root_flags.append((bool(include_spectators), bool(scale_capex)))
+    return np.array(lo), np.array(hi), np.array(root_flags, dtype=bool)
+
+
+def _groups(sizes, block_size):
+    """Split box indices into groups of about block_size points (boxes are never split)."""
+    groups, current, total = [], [], 0
+    for i, size in enumerate(sizes):
+        if current and total + size > block_size:
+            groups.append(current)
+            current, total = [], 0
+        current.append(i)
+        total += size
+    return groups + ([current] if current else [])
+
+
+def optimize(objective='npv', inputs=None, bounds=None, ticket_prices=None, flags=None, discount_rate=0.08, years=10,
+             block_size=BLOCK_SIZE, workers=None, progress=None):
+    """Pareto front of `objective` vs. total CAPEX over the decision space.
+
+    inputs are normalized sidebar inputs (scenario_engine.normalize_inputs())
+    and model constant overrides for everything that is not searched; bounds
+    maps crew_count, contestant_count and spectator_count to inclusive
+    (low, high) integer ranges (default: the sidebar bounds); ticket_prices is
+    the price grid in $M; flags maps include_spectators and scale_capex to
+    the values to try (default: both). `workers=None` uses every core,
+    `workers=1` runs in-process. progress, if given, is called as
+    progress(settled, space) after every round, where settled counts the
+    configurations evaluated or pruned so far.
+
+    Returns {'objective', 'best', 'front', 'stats'}: best is the optimal
+    configuration, front the Pareto-optimal ones sorted by CAPEX (each a dict
+    of the decision variables plus total_capex and the objective), stats
+    counts the search space, evaluated configurations, bounded boxes and
+    configurations pruned without evaluation.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    inputs = {**scenario_engine.normalize_inputs(), **(inputs or {})}
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    flags = {**{name: (False, True) for name in FLAGS}, **(flags or {})}
+    grids = [np.arange(bounds[name][0], bounds[name][1] + 1) for name in DIMENSIONS[:3]]
+    grids.append(np.unique(np.asarray(DEFAULT_TICKET_PRICES if ticket_prices is None else ticket_prices, dtype=float)))
+    if any(len(grid) == 0 for grid in grids):
+        raise ValueError("every bound must contain at least one value")
+    args = (inputs, objective, discount_rate, years)
+
+    lo, hi, box_flags = _roots(grids, flags)
+    stats = {'space': int(np.prod(hi - lo + 1, axis=1).sum()), 'evaluated': 0, 'boxes': 0, 'pruned': 0}
+    front, settled = ParetoFront(), 0
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while len(lo):
+            bound, capex_lb, corners = _bound(grids, lo, hi, box_flags, *args)
+            front.merge(corners)
+            sizes = np.prod(hi - lo + 1, axis=1)
+            stats['boxes'] += len(lo)
+            stats['evaluated'] += 2 * len(lo)
+            alive = bound > front.best_score(capex_lb)
+            stats['pruned'] += int(sizes[~alive].sum())
+            settled += int(sizes[~alive].sum())
+            lo, hi, box_flags, sizes = lo[alive], hi[alive], box_flags[alive], sizes[alive]
+
+            leaf = sizes <= block_size
+            groups = _groups(sizes[leaf], block_size)
+            leaf_lo, leaf_hi, leaf_flags = lo[leaf], hi[leaf], box_flags[leaf]
+            tasks = [(grids, leaf_lo[g], leaf_hi[g], leaf_flags[g], *args) for g in groups]
+            for block in (pool.map(_evaluate_block, *zip(*tasks)) if pool and len(tasks) > 1 else
+                          (_evaluate_block(*task) for task in tasks)):
+                front.merge(block)
+            stats['evaluated'] += int(sizes[leaf].sum())
+            settled += int(sizes[leaf].sum())
+            if progress is not None:
+                progress(settled, stats['space'])
+
+            lo, hi = _split(lo[~leaf], hi[~leaf])
+            box_flags = np.concatenate([box_flags[~leaf]] * 2)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    points = [{**{name: _plain(front.columns[name][i]) for name in DIMENSIONS + FLAGS},
+               'total_capex': float(front.capex[i]), objective: _objective_value(objective, front.score[i], years)}
+              for i in range(len(front.score))]
+    best = max(range(len(points)), key=lambda i: (front.score[i], -front.capex[i]))
+    return {'objective': objective, 'best': points[best], 'front': points, 'stats': stats}
+
+
+def _plain(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _objective_value(objective, score, years):
+    if objective == 'npv':
+        return float(score)
+    year = round(-score)
+    return float(year) if year <= years else None  # never breaks even within the horizon
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the configurations that maximize NPV (or minimize the breakeven year).")
+    parser.add_argument('--objective', choices=OBJECTIVES, default='npv')
+    parser.add_argument('--discount-rate', type=float, default=0.08, help="annual rate for NPV (default: 0.08)")
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--ticket-step', type=float, default=5.0, help="ticket price grid step in $M (default: 5)")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    args = parser.parse_args(argv)
+    prices = np.arange(0.0, sensitivity.INPUT_BOUNDS['ticket_price'][1] + args.ticket_step / 2, args.ticket_step)
+    out = optimize(args.objective, ticket_prices=prices, discount_rate=args.discount_rate, years=args.years, workers=args.workers)
+    stats = out['stats']
+    print(f"searched {stats['space']:,} configurations: {stats['evaluated']:,} evaluated, {stats['pruned']:,} pruned")
+    print(f"{'crew':>5}{'cont.':>6}{'spec.':>6}{'ticket':>8}{'spec?':>7}{'scale?':>7}{'CAPEX $B':>10}{args.objective:>16}")
+    for point in out['front']:
+        value = point[args.objective]
+        value = "never" if value is None else f"{value / 1e9:,.2f}B" if args.objective == 'npv' else f"year {value:.0f}"
+        marker = " *" if point == out['best'] else ""
+        print(f"{point['crew_count']:>5}{point['contestant_count']:>6}{point['spectator_count']:>6}{point['ticket_price']:>8.1f}"
+              f"{'yes' if point['include_spectators'] else 'no':>7}{'yes' if point['scale_capex'] else 'no':>7}"
+              f"{point['total_capex'] / 1e9:>10.2f}{value:>16}{marker}")
+
+
+if __name__ == '__main__':
+    main()
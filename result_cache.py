@@ -0,0 +1,115 @@
+"""Bounded LRU + TTL cache for finished dashboard results.
+
+Entries live in an in-process OrderedDict. Optionally a SQLite file backs the
+cache so several server workers can share results; point it at /dev/shm to
+keep it in memory. Values are pickled in the shared store, so they must be
+plain data (strings, dicts, lists, arrays).
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class ResultCache:
+    """LRU cache with a size limit, a time-to-live and hit/miss statistics."""
+
+    def __init__(self, maxsize=256, ttl=600.0, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB, created REAL, accessed REAL)")
+
+    @staticmethod
+    def make_key(*parts):
+        """Stable string key for a tuple of plain values."""
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                created, value = entry
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['expirations'] += 1
+            value = self._shared_get(key, now)
+            if value is not _MISSING:
+                self._stats['shared_hits'] += 1
+                return value
+            self._stats['misses'] += 1
+            return default
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                 (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now, now))
+                self._db.execute("DELETE FROM results WHERE created < ? OR key IN "
+                                 "(SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                                 (now - self.ttl, self.maxsize))
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def _store(self, key, value, created):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _shared_get(self, key, now):
+        if self._db is None:
+            return _MISSING
+        row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl:
+            return _MISSING
+        self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        value = pickle.loads(row[0])
+        self._store(key, value, row[1])
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+
+    def stats(self):
+        """Counters plus current size and overall hit rate."""
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries), maxsize=self.maxsize)
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['shared_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+def from_env(prefix='SGA_RESULT_CACHE'):
+    """Build a cache from <prefix>_SIZE, <prefix>_TTL and <prefix>_PATH (shared SQLite file)."""
+    return ResultCache(maxsize=int(os.environ.get(f'{prefix}_SIZE', 256)),
+                       ttl=float(os.environ.get(f'{prefix}_TTL', 600)),
+                       path=os.environ.get(f'{prefix}_PATH') or None)
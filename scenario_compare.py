@@ -0,0 +1,179 @@
+"""Multi-scenario comparison: monthly projections of saved scenarios, min/max
+downsampling for the chart and server-side queries for the table.
+
+All saved scenarios are projected in one timeseries.project batch. The chart
+never receives every period of every scenario: each series is cut into
+buckets and only the minimum and maximum of each bucket are kept, so peaks and
+troughs survive at any zoom level while the points per trace stay bounded.
+The table is paged, sorted and filtered here, so the browser only holds one
+page of rows.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+import scenario_engine
+import timeseries
+
+HORIZON_YEARS = 50
+PERIODS_PER_YEAR = 12
+MAX_SCENARIOS = 200
+MAX_POINTS = 300  # per trace, after downsampling (about one point per 3px of chart width)
+
+# Projected series that can be compared ($M); flows are per period, cash_position is a running balance
+SERIES = {
+    'cash_position': "Cash Position", 'net_no_amort': "Net Profit (No Amort)", 'net_with_amort': "Net Profit (With Amort)",
+    'revenues': "Revenue", 'opex': "OPEX",
+}
+TABLE_COLUMNS = ('scenario', 'year', 'month') + tuple(SERIES)
+
+
+def scenarios_key(scenarios):
+    """Hashable key for {name: normalized inputs}, in insertion order."""
+    return tuple((name, tuple(sorted(inputs.items()))) for name, inputs in scenarios.items())
+
+
+def project(scenarios, horizon_years=HORIZON_YEARS, periods_per_year=PERIODS_PER_YEAR):
+    """Monthly projections ($M) for {name: normalized inputs}, one row per scenario (cached).
+
+    Returns (names, result) where result is timeseries.project() output with
+    the series scaled to millions.
+    """
+    if not scenarios:
+        raise ValueError("no scenarios to compare")
+    if len(scenarios) > MAX_SCENARIOS:
+        raise ValueError(f"at most {MAX_SCENARIOS} scenarios can be compared")
+    return _project(scenarios_key(scenarios), horizon_years, periods_per_year)
+
+
+@lru_cache(maxsize=16)
+def _project(key, horizon_years, periods_per_year):
+    names = [name for name, _ in key]
+    rows = [{**scenario_engine.DEFAULT_INPUTS, **dict(inputs)} for _, inputs in key]
+    columns = {field: np.array([row[field] for row in rows]) for field in scenario_engine.DEFAULT_INPUTS}
+    result = timeseries.project(horizon_years, periods_per_year, **columns)
+    for series in SERIES:
+        result[series] = result[series] / 1e6
+    return names, result
+
+
+def minmax_indices(y, n_buckets):
+    """Column indices that keep the min and max of each of n_buckets buckets per row.
+
+    y is (n, T); the result is (n, m) with indices in increasing order per row,
+    always including the first and last period. Rows short enough to be sent
+    as they are get every index.
+    """
+    n, n_periods = y.shape
+    if n_periods <= 2 * n_buckets + 2:
+        return np.broadcast_to(np.arange(n_periods), (n, n_periods))
+    size = -(-n_periods // n_buckets)
+    n_buckets = -(-n_periods // size)
+    # Pad the last bucket with the final value; any index that lands in the padding is clipped back onto it
+    blocks = np.pad(y, ((0, 0), (0, n_buckets * size - n_periods)), mode='edge').reshape(n, n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    picks = np.sort(np.stack([blocks.argmin(axis=2) + offsets, blocks.argmax(axis=2) + offsets], axis=2), axis=2)
+    edges = np.zeros((n, 1), dtype=int)
+    return np.minimum(np.concatenate([edges, picks.reshape(n, -1), edges + n_periods - 1], axis=1), n_periods - 1)
+
+
+def downsample(x, y, max_points=MAX_POINTS, x_range=None):
+    """Min/max-downsampled (xs, ys), both (n, m), of the series y (n, T) over the shared axis x (T,).
+
+    x_range=(lo, hi) restricts the output to the visible window (plus one
+    point either side so lines run to the plot edges).
+    """
+    start, stop = 0, len(x)
+    if x_range is not None:
+        start = max(int(np.searchsorted(x, x_range[0], side='right')) - 1, 0)
+        stop = min(int(np.searchsorted(x, x_range[1], side='left')) + 1, len(x))
+        if stop - start < 2:
+            start, stop = max(min(start, len(x) - 2), 0), min(max(stop, 2), len(x))
+    window = y[:, start:stop]
+    idx = minmax_indices(window, max(max_points // 2 - 1, 1))
+    return x[start:stop][idx], np.take_along_axis(window, idx, axis=1)
+
+
+def table_frame(names, result, periods_per_year=PERIODS_PER_YEAR):
+    """Flat columns, one row per scenario and period, for the comparison table."""
+    n, n_periods = result[next(iter(SERIES))].shape
+    t = np.arange(n_periods)
+    frame = {'scenario': np.repeat(np.array(names, dtype=object), n_periods),
+             'year': np.tile(t // periods_per_year + 1, n), 'month': np.tile(t % periods_per_year + 1, n)}
+    frame.update({series: result[series].ravel() for series in SERIES})
+    return frame
+
+
+# DataTable filter_query parts, e.g. {year} >= 5, {scenario} icontains "base" or {month} eq 12. Operators may carry
+# DataTable's case prefix: 'i' compares text case-insensitively, 's' case-sensitively
+_FILTER_PART = re.compile(r'^\s*\{(?P<column>[^}]+)\}\s*(?P<case>[si]?)(?P<op>>=|<=|!=|<|>|=|eq|ne|lt|le|gt|ge|contains)\s*(?P<value>.*?)\s*$')
+_OPERATORS = {
+    'eq': np.equal, '=': np.equal, 'ne': np.not_equal, '!=': np.not_equal, 'lt': np.less, '<': np.less,
+    'le': np.less_equal, '<=': np.less_equal, 'gt': np.greater, '>': np.greater, 'ge': np.greater_equal, '>=': np.greater_equal,
+}
+
+
+def parse_filter(filter_query):
+    """[(column, operator, value, ignore_case)] from a DataTable filter_query; unsupported parts are ignored.
+
+    Without a case prefix, contains ignores case and the other operators do not.
+    """
+    parts = []
+    for part in (filter_query or '').split(' && '):
+        match = _FILTER_PART.match(part)
+        if not match or match['column'] not in TABLE_COLUMNS:
+            continue
+        op, value = match['op'], match['value']
+        if value[:1] == value[-1:] and value[:1] in ('"', "'", '`'):
+            value = value[1:-1]
+        elif match['column'] != 'scenario':
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+        parts.append((match['column'], op, value, match['case'] == 'i' or (not match['case'] and op == 'contains')))
+    return parts
+
+
+def filter_mask(frame, filter_query):
+    """Boolean row mask for a DataTable filter_query."""
+    mask = np.ones(len(frame['year']), dtype=bool)
+    for column, op, value, ignore_case in parse_filter(filter_query):
+        values = frame[column]
+        if op == 'contains':
+            needle = str(value).lower() if ignore_case else str(value)
+            mask &= np.fromiter((needle in (str(v).lower() if ignore_case else str(v)) for v in values), dtype=bool, count=len(values))
+        elif column == 'scenario':
+            text = values.astype(str)
+            mask &= _OPERATORS[op](np.char.lower(text), str(value).lower()) if ignore_case else _OPERATORS[op](text, str(value))
+        else:
+            try:
+                value = float(value)  # quoted operands, e.g. {year} > "5", reach here as text
+            except ValueError:
+                continue  # not a number: ignored like other unsupported parts
+            mask &= _OPERATORS[op](values, value)
+    return mask
+
+
+def query(frame, page_current=0, page_size=100, sort_by=(), filter_query=''):
+    """One page of table records after filtering and sorting, plus the page count and matching row count.
+
+    sort_by is the DataTable sort_by list ([{'column_id': ..., 'direction': 'asc'|'desc'}]).
+    """
+    rows = np.flatnonzero(filter_mask(frame, filter_query))
+    keys = []
+    for sort in reversed(sort_by or []):  # np.lexsort sorts by the last key first
+        values = frame[sort['column_id']][rows]
+        if values.dtype == object:
+            values = np.unique(values.astype(str), return_inverse=True)[1]
+        keys.append(-values if sort['direction'] == 'desc' else values)
+    if keys:
+        rows = rows[np.lexsort(keys)]
+    page_count = max(-(-len(rows) // page_size), 1)
+    page_current = min(page_current, page_count - 1)  # e.g. a new filter left fewer pages
+    page = rows[page_current * page_size:(page_current + 1) * page_size]
+    columns = {name: (np.round(frame[name][page], 2) if frame[name].dtype.kind == 'f' else frame[name][page]).tolist()
+               for name in TABLE_COLUMNS}
+    records = [dict(zip(TABLE_COLUMNS, values)) for values in zip(*columns.values())]
+    return records, page_count, len(rows)
@@ -0,0 +1,190 @@
+"""Vectorized Space Game Arena financial model.
+
+Evaluates any number of scenarios in one NumPy pass. Every input and every
+model constant may be a scalar or a 1-D array (one value per scenario); the
+results are (n_scenarios,) arrays for the headline numbers and
+(n_scenarios, n_years) blocks for the projections. Only NumPy is imported here
+so the engine can be used offline without Dash.
+"""
+import numpy as np
+
+# Constants
+baseline_crew, baseline_contestants, baseline_spectators = 15, 12, 50
+capex_phase1, capex_phase2_additional, capex_per_extra_person = 5.7e9, 1.4e9, 20e6
+crew_cost_per, contestant_cost_per, spectator_transport_cost_per = 65e6, 65e6, 55e6
+crew_salary_per, prize_pool_per_contestant, cargo_per_person, docked_vehicle_cost = 0.317e6, 1.667e6, 1.5e6, 44e6
+sponsorship, broadcasting, vr_ar, merchandising, revenue_growth = 600e6, 550e6, 100e6, 200e6, 0.10
+
+# Model constants that can be overridden per call (or per scenario)
+DEFAULT_PARAMS = {
+    'baseline_crew': baseline_crew, 'baseline_contestants': baseline_contestants, 'baseline_spectators': baseline_spectators,
+    'capex_phase1': capex_phase1, 'capex_phase2_additional': capex_phase2_additional, 'capex_per_extra_person': capex_per_extra_person,
+    'crew_cost_per': crew_cost_per, 'contestant_cost_per': contestant_cost_per, 'spectator_transport_cost_per': spectator_transport_cost_per,
+    'crew_salary_per': crew_salary_per, 'prize_pool_per_contestant': prize_pool_per_contestant, 'cargo_per_person': cargo_per_person,
+    'docked_vehicle_cost': docked_vehicle_cost, 'sponsorship': sponsorship, 'broadcasting': broadcasting, 'vr_ar': vr_ar,
+    'merchandising': merchandising, 'revenue_growth': revenue_growth,
+}
+
+# Sidebar inputs and the values the dashboard falls back to when they are empty
+DEFAULT_INPUTS = {
+    'crew_count': 15, 'contestant_count': 12, 'include_spectators': False, 'spectator_count': 0, 'ticket_price': 60.0,
+    'scale_capex': False, 'use_amort': True, 'amort_years': 10, 'manual_amort': False, 'manual_amort_M': 570.0,
+}
+FLAG_INPUTS = ('include_spectators', 'scale_capex', 'use_amort', 'manual_amort')
+
+
+NON_NEGATIVE_INPUTS = ('crew_count', 'contestant_count', 'spectator_count', 'ticket_price', 'manual_amort_M')
+
+
+def normalize_inputs(crew_count=None, contestant_count=None, include_spectators=None, spectator_count=None, ticket_price=None,
+                     scale_capex=None, use_amort=(1,), amort_years=None, manual_amort=None, manual_amort_M=None):
+    """Apply the dashboard's `or` defaults and turn checklist values into booleans.
+
+    Omitted arguments take the sidebar's initial values. See normalize_fields()
+    for the fallbacks and the values that are rejected.
+    """
+    return normalize_fields(
+        crew_count=crew_count, contestant_count=contestant_count, include_spectators=len(include_spectators or []) > 0,
+        spectator_count=spectator_count, ticket_price=ticket_price, scale_capex=len(scale_capex or []) > 0,
+        use_amort=len(use_amort or []) > 0, amort_years=amort_years, manual_amort=len(manual_amort or []) > 0,
+        manual_amort_M=manual_amort_M,
+    )
+
+
+def _fallback(name, value):
+    default = DEFAULT_INPUTS[name] if name in DEFAULT_INPUTS else DEFAULT_PARAMS[name]
+    if np.ndim(value) == 0:
+        blank = value is None or value != value or (name in DEFAULT_INPUTS and value == 0)
+        return default if blank else value
+    value = np.asarray(value, dtype=float)
+    blank = np.isnan(value) | (value == 0) if name in DEFAULT_INPUTS else np.isnan(value)
+    return np.where(blank, float(default), value)
+
+
+def _validate(name, value):
+    values = np.asarray(value, dtype=float)
+    if not np.isfinite(values).all():
+        raise ValueError(f"{name} must be a finite number")
+    if name == 'amort_years' and (values < 0).any():
+        raise ValueError("amort_years must be positive")
+    if name in NON_NEGATIVE_INPUTS and (values < 0).any():
+        raise ValueError(f"{name} must not be negative")
+
+
+def normalize_fields(**fields):
+    """Apply the dashboard's fallbacks to model fields and validate them.
+
+    Used by every entry point (dashboard, batch_cli, api) so they all produce
+    results the dashboard could. Values are scalars or 1-D arrays, flags as
+    booleans and numbers with None/NaN for blanks. A sidebar input that is
+    blank or 0 takes its DEFAULT_INPUTS value, like the dashboard's `value or
+    default`; a blank constant takes its DEFAULT_PARAMS value. Scalars are
+    returned as they came. Raises TypeError for unknown fields and ValueError
+    for non-finite numbers and negative counts, prices, amortization periods
+    or amounts.
+    """
+    unknown = set(fields) - set(DEFAULT_INPUTS) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise TypeError(f"unknown scenario fields: {', '.join(sorted(unknown))}")
+    out = {}
+    for name, value in fields.items():
+        if name in FLAG_INPUTS:
+            out[name] = bool(value) if np.ndim(value) == 0 else np.asarray(value, dtype=bool)
+            continue
+        out[name] = _fallback(name, value)
+        _validate(name, out[name])
+    return out
+
+
+def _broadcast(values):
+    """Broadcast a dict of scalars/arrays to a common 1-D scenario axis."""
+    keys = list(values)
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(values[k])) for k in keys))
+    if arrays[0].ndim != 1:
+        raise ValueError("scenario inputs must be scalars or 1-D arrays")
+    return dict(zip(keys, arrays))
+
+
+def components(**kwargs):
+    """Per-scenario building blocks of the model, as (n,) arrays.
+
+    Accepts the same keyword arguments as evaluate(). Costs are split by how
+    they recur: crew_deployment is paid when the crew is flown up, event_opex
+    once per event (contestant/spectator transport, prize pool and their
+    cargo), running_opex every year (salaries, crew cargo, docked vehicle).
+    ticket_revenue is earned per event, base_revenue per year.
+    """
+    unknown = set(kwargs) - set(DEFAULT_INPUTS) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise TypeError(f"unknown scenario fields: {', '.join(sorted(unknown))}")
+    v = _broadcast({**DEFAULT_INPUTS, **DEFAULT_PARAMS, **kwargs})
+    crew, contestants, spectators = (v[k].astype(float) for k in ('crew_count', 'contestant_count', 'spectator_count'))
+    include_spec, scale_cap, use_am, manual_am = (v[k].astype(bool) for k in FLAG_INPUTS)
+    spec = np.where(include_spec, spectators, 0.0)
+
+    # CAPEX
+    extra_people = (np.maximum(crew - v['baseline_crew'], 0) + np.maximum(contestants - v['baseline_contestants'], 0) +
+                    np.maximum(spectators - v['baseline_spectators'], 0))
+    total_capex = (v['capex_phase1'] + np.where(include_spec, v['capex_phase2_additional'], 0.0) +
+                   np.where(scale_cap, extra_people * v['capex_per_extra_person'], 0.0))
+
+    # OPEX
+    event_opex = (contestants * v['contestant_cost_per'] + spec * v['spectator_transport_cost_per'] +
+                  contestants * v['prize_pool_per_contestant'] + (contestants + spec) * v['cargo_per_person'])
+    running_opex = crew * v['crew_salary_per'] + crew * v['cargo_per_person'] + v['docked_vehicle_cost']
+
+    # Amortization
+    annual_amortization = np.where(manual_am, v['manual_amort_M'] * 1e6,
+                                   np.where(use_am, total_capex / v['amort_years'].astype(float), 0.0))
+
+    return {
+        'total_capex': total_capex, 'crew_deployment': crew * v['crew_cost_per'], 'event_opex': event_opex,
+        'running_opex': running_opex, 'ticket_revenue': spec * v['ticket_price'] * 1e6,
+        'base_revenue': v['sponsorship'] + v['broadcasting'] + v['vr_ar'] + v['merchandising'] + np.zeros_like(total_capex),
+        'revenue_growth': v['revenue_growth'].astype(float), 'annual_amortization': annual_amortization, 'use_amort': use_am,
+    }
+
+
+def amortization(total_capex, annual_amortization, n_periods, periods_per_year=1):
+    """Amortization charged in each period, shape (n, n_periods).
+
+    annual_amortization / periods_per_year is charged every period until
+    total_capex has been absorbed; the last charge is whatever is left, so
+    the charges of a long enough horizon add up to total_capex.
+    """
+    per_period = annual_amortization[:, None] / periods_per_year
+    return np.clip(total_capex[:, None] - per_period * np.arange(n_periods), 0.0, per_period)
+
+
+def evaluate(years=10, **kwargs):
+    """Evaluate a batch of scenarios.
+
+    Keyword arguments are any of DEFAULT_INPUTS (already normalized: counts and
+    prices as numbers, flags as booleans) and any of DEFAULT_PARAMS as
+    overrides. Missing values fall back to the defaults. Returns a dict of
+    arrays: total_capex, year1_opex, annual_opex, year1_revenue and
+    annual_amortization with shape (n,), and revenues, opex, net_no_amort and
+    net_with_amort with shape (n, years). Amortization stops once total_capex
+    has been charged.
+    """
+    c = components(**kwargs)
+    total_capex, annual_amortization = c['total_capex'], c['annual_amortization']
+    annual_opex = c['event_opex'] + c['running_opex']
+    year1_opex = annual_opex + c['crew_deployment']
+
+    # Revenue
+    year1_revenue = c['ticket_revenue'] + c['base_revenue']
+    revenues = year1_revenue[:, None] * (1 + c['revenue_growth'])[:, None] ** np.arange(years)
+
+    # Profit
+    opex = np.repeat(annual_opex[:, None], years, axis=1)
+    opex[:, 0] = year1_opex
+    net_no_amort = revenues - opex
+    net_no_amort[:, 0] -= np.where(c['use_amort'], 0.0, total_capex)
+    net_with_amort = revenues - opex - amortization(total_capex, annual_amortization, years)
+
+    return {
+        'total_capex': total_capex, 'year1_opex': year1_opex, 'annual_opex': annual_opex, 'year1_revenue': year1_revenue,
+        'annual_amortization': annual_amortization, 'revenues': revenues, 'opex': opex, 'net_no_amort': net_no_amort,
+        'net_with_amort': net_with_amort,
+    }
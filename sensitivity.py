@@ -0,0 +1,93 @@
+"""Sensitivity analysis: tornado bars and 2-D heatmaps over the scenario engine.
+
+Every sweep is built as one scenario batch and evaluated in a single vectorized
+call. Results are memoized on the (normalized) inputs, so repeating a sweep
+returns right away.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+import scenario_engine
+
+# Numeric sidebar inputs that can be perturbed, with their dcc.Input bounds
+INPUT_BOUNDS = {
+    'crew_count': (1, 50), 'contestant_count': (1, 50), 'spectator_count': (0, 200),
+    'ticket_price': (0.0, 200.0), 'amort_years': (1, 50),
+}
+SENSITIVITY_PARAMS = tuple(INPUT_BOUNDS) + tuple(scenario_engine.DEFAULT_PARAMS)
+METRICS = ('net_no_amort', 'net_with_amort')
+
+
+def cumulative_profit(result, metric='net_no_amort'):
+    """Cumulative profit at the end of the horizon, one value per scenario."""
+    return result[metric].sum(axis=1)
+
+
+def _base_values(inputs):
+    return {**scenario_engine.DEFAULT_PARAMS, **inputs}
+
+
+def tornado(inputs, pct=10.0, params=SENSITIVITY_PARAMS, metric='net_no_amort', years=10):
+    """Swing of cumulative profit when each parameter moves by -pct% / +pct%.
+
+    Returns (base, rows) where rows are (name, low, high) sorted by descending
+    swing |high - low|.
+    """
+    rows = _tornado(tuple(sorted(inputs.items())), float(pct), tuple(params), metric, years)
+    return rows[0], list(rows[1])
+
+
+@lru_cache(maxsize=256)
+def _tornado(inputs_key, pct, params, metric, years):
+    base = _base_values(dict(inputs_key))
+    n = 2 * len(params) + 1
+    batch = {}
+    for i, name in enumerate(params):
+        column = np.full(n, float(base[name]))
+        column[2 * i + 1] *= 1 - pct / 100
+        column[2 * i + 2] *= 1 + pct / 100
+        batch[name] = column
+    profit = cumulative_profit(scenario_engine.evaluate(years=years, **{**dict(inputs_key), **batch}), metric)
+    rows = [(name, profit[2 * i + 1], profit[2 * i + 2]) for i, name in enumerate(params)]
+    rows.sort(key=lambda row: abs(row[2] - row[1]), reverse=True)
+    return profit[0], tuple(rows)
+
+
+def cache_clear():
+    """Forget every memoized tornado and heatmap (e.g. to time the sweeps themselves)."""
+    _tornado.cache_clear()
+    _heatmap.cache_clear()
+
+
+def sweep_range(inputs, name, pct=10.0, steps=200):
+    """Grid of `steps` values spanning +/-pct% around the current value of `name`.
+
+    Parameters whose current value is zero (e.g. spectators) sweep their
+    whole sidebar range instead.
+    """
+    value = float(_base_values(inputs)[name])
+    if value == 0:
+        low, high = INPUT_BOUNDS.get(name, (0.0, 1.0))
+    else:
+        low, high = sorted((value * (1 - pct / 100), value * (1 + pct / 100)))
+    return np.linspace(low, high, steps)
+
+
+def heatmap(inputs, x_param, y_param, pct=10.0, steps=200, metric='net_no_amort', years=10):
+    """Cumulative profit over a steps x steps grid of two parameters.
+
+    Returns (x_values, y_values, z) with z of shape (len(y_values), len(x_values)).
+    """
+    return _heatmap(tuple(sorted(inputs.items())), x_param, y_param, float(pct), steps, metric, years)
+
+
+@lru_cache(maxsize=64)
+def _heatmap(inputs_key, x_param, y_param, pct, steps, metric, years):
+    if x_param == y_param:
+        raise ValueError("heatmap needs two different parameters")
+    inputs = dict(inputs_key)
+    x_values, y_values = sweep_range(inputs, x_param, pct, steps), sweep_range(inputs, y_param, pct, steps)
+    xx, yy = np.meshgrid(x_values, y_values)
+    result = scenario_engine.evaluate(years=years, **{**inputs, x_param: xx.ravel(), y_param: yy.ravel()})
+    return x_values, y_values, cumulative_profit(result, metric).reshape(len(y_values), len(x_values))
@@ -0,0 +1,117 @@
+"""Static image serving for the dashboard.
+
+Instead of inlining images into the layout as base64, the source file and a
+set of resized WebP variants are served from a Flask route. Variant file names
+carry a hash of the source bytes, so responses can be cached as immutable;
+ETags cover revalidation. Variants are generated once and kept on disk.
+Pillow is optional: without it only the original file is served.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from flask import abort, send_from_directory
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+IMAGE_ROUTE = '/images'
+IMAGE_WIDTHS = (480, 800, 1200, 1600)
+CACHE_DIR = Path(__file__).parent / '.cache' / 'images'
+CACHE_MAX_AGE = 365 * 24 * 3600
+WEBP_QUALITY = 80
+
+
+def _source_digest(image_path):
+    with open(image_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def _write_atomic(target, write):
+    """Call write(file) on a unique temporary file next to target, then rename it into place.
+
+    Concurrent workers building the same file each write their own temporary
+    file, and readers never see a partial one.
+    """
+    fd, tmp = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def build_variants(image_path, cache_dir=CACHE_DIR, widths=IMAGE_WIDTHS):
+    """Write resized WebP variants of image_path into cache_dir (once).
+
+    Returns (original_name, [(variant_name, width), ...]), or None if the
+    image does not exist. Variants wider than the source are replaced by one at
+    the source width.
+    """
+    image_path = Path(image_path)
+    if not image_path.exists():
+        return None
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    digest = _source_digest(image_path)
+    original = cache_dir / f"{image_path.stem}-{digest}{image_path.suffix}"
+    if not original.exists():
+        _write_atomic(original, lambda f: f.write(image_path.read_bytes()))
+    if Image is None:
+        return original.name, []
+
+    variants = []
+    with Image.open(image_path) as im:
+        for width in sorted({w for w in widths if w < im.width} | {im.width}):
+            target = cache_dir / f"{image_path.stem}-{digest}-{width}.webp"
+            if not target.exists():
+                height = round(im.height * width / im.width)
+                resized = im.resize((width, height), Image.LANCZOS)
+                _write_atomic(target, lambda f: resized.save(f, 'WEBP', quality=WEBP_QUALITY, method=6))
+            variants.append((target.name, width))
+    return original.name, variants
+
+
+def register_image_route(server, cache_dir=CACHE_DIR, route=IMAGE_ROUTE):
+    """Serve files from cache_dir under `route` with ETag and long-lived Cache-Control."""
+    cache_dir = Path(cache_dir)
+
+    @server.route(f'{route}/<path:filename>', endpoint='cached_image')
+    def cached_image(filename):
+        if not (cache_dir / filename).is_file():
+            abort(404)
+        response = send_from_directory(cache_dir, filename, conditional=True, etag=True, max_age=CACHE_MAX_AGE)
+        response.headers['Cache-Control'] = f'public, max-age={CACHE_MAX_AGE}, immutable'
+        return response
+
+
+def image_sources(image_path, server, cache_dir=CACHE_DIR, route=IMAGE_ROUTE):
+    """Prepare variants, mount the route and return {'src', 'srcset', 'width', 'height'} for an <img>.
+
+    Returns None if the image does not exist.
+    """
+    built = build_variants(image_path, cache_dir)
+    if built is None:
+        return None
+    if 'cached_image' not in server.view_functions:
+        register_image_route(server, cache_dir, route)
+    original, variants = built
+    with open(image_path, 'rb') as f:
+        width, height = _png_size(f.read(24))
+    return {
+        'src': f'{route}/{original}',
+        'srcset': ', '.join(f'{route}/{name} {w}w' for name, w in variants),
+        'width': width, 'height': height,
+    }
+
+
+def _png_size(header):
+    """Width/height from a PNG header (None, None for other formats)."""
+    if header[:8] != b'\x89PNG\r\n\x1a\n':
+        return None, None
+    return int.from_bytes(header[16:20], 'big'), int.from_bytes(header[20:24], 'big')
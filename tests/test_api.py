@@ -0,0 +1,118 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+from flask import Flask
+
+import api
+import scenario_engine
+
+
+@pytest.fixture
+def client():
+    server = Flask(__name__)
+    api.register_api(server)
+    return server.test_client()
+
+
+def test_evaluate_json(client):
+    response = client.post('/api/v1/evaluate?years=3&discount_rate=0.08',
+                           json={'scenarios': [{'id': 'base'}, {'id': 'spec', 'include_spectators': True, 'spectator_count': 40}]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 2
+    assert body['columns']['id'] == ['base', 'spec']
+    expected = scenario_engine.evaluate(3, include_spectators=np.array([False, True]), spectator_count=np.array([0, 40]))
+    assert body['columns']['total_capex'] == pytest.approx(expected['total_capex'].tolist())
+    assert 'revenues_y3' in body['columns'] and 'npv' in body['columns']
+
+
+def test_columns_and_gzip_in_both_directions(client):
+    body = gzip.compress(json.dumps({'columns': {'crew_count': list(range(1, 201))}}).encode())
+    response = client.post('/api/v1/evaluate', data=body, headers={'Content-Encoding': 'gzip', 'Accept-Encoding': 'gzip'},
+                           content_type='application/json')
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data))['count'] == 200
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_non_finite_values_become_null(client):
+    response = client.post('/api/v1/evaluate?years=1&discount_rate=0.08',
+                           json={'scenarios': [{}, {'manual_amort': True, 'manual_amort_M': 1e303}]})
+    columns = response.get_json()['columns']
+    assert columns['irr'] == [None, None]
+    assert columns['annual_amortization'][1] is None
+    assert b'NaN' not in response.data and b'Infinity' not in response.data
+
+
+@pytest.mark.parametrize('body, query', [
+    ({'scenarios': []}, ''), ({'scenarios': 'x'}, ''), ({'columns': {'crew_count': [1], 'ticket_price': [1, 2]}}, ''),
+    ({'scenarios': [{'amort_years': -1}]}, ''), ({'scenarios': [{'crew_count': 'many'}]}, ''), ({'scenarios': [{}]}, '?years=0'),
+    ({'scenarios': [{}]}, '?discount_rate=abc'),
+])
+def test_bad_requests(client, body, query):
+    response = client.post(f'/api/v1/evaluate{query}', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_invalid_json_and_gzip(client):
+    assert client.post('/api/v1/evaluate', data=b'{', content_type='application/json').status_code == 400
+    assert client.post('/api/v1/evaluate', data=b'not gzip', headers={'Content-Encoding': 'gzip'},
+                       content_type='application/json').status_code == 400
+
+
+def test_gzip_bomb_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(api, 'MAX_BODY_BYTES', 1 << 16)
+    bomb = gzip.compress(b'{"scenarios": [' + b' ' * (1 << 20) + b']}')
+    response = client.post('/api/v1/evaluate', data=bomb, headers={'Content-Encoding': 'gzip'}, content_type='application/json')
+    assert response.status_code == 413
+    assert client.post('/api/v1/evaluate', data=b' ' * (1 << 17), content_type='application/json').status_code == 413
+
+
+def test_arrow_round_trip(client):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.ipc
+    table = pa.table({'id': ['a', 'b'], 'crew_count': [10, 20]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    response = client.post('/api/v1/evaluate', data=sink.getvalue().to_pybytes(), content_type=api.ARROW_STREAM,
+                           headers={'Accept': api.ARROW_STREAM})
+    assert response.status_code == 200
+    result = pa.ipc.open_stream(response.data).read_all()
+    assert result.column('id').to_pylist() == ['a', 'b']
+    assert result.column('total_capex').to_pylist() == pytest.approx(scenario_engine.evaluate(crew_count=np.array([10, 20]))['total_capex'].tolist())
+
+
+@pytest.mark.parametrize('flags', [[None, 1.0, 0.0], [None, True, False]])
+def test_arrow_null_flags_take_the_default(client, flags):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.ipc
+    table = pa.table({'include_spectators': flags, 'spectator_count': [40, 40, 40]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    response = client.post('/api/v1/evaluate', data=sink.getvalue().to_pybytes(), content_type=api.ARROW_STREAM)
+    off, on = scenario_engine.evaluate(include_spectators=np.array([False, True]), spectator_count=40)['total_capex']
+    assert response.get_json()['columns']['total_capex'] == pytest.approx([off, on, off])
+
+
+def test_arrow_output_with_mixed_passthrough_types_is_not_acceptable(client):
+    pytest.importorskip('pyarrow')
+    response = client.post('/api/v1/evaluate', json={'scenarios': [{'id': {'a': 1}}, {'id': 2}]}, headers={'Accept': api.ARROW_STREAM})
+    assert response.status_code == 406
+    assert client.post('/api/v1/evaluate', json={'scenarios': [{'id': {'a': 1}}, {'id': 2}]}).status_code == 200
+
+
+def test_invalid_arrow_stream(client):
+    pytest.importorskip('pyarrow')
+    assert client.post('/api/v1/evaluate', data=b'garbage', content_type=api.ARROW_STREAM).status_code == 400
+
+
+def test_fields(client):
+    body = client.get('/api/v1/fields').get_json()
+    assert body['inputs'] == scenario_engine.DEFAULT_INPUTS
+    assert body['max_scenarios'] == api.MAX_SCENARIOS
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import background_jobs
+
+pytest.importorskip('diskcache')
+pytest.importorskip('multiprocess')
+pytest.importorskip('psutil')
+
+
+def sleeper(*_):
+    time.sleep(30)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = background_jobs.make_manager(tmp_path)
+    yield manager
+    for key in list(manager.handle.iterkeys()):
+        if key.startswith('job-') and key.endswith('-waiters'):
+            manager.terminate_job(int(key.split('-')[1]))
+    manager.handle.close()
+
+
+def wait_until_stopped(manager, job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while manager.job_running(job) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not manager.job_running(job)
+
+
+def test_identical_requests_share_one_job(manager):
+    first = manager.call_job_fn('key', sleeper, (), {})
+    assert manager.job_running(first)
+    assert manager.call_job_fn('key', sleeper, (), {}) == first
+    assert manager.handle.get(f'job-{first}-waiters') == 2
+
+    manager.terminate_job(first)  # one client moved on, the other still waits
+    assert manager.job_running(first)
+    manager.terminate_job(first)
+    assert wait_until_stopped(manager, first)
+
+
+def test_terminated_job_is_not_joined(manager):
+    first = manager.call_job_fn('key', sleeper, (), {})
+    manager.terminate_job(first)
+    second = manager.call_job_fn('key', sleeper, (), {})
+    assert second != first
+    assert manager.handle.get(f'job-{second}-waiters') == 1
+    assert manager.handle.get(f'job-{first}-waiters') is None
+
+
+def test_finished_result_is_reused_without_a_process(manager):
+    manager.handle.set('key', 'result')
+    assert manager.call_job_fn('key', sleeper, (), {}) == background_jobs.NO_PROCESS
+    assert not manager.job_running(background_jobs.NO_PROCESS)
+    manager.terminate_job(background_jobs.NO_PROCESS)  # nothing to stop
+
+
+def test_synchronous_fallback():
+    dash = pytest.importorskip('dash')
+    app = dash.Dash(__name__)
+    calls = []
+
+    def work(set_progress, value):
+        set_progress(50)
+        calls.append(value)
+        return value * 2
+
+    background_jobs.register_callback(app, None, work, dash.Output('out', 'children'), dash.Input('in', 'value'))
+    callback, = app.callback_map.values()
+    assert callback['callback'].__wrapped__(21) == 42 and calls == [21]
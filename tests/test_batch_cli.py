@@ -0,0 +1,72 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+import batch_cli
+import scenario_engine
+
+
+def test_csv_round_trip(tmp_path):
+    source = tmp_path / 'scenarios.csv'
+    source.write_text("id,crew_count,include_spectators,spectator_count\nbase,,,\nspec40,20,true,40\n")
+    target = tmp_path / 'results.csv'
+    assert batch_cli.run(source, target, years=5, discount_rate=0.08) == 2
+    with open(target, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['id'] for row in rows] == ['base', 'spec40']
+    expected = scenario_engine.evaluate(5, crew_count=np.array([15, 20]), include_spectators=np.array([False, True]),
+                                        spectator_count=np.array([0, 40]))
+    for row, capex, revenue in zip(rows, expected['total_capex'], expected['revenues'][:, 4]):
+        assert float(row['total_capex']) == pytest.approx(capex)
+        assert float(row['revenues_y5']) == pytest.approx(revenue)
+    assert 'npv' in rows[0] and 'revenues_y6' not in rows[0]
+
+
+def test_jsonl_to_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    source = tmp_path / 'scenarios.jsonl'
+    source.write_text('\n'.join(json.dumps({'id': i, 'ticket_price': 10.0 * i}) for i in range(1, 6)) + '\n')
+    target = tmp_path / 'results.parquet'
+    assert batch_cli.run(source, target, chunk_size=2) == 5
+    table = pyarrow.parquet.read_table(target)
+    assert table.column('id').to_pylist() == [1, 2, 3, 4, 5]
+
+
+def test_zero_and_blank_inputs_take_dashboard_defaults():
+    out = batch_cli.evaluate_chunk({'crew_count': [0, None, ''], 'amort_years': ['0', 0, None], 'manual_amort_M': [0, 0, 0]})
+    dashboard = scenario_engine.evaluate(**scenario_engine.normalize_inputs())
+    np.testing.assert_allclose(out['total_capex'], dashboard['total_capex'][0])
+    np.testing.assert_allclose(out['annual_amortization'], dashboard['annual_amortization'][0])
+    assert np.isfinite(out['annual_amortization']).all()
+
+
+@pytest.mark.parametrize('columns', [{'crew_count': [-1]}, {'amort_years': [-5]}, {'ticket_price': ['inf']}])
+def test_invalid_inputs_are_rejected(columns):
+    with pytest.raises(ValueError):
+        batch_cli.evaluate_chunk(columns)
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_blank_flag_cells_take_the_default(tmp_path, fmt):
+    source = tmp_path / f'scenarios.{fmt}'
+    if fmt == 'csv':  # pyarrow reads the column as numbers with a null
+        source.write_text("id,include_spectators,spectator_count\nblank,,40\non,1,40\noff,0,40\n")
+    else:
+        source.write_text('\n'.join(json.dumps({'id': i, 'include_spectators': flag, 'spectator_count': 40})
+                                    for i, flag in (('blank', None), ('on', 1), ('off', 0))) + '\n')
+    target = tmp_path / 'results.csv'
+    batch_cli.run(source, target)
+    with open(target, newline='') as f:
+        capex = {row['id']: float(row['total_capex']) for row in csv.DictReader(f)}
+    off, on = scenario_engine.evaluate(include_spectators=np.array([False, True]), spectator_count=40)['total_capex']
+    assert capex == {'blank': pytest.approx(off), 'on': pytest.approx(on), 'off': pytest.approx(off)}
+
+
+def test_nan_flags_are_blank():
+    out = batch_cli.evaluate_chunk({'include_spectators': np.array([np.nan, 1.0]), 'spectator_count': np.array([40, 40])})
+    np.testing.assert_allclose(out['total_capex'], scenario_engine.evaluate(include_spectators=np.array([False, True]))['total_capex'])
+    out = batch_cli.evaluate_chunk({'include_spectators': [float('nan'), True]})
+    assert out['total_capex'][0] == scenario_engine.evaluate()['total_capex'][0]
@@ -0,0 +1,39 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+import run  # noqa: E402
+from timing import percentile  # noqa: E402
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, q) for q in (0, 50, 90, 99, 100)] == [1, 50, 90, 99, 100]
+    assert percentile([3.0], 99) == 3.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_compare_flags_regressions_by_metric_kind():
+    baseline = {'engine': {'evaluate_ms': 10.0, 'tiny_ms': 0.1}, 'render': {'layout_bytes': 1000},
+                'load': {'clients_1': {'throughput_rps': 100.0, 'requests': 50, 'errors': 0}}}
+    current = {'engine': {'evaluate_ms': 14.0, 'tiny_ms': 0.3}, 'render': {'layout_bytes': 900},
+               'load': {'clients_1': {'throughput_rps': 70.0, 'requests': 80, 'errors': 2}}}
+    rows = {metric: (change, worse) for metric, _, _, change, worse in run.compare(current, baseline, 0.25)}
+    assert rows['engine.evaluate_ms'] == (pytest.approx(0.4), True)
+    assert rows['engine.tiny_ms'][1] is False  # under the noise floor
+    assert rows['render.layout_bytes'] == (pytest.approx(-0.1), False)
+    assert rows['load.clients_1.throughput_rps'] == (pytest.approx(-0.3), True)
+    assert rows['load.clients_1.errors'] == (math.inf, True)
+    assert 'load.clients_1.requests' not in rows
+
+
+def test_startup_rows_cover_the_uncached_start(monkeypatch):
+    row = {'import': 0.1, 'create_app': 0.5, 'first_layout': 0.3, 'total': 0.9, 'layout_bytes': 1000}
+    monkeypatch.setattr(run.startup, 'start_once', lambda cache_dir=None: row)
+    rows = run.run_startup(1)
+    assert list(rows) == ['no_cache', 'cold_cache', 'warm_cache']
+    assert rows['no_cache'] == pytest.approx({'import_ms': 100.0, 'create_app_ms': 500.0, 'first_layout_ms': 300.0, 'total_ms': 900.0, 'layout_bytes': 1000})
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import finance_metrics
+import scenario_engine
+
+
+def test_npv_and_irr_of_known_flows():
+    flows = np.array([[-100.0, 110.0, 0.0], [-100.0, 60.0, 60.0], [-100.0, 0.0, 121.0], [-100.0, 10.0, 10.0]])
+    assert finance_metrics.npv(flows, 0.1) == pytest.approx([0.0, 4.132231, 0.0, -82.644628])
+    assert finance_metrics.irr(flows) == pytest.approx([0.10, 0.130662, 0.10, -0.629844], abs=1e-6)
+
+
+def test_irr_is_nan_without_sign_change():
+    flows = np.array([[-100.0, -10.0, -10.0], [100.0, 10.0, 10.0]])
+    assert np.isnan(finance_metrics.irr(flows)).all()
+
+
+def test_irr_of_monthly_flows_is_annual():
+    monthly = np.array([[-100.0] + [0.0] * 11 + [110.0]])
+    assert finance_metrics.irr(monthly, periods_per_year=12) == pytest.approx([0.10], abs=1e-9)
+
+
+def test_payback_and_breakeven():
+    flows = np.array([[-100.0, 40.0, 40.0, 40.0], [-100.0, 10.0, 10.0, 10.0]])
+    assert finance_metrics.payback_period(flows)[0] == 3
+    assert np.isnan(finance_metrics.payback_period(flows)[1])
+    assert np.isnan(finance_metrics.payback_period(flows, 0.1)[0])  # discounted, 40 a year never repays 100 in 3 years
+
+
+def test_summarize_matches_the_scalar_definitions():
+    result = scenario_engine.evaluate(include_spectators=np.array([False, True]), spectator_count=np.array([0, 40]))
+    flows = finance_metrics.cash_flows(result)
+    summary = finance_metrics.summarize(flows, 0.08)
+    years = np.arange(flows.shape[1])
+    for i, row in enumerate(flows):
+        assert summary['npv'][i] == pytest.approx((row / 1.08 ** years).sum())
+        if not np.isnan(summary['irr'][i]):
+            assert (row / (1 + summary['irr'][i]) ** years).sum() == pytest.approx(0.0, abs=1e-3 * abs(row[0]))
+        cumulative = np.cumsum(row)
+        expected = np.argmax(cumulative >= 0) if (cumulative >= 0).any() else np.nan
+        assert summary['breakeven_year'][i] == pytest.approx(expected, nan_ok=True)
@@ -0,0 +1,108 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('dash')
+
+import financial_model as fm
+import result_cache
+import scenario_engine
+import sensitivity
+
+
+@pytest.fixture(scope='module')
+def client():
+    return fm.create_app(layout_cache_dir=None, background=False).server.test_client()
+
+
+def test_profit_figure_trace_order():
+    fig = fm.build_profit_figure(fm.model_row(scenario_engine.normalize_inputs()))
+    assert [trace.uid for trace in fig.data] == list(fm.PROFIT_TRACES)
+    assert fig.data[fm.TRACE_INDEX['revenues']].name == "Revenue ($M)"
+    assert fig.data[fm.TRACE_INDEX['net_no_amort']].name == "Net Profit (No Amort) ($M)"
+
+
+def test_model_callbacks_do_not_run_on_page_load(client):
+    dependencies = json.loads(client.get('/_dash-dependencies').data)
+    on_load = {d['output'] for d in dependencies if not d.get('prevent_initial_call')}
+    assert not any(chart in output for output in on_load for chart in ('tornado-chart', 'sensitivity-heatmap', 'goal-seek-chart',
+                                                                        'profit-chart', 'metric-'))
+
+
+def test_layout_ships_initial_figures(client):
+    layout = client.get('/_dash-layout').get_json()
+    figures = {}
+
+    def walk(node):
+        if isinstance(node, list):
+            for child in node:
+                walk(child)
+        elif isinstance(node, dict) and 'props' in node:
+            if node['props'].get('id') in ('tornado-chart', 'sensitivity-heatmap', 'goal-seek-chart'):
+                figures[node['props']['id']] = node['props'].get('figure')
+            for value in node['props'].values():
+                walk(value)
+
+    walk(layout)
+    assert set(figures) == {'tornado-chart', 'sensitivity-heatmap', 'goal-seek-chart'}
+    assert all(figure and figure['data'] for figure in figures.values())
+    steps = fm.HEATMAP_PREVIEW_STEPS
+    assert figures['sensitivity-heatmap']['data'][0]['z']['shape'].replace(' ', '') == f'{steps},{steps}'
+
+
+def test_layout_stays_small(client):
+    assert len(client.get('/_dash-layout').data) < 128 * 1024  # no full-resolution heatmap in the initial page
+
+
+def test_sensitivity_update_sends_the_full_heatmap():
+    sidebar = [15, 12, [], 0, 60.0, [], [1], 10, [], 570.0]
+    _, heatmap = fm.update_sensitivity(lambda *_: None, *sidebar, *fm.SENSITIVITY_DEFAULTS)
+    assert heatmap.data[0].z.shape == (fm.HEATMAP_STEPS, fm.HEATMAP_STEPS)
+
+
+def test_patches_address_traces_by_uid():
+    inputs = scenario_engine.normalize_inputs(include_spectators=[1], spectator_count=40, ticket_price=80.0)
+    _, fig, _ = fm.update_revenue([1], 40, 80.0)
+    operation, = fig.to_plotly_json()['operations']
+    assert operation['location'] == ['data', fm.TRACE_INDEX['revenues'], 'y']
+    assert operation['params']['value'] == pytest.approx(list(fm.model_row(inputs)['revenues']))
+
+    bands = fm.update_risk_bands(lambda *_: None, {'enabled': False}).to_plotly_json()['operations']
+    assert {op['location'][1] for op in bands} == {fm.TRACE_INDEX[uid] for uid in fm.PROFIT_TRACES[:3 * len(fm.RISK_BANDS)]}
+
+
+def test_risk_bands_use_the_configured_distributions(monkeypatch):
+    monkeypatch.setattr(fm, 'dashboard_cache', result_cache.ResultCache())
+    inputs = scenario_engine.normalize_inputs()
+    fixed = {name: ('fixed', scenario_engine.DEFAULT_PARAMS[name]) for name in fm.monte_carlo.DEFAULT_DISTRIBUTIONS}
+    monkeypatch.setattr(fm, 'risk_distributions', fixed)
+    bands = fm.risk_bands(inputs, 2_000)
+    base = fm.model_row(inputs)['revenues']
+    for band in bands['revenues']:  # P5, P50, P95 collapse onto the deterministic run
+        assert band == pytest.approx(list(base), rel=0.01)
+    monkeypatch.setattr(fm, 'risk_distributions', fm.monte_carlo.DEFAULT_DISTRIBUTIONS)
+    assert fm.risk_bands(inputs, 2_000) != bands
+
+
+def test_layout_key_covers_every_module_the_layout_runs(monkeypatch):
+    from plotly.io.json import to_json_plotly
+    modules = {str(Path(path).resolve()): Path(path).stem for path in Path(fm.__file__).resolve().parent.glob('*.py')}
+    called = set()
+
+    def trace(frame, event, arg):
+        if event == 'call' and frame.f_code.co_filename in modules:
+            called.add(modules[frame.f_code.co_filename])
+
+    monkeypatch.setattr(fm, 'dashboard_cache', result_cache.ResultCache())  # compute, don't reuse earlier results
+    sensitivity.cache_clear()
+    sys.setprofile(trace)
+    try:
+        to_json_plotly(fm.build_layout(None))  # Deferred figures are built here
+    finally:
+        sys.setprofile(None)
+    # Modules that only cache, time or serialize what is built do not change the layout
+    keyed = {Path(m.__file__).stem for m in fm.LAYOUT_MODULES} | {'financial_model', 'layout_cache', 'result_cache', 'instrumentation'}
+    assert {'goal_seek', 'sensitivity', 'scenario_engine'} <= called
+    assert called <= keyed
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import goal_seek
+import scenario_engine
+
+INPUTS = scenario_engine.normalize_inputs(include_spectators=[1], spectator_count=40)
+YEARS = np.arange(1, 11)
+
+
+@pytest.mark.parametrize('param', ['ticket_price', 'revenue_growth', 'contestant_cost_per'])
+def test_solution_meets_breakeven(param):
+    required = goal_seek.solve(param, INPUTS, 'breakeven', year=YEARS)
+    met = ~np.isnan(required)
+    assert met[-5:].all()
+    gap = goal_seek.target_gap(INPUTS, param, required[met], 'breakeven', year=YEARS[met])
+    assert gap == pytest.approx(0.0, abs=1e3)
+
+
+@pytest.mark.parametrize('target, goal', [('npv', 1e9), ('margin', 0.2)])
+def test_solution_meets_npv_and_margin(target, goal):
+    required = goal_seek.solve('ticket_price', INPUTS, target, year=10, goal=goal, discount_rate=0.08)
+    assert goal_seek.target_gap(INPUTS, 'ticket_price', required, target, year=10, goal=goal, discount_rate=0.08) == pytest.approx(0.0, abs=1e3)
+
+
+def test_unreachable_targets_are_nan():
+    required = goal_seek.solve('ticket_price', INPUTS, 'breakeven', year=1, bounds=(0.0, 100.0))
+    assert np.isnan(required).all()
+    assert goal_seek.target_gap(INPUTS, 'ticket_price', [100.0], 'breakeven', year=1)[0] < 0
+
+
+def test_counts_round_to_the_side_that_meets_the_target():
+    required = goal_seek.solve('spectator_count', INPUTS, 'breakeven', year=YEARS)
+    for year, count in zip(YEARS, required):
+        if np.isnan(count) or count == 0:
+            continue
+        assert count == int(count)
+        assert goal_seek.target_gap(INPUTS, 'spectator_count', [count], 'breakeven', year=year)[0] >= 0
+        assert goal_seek.target_gap(INPUTS, 'spectator_count', [count - 1], 'breakeven', year=year)[0] < 0
+
+
+def test_years_and_goals_broadcast():
+    required = goal_seek.solve('ticket_price', INPUTS, 'npv', year=[5, 10], goal=[[0.0], [1e9]])
+    assert required.shape == (4,)
+    assert required[1] < required[0] and required[2] > required[0]
+
+
+def test_unknown_parameter_or_target():
+    with pytest.raises(ValueError):
+        goal_seek.solve('warp_factor', INPUTS)
+    with pytest.raises(ValueError):
+        goal_seek.solve('ticket_price', INPUTS, 'payback')
@@ -0,0 +1,63 @@
+import re
+
+import pytest
+
+import instrumentation
+
+dash = pytest.importorskip('dash')
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.setattr(instrumentation, '_enabled', False)  # restored after the test
+    app = dash.Dash(__name__)
+    app.layout = dash.html.Div([dash.dcc.Input(id='in', value=1), dash.html.Div(id='out')])
+
+    @app.callback(dash.Output('out', 'children'), dash.Input('in', 'value'))
+    def double(value):
+        with instrumentation.phase('model'):
+            return value * 2
+
+    instrumentation.instrument(app.server, profile_on_demand=True, profile_dir=tmp_path)
+    return app
+
+
+def callback_body(value):
+    return {'output': 'out.children', 'outputs': {'id': 'out', 'property': 'children'},
+            'inputs': [{'id': 'in', 'property': 'value', 'value': value}], 'changedPropIds': ['in.value']}
+
+
+def sample(metrics, name, **labels):
+    pattern = re.escape(name) + r'\{([^}]*)\} (\S+)'
+    for found, value in re.findall(pattern, metrics):
+        if all(f'{key}="{label}"' in found for key, label in labels.items()):
+            return float(value)
+    return None
+
+
+def test_callback_requests_are_labelled(app):
+    client = app.server.test_client()
+    assert client.post('/_dash-update-component', json=callback_body(21)).status_code == 200
+    metrics = client.get('/metrics').data.decode()
+    assert sample(metrics, 'sga_requests_total', route='/_dash-update-component', callback='out.children', status='200') >= 1
+    assert sample(metrics, 'sga_callback_phase_seconds_count', callback='out.children', phase='model') >= 1
+
+
+def test_callback_body_is_parsed_once(app, monkeypatch):
+    loads = app.server.json.loads
+    calls = []
+    monkeypatch.setattr(app.server.json, 'loads', lambda *args, **kwargs: calls.append(1) or loads(*args, **kwargs))
+    app.server.test_client().post('/_dash-update-component', json=callback_body(1))
+    assert len(calls) == 1
+
+
+def test_profile_files_are_unique(app, tmp_path):
+    client = app.server.test_client()
+    for _ in range(3):
+        client.post('/_dash-update-component', json=callback_body(1), headers={'X-Profile': '1'})
+    assert len(list(tmp_path.glob('*.prof'))) == 3
+
+
+def test_phase_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, '_enabled', False)
+    assert instrumentation.phase('model') is instrumentation.phase('figure')
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+pytest.importorskip('dash')
+
+from dash import html  # noqa: E402
+
+from layout_cache import CachedLayoutDash, Deferred, content_key  # noqa: E402
+
+
+def test_content_key_hashes_file_contents(tmp_path):
+    source = tmp_path / 'module.py'
+    source.write_text('A = 1\n')
+    key = content_key(source, '1.0')
+    assert key == content_key(source, '1.0') and len(key) == 16
+    assert content_key(source, '1.1') != key
+    source.write_text('A = 2\n')
+    assert content_key(source, '1.0') != key
+
+
+def test_layout_is_written_once_and_served_from_cache(tmp_path):
+    built = []
+    app = CachedLayoutDash(__name__, layout_cache_dir=tmp_path, layout_key='0123456789abcdef')
+    app.layout = html.Div(Deferred(lambda: built.append(1) or 'hello'), id='root')
+    client = app.server.test_client()
+    assert json.loads(client.get('/_dash-layout').data)['props']['children'] == 'hello'
+    client.get('/_dash-layout')
+    assert built == [1]
+    assert (tmp_path / '0123456789abcdef.json').exists()
+
+    fresh = CachedLayoutDash(__name__, layout_cache_dir=tmp_path, layout_key='0123456789abcdef')
+    fresh.layout = html.Div(Deferred(lambda: built.append(2) or 'rebuilt'), id='root')
+    assert json.loads(fresh.server.test_client().get('/_dash-layout').data)['props']['children'] == 'hello'
+    assert built == [1]
+
+
+def test_new_key_removes_only_old_layout_files(tmp_path):
+    (tmp_path / '0000000000000000.json').write_text('{}')
+    (tmp_path / 'settings.json').write_text('{}')
+    app = CachedLayoutDash(__name__, layout_cache_dir=tmp_path, layout_key='ffffffffffffffff')
+    app.layout = html.Div(id='root')
+    app.layout_json()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['ffffffffffffffff.json', 'settings.json']
+
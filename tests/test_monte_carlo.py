@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import monte_carlo
+import scenario_engine
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = np.random.default_rng(0)
+    values = np.column_stack([rng.lognormal(20, 1, 50_000), -rng.lognormal(18, 0.5, 50_000)])
+    sketch = monte_carlo.QuantileSketch(2, relative_accuracy=0.01)
+    for block in np.array_split(values, 7):
+        sketch.merge(monte_carlo.QuantileSketch(2, relative_accuracy=0.01).add(block))
+    expected = np.quantile(values, [0.05, 0.5, 0.95], axis=0)
+    np.testing.assert_allclose(sketch.quantile([0.05, 0.5, 0.95]), expected, rtol=0.03)
+
+
+def test_sketches_with_different_settings_do_not_merge():
+    with pytest.raises(ValueError):
+        monte_carlo.QuantileSketch(1, 0.01).merge(monte_carlo.QuantileSketch(1, 0.02))
+
+
+def test_simulate_is_reproducible_and_independent_of_workers():
+    inputs = scenario_engine.normalize_inputs()
+    in_process = monte_carlo.simulate(inputs, draws=25_000, chunk_size=10_000, workers=1, seed=7)
+    pooled = monte_carlo.simulate(inputs, draws=25_000, chunk_size=10_000, workers=2, seed=7)
+    assert in_process['draws'] == 25_000
+    for name in monte_carlo.OUTPUTS:
+        assert in_process[name].shape == (3, 10)
+        np.testing.assert_array_equal(in_process[name], pooled[name])
+        assert (in_process[name][0] <= in_process[name][1]).all() and (in_process[name][1] <= in_process[name][2]).all()
+
+
+def test_pool_is_reused():
+    inputs = scenario_engine.normalize_inputs()
+    monte_carlo.simulate(inputs, draws=2_000, chunk_size=1_000, workers=2, seed=1)
+    pool = monte_carlo._pools[2][1]
+    monte_carlo.simulate(inputs, draws=2_000, chunk_size=1_000, workers=2, seed=2)
+    assert monte_carlo._pools[2][1] is pool
+
+
+def test_progress_reports_every_chunk():
+    calls = []
+    monte_carlo.simulate(scenario_engine.normalize_inputs(), draws=2_500, chunk_size=1_000, workers=1,
+                         progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(1_000, 2_500), (2_000, 2_500), (2_500, 2_500)]
+
+
+@pytest.mark.parametrize('draws', [0, -5, 1.5])
+def test_draws_must_be_positive(draws):
+    with pytest.raises(ValueError):
+        monte_carlo.simulate(scenario_engine.normalize_inputs(), draws=draws)
+
+
+def test_draw_rejects_unknown_constants():
+    with pytest.raises(ValueError):
+        monte_carlo.draw(np.random.default_rng(0), {'crew_count': ('fixed', 1)}, 10)
+    with pytest.raises(ValueError):
+        monte_carlo.draw(np.random.default_rng(0), {'vr_ar': ('cauchy', 1)}, 10)
+
+
+def test_distributions_from_env(monkeypatch, tmp_path):
+    path = tmp_path / 'distributions.json'
+    path.write_text('{"vr_ar": ["fixed", 1e8], "revenue_growth": ["normal", 0.05, 0.01]}')
+    monkeypatch.setenv('SGA_MC_DISTRIBUTIONS', str(path))
+    assert monte_carlo.from_env() == {'vr_ar': ('fixed', 1e8), 'revenue_growth': ('normal', 0.05, 0.01)}
+    monkeypatch.delenv('SGA_MC_DISTRIBUTIONS')
+    assert monte_carlo.from_env() is monte_carlo.DEFAULT_DISTRIBUTIONS
+    path.write_text('{"crew_count": ["fixed", 12]}')
+    with pytest.raises(ValueError):
+        monte_carlo.load_distributions(path)
@@ -0,0 +1,63 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import finance_metrics
+import optimizer
+import scenario_engine
+
+BOUNDS = {'crew_count': (10, 20), 'contestant_count': (8, 14), 'spectator_count': (40, 70)}
+PRICES = np.arange(20.0, 101.0, 20.0)
+
+
+def brute_force(objective, discount_rate=0.08, years=10):
+    """(capex, score) pairs of the Pareto front from evaluating every configuration."""
+    grid = list(itertools.product(*(range(low, high + 1) for low, high in BOUNDS.values()), PRICES, (False, True), (False, True)))
+    columns = {name: np.array(values) for name, values in zip(optimizer.DIMENSIONS + optimizer.FLAGS, zip(*grid))}
+    result = scenario_engine.evaluate(years=years, **{**scenario_engine.normalize_inputs(), **columns})
+    score = optimizer._score(result, objective, discount_rate, years)
+    capex = result['total_capex']
+    front, best = set(), -np.inf
+    for c in np.unique(capex):  # ascending CAPEX: on the front if it beats everything cheaper
+        top = score[capex == c].max()
+        if top > best:
+            front.add((round(float(c)), round(float(top), 3)))
+            best = top
+    return front, score.max()
+
+
+@pytest.mark.parametrize('objective', optimizer.OBJECTIVES)
+def test_front_matches_brute_force(objective):
+    found = optimizer.optimize(objective, bounds=BOUNDS, ticket_prices=PRICES, block_size=64, workers=1)
+    expected_front, expected_best = brute_force(objective)
+    if objective == 'npv':
+        assert found['best']['npv'] == pytest.approx(expected_best)
+        assert {(round(p['total_capex']), round(p['npv'], 3)) for p in found['front']} == expected_front
+    else:
+        assert found['best']['breakeven_year'] == round(-expected_best)
+        assert len(found['front']) == len(expected_front)
+    assert [p['total_capex'] for p in found['front']] == sorted(p['total_capex'] for p in found['front'])
+    assert found['stats']['pruned'] > 0
+
+
+def test_best_point_reproduces_its_objective():
+    found = optimizer.optimize('npv', bounds=BOUNDS, ticket_prices=PRICES, workers=1)
+    best = found['best']
+    result = scenario_engine.evaluate(**{**scenario_engine.normalize_inputs(),
+                                         **{name: best[name] for name in optimizer.DIMENSIONS + optimizer.FLAGS}})
+    assert finance_metrics.npv(finance_metrics.cash_flows(result), 0.08)[0] == pytest.approx(best['npv'])
+    assert result['total_capex'][0] == pytest.approx(best['total_capex'])
+
+
+def test_progress_reaches_the_whole_space():
+    calls = []
+    found = optimizer.optimize('npv', bounds=BOUNDS, ticket_prices=PRICES, workers=1, progress=lambda done, total: calls.append((done, total)))
+    assert calls[-1] == (found['stats']['space'],) * 2
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        optimizer.optimize('irr')
+    with pytest.raises(ValueError):
+        optimizer.optimize('npv', bounds={'crew_count': (5, 4)})
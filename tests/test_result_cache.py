@@ -0,0 +1,72 @@
+import numpy as np
+
+import result_cache
+from result_cache import ResultCache
+
+
+def test_lru_eviction_and_stats():
+    cache = ResultCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('c') == 3
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 1, 1, 2)
+    assert stats['hit_rate'] == 2 / 3
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, 'time', lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.set('a', 1)
+    now[0] += 10
+    assert cache.get('a') == 1
+    now[0] += 0.5
+    assert cache.get('a', 'gone') == 'gone'
+    assert cache.stats()['expirations'] == 1
+
+
+def test_get_or_compute_computes_once():
+    cache, calls = ResultCache(), []
+    compute = lambda: calls.append(1) or {'rows': [1, 2]}
+    assert cache.get_or_compute('k', compute) is cache.get_or_compute('k', compute)
+    assert len(calls) == 1
+
+
+def test_cached_none_is_a_hit():
+    cache, calls = ResultCache(), []
+    cache.get_or_compute('k', lambda: calls.append(1))
+    cache.get_or_compute('k', lambda: calls.append(1))
+    assert len(calls) == 1
+
+
+def test_shared_store_between_workers(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    first, second = ResultCache(path=path), ResultCache(path=path)
+    first.set(ResultCache.make_key('model', (('crew_count', 15),)), {'revenues': np.arange(3.0)})
+    value = second.get(ResultCache.make_key('model', (('crew_count', 15),)))
+    np.testing.assert_array_equal(value['revenues'], [0.0, 1.0, 2.0])
+    assert second.stats()['shared_hits'] == 1
+    first.clear()
+    assert ResultCache(path=path).get(ResultCache.make_key('model', (('crew_count', 15),))) is None
+
+
+def test_shared_store_keeps_maxsize(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResultCache(maxsize=3, path=path)
+    for i in range(5):
+        cache.set(str(i), i)
+    other = ResultCache(path=path)
+    assert [other.get(str(i)) for i in range(5)] == [None, None, 2, 3, 4]
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv('SGA_RESULT_CACHE_SIZE', '8')
+    monkeypatch.setenv('SGA_RESULT_CACHE_TTL', '1.5')
+    monkeypatch.setenv('SGA_RESULT_CACHE_PATH', str(tmp_path / 'shared.db'))
+    cache = result_cache.from_env()
+    assert (cache.maxsize, cache.ttl, cache.path) == (8, 1.5, str(tmp_path / 'shared.db'))
+    monkeypatch.delenv('SGA_RESULT_CACHE_PATH')
+    assert result_cache.from_env().path is None
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import scenario_compare
+import scenario_engine
+
+
+@pytest.fixture(scope='module')
+def frame():
+    scenarios = {'Base': scenario_engine.normalize_inputs(), 'big crew': scenario_engine.normalize_inputs(crew_count=30)}
+    return scenario_compare.table_frame(*scenario_compare.project(scenarios))
+
+
+def test_project_validates_the_selection():
+    with pytest.raises(ValueError):
+        scenario_compare.project({})
+    with pytest.raises(ValueError):
+        scenario_compare.project({str(i): {} for i in range(scenario_compare.MAX_SCENARIOS + 1)})
+
+
+def test_downsample_keeps_extremes_and_endpoints():
+    rng = np.random.default_rng(0)
+    x, y = np.arange(10_000) / 12, rng.normal(size=(3, 10_000)).cumsum(axis=1)
+    xs, ys = scenario_compare.downsample(x, y, max_points=300)
+    assert xs.shape == ys.shape and xs.shape[1] <= 300
+    np.testing.assert_array_equal(ys.max(axis=1), y.max(axis=1))
+    np.testing.assert_array_equal(ys.min(axis=1), y.min(axis=1))
+    assert (xs[:, 0] == x[0]).all() and (xs[:, -1] == x[-1]).all()
+    assert (np.diff(xs, axis=1) >= 0).all()
+
+
+def test_downsample_window():
+    x, y = np.arange(600) / 12, np.arange(600.0)[None, :]
+    xs, _ = scenario_compare.downsample(x, y, x_range=(10.05, 11.95))
+    assert xs[0, 0] < 10.05 <= xs[0, 1] and xs[0, -2] <= 11.95 < xs[0, -1]
+
+
+def test_short_series_are_sent_as_they_are():
+    x, y = np.arange(50.0), np.arange(100.0).reshape(2, 50)
+    xs, ys = scenario_compare.downsample(x, y, max_points=300)
+    np.testing.assert_array_equal(ys, y)
+
+
+def test_query_pages_and_sorts(frame):
+    records, page_count, n_rows = scenario_compare.query(frame, 0, 100, [{'column_id': 'cash_position', 'direction': 'desc'}])
+    assert n_rows == 1200 and page_count == 12 and len(records) == 100
+    cash = [r['cash_position'] for r in records]
+    assert cash == sorted(cash, reverse=True)
+    last, _, _ = scenario_compare.query(frame, 99, 100)  # past the end: clamped to the last page
+    assert len(last) == 100 and last[-1]['year'] == 50
+
+
+@pytest.mark.parametrize('query, rows', [
+    ('{year} >= 49', 48), ('{year} eq 1 && {month} < 4', 6), ('{scenario} contains "CREW"', 600),
+    ('{scenario} scontains "CREW"', 0), ('{scenario} icontains "CREW"', 600), ('{scenario} eq "base"', 0),
+    ('{scenario} ieq "base"', 600), ('{scenario} ine "base"', 600), ('{unknown} eq 1', 1200), ('{year} eq x', 1200),
+    ('{year} > "48"', 48), ("{month} eq '12' && {year} <= 2", 4), ('{year} > "soon"', 1200),
+])
+def test_filters(frame, query, rows):
+    assert scenario_compare.filter_mask(frame, query).sum() == rows
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+import scenario_engine
+
+
+@pytest.mark.parametrize('amort_years', [1, 3, 5, 7.5, 10])
+def test_amortization_stops_at_total_capex(amort_years):
+    result = scenario_engine.evaluate(years=10, amort_years=amort_years)
+    charged = result['net_no_amort'] - result['net_with_amort']
+    assert charged.sum() == pytest.approx(result['total_capex'][0])
+    assert (charged[0, int(np.ceil(amort_years)):] == 0).all()
+
+
+def test_manual_amortization_stops_at_total_capex():
+    result = scenario_engine.evaluate(years=10, manual_amort=True, manual_amort_M=2000.0)
+    charged = (result['net_no_amort'] - result['net_with_amort'])[0]
+    assert charged[:2].tolist() == [2e9, 2e9]
+    assert charged.sum() == pytest.approx(result['total_capex'][0])
+
+
+def test_no_amortization():
+    result = scenario_engine.evaluate(use_amort=False)
+    np.testing.assert_array_equal(result['net_with_amort'], result['revenues'] - result['opex'])
+
+
+def test_normalize_inputs_applies_sidebar_fallbacks():
+    assert scenario_engine.normalize_inputs() == scenario_engine.DEFAULT_INPUTS
+    inputs = scenario_engine.normalize_inputs(0, None, [1], 40, 0, [], [], 0, [1], 0)
+    assert inputs == {**scenario_engine.DEFAULT_INPUTS, 'include_spectators': True, 'spectator_count': 40, 'use_amort': False,
+                      'manual_amort': True}
+
+
+def test_normalize_fields_arrays():
+    fields = scenario_engine.normalize_fields(crew_count=np.array([0.0, np.nan, 20.0]), revenue_growth=np.array([0.0, np.nan, 0.2]),
+                                              use_amort=np.array([1, 0, 1]))
+    assert fields['crew_count'].tolist() == [15.0, 15.0, 20.0]
+    assert fields['revenue_growth'].tolist() == [0.0, 0.1, 0.2]  # constants keep 0, only blanks fall back
+    assert fields['use_amort'].tolist() == [True, False, True]
+
+
+@pytest.mark.parametrize('fields', [{'crew_count': -1}, {'amort_years': np.array([10, -1])}, {'ticket_price': np.inf},
+                                    {'sponsorship': np.array([np.inf])}])
+def test_normalize_fields_rejects_invalid_values(fields):
+    with pytest.raises(ValueError):
+        scenario_engine.normalize_fields(**fields)
+
+
+def test_normalize_fields_rejects_unknown_fields():
+    with pytest.raises(TypeError):
+        scenario_engine.normalize_fields(crew=1)
+
+
+def dashboard_reference(crew_count, contestant_count, include_spec, spectator_count, ticket_price, scale_cap, use_am):
+    """The original scalar update_dashboard() math, as (total_capex, year1_opex, annual_opex, revenues, net_no_amort)."""
+    e = scenario_engine
+    total_capex = e.capex_phase1 + (e.capex_phase2_additional if include_spec else 0)
+    if scale_cap:
+        extra = (max(crew_count - e.baseline_crew, 0) + max(contestant_count - e.baseline_contestants, 0)
+                 + max(spectator_count - e.baseline_spectators, 0))
+        total_capex += extra * e.capex_per_extra_person
+    spectators = spectator_count if include_spec else 0
+    recurring = (contestant_count * e.contestant_cost_per + spectators * e.spectator_transport_cost_per + crew_count * e.crew_salary_per
+                 + contestant_count * e.prize_pool_per_contestant + (crew_count + contestant_count + spectators) * e.cargo_per_person
+                 + e.docked_vehicle_cost)
+    year1_opex = recurring + crew_count * e.crew_cost_per
+    year1_revenue = spectators * ticket_price * 1e6 + e.sponsorship + e.broadcasting + e.vr_ar + e.merchandising
+    revenues = [year1_revenue * (1 + e.revenue_growth) ** (i - 1) for i in range(1, 11)]
+    net = [rev - (year1_opex if i == 0 else recurring) - (total_capex if i == 0 and not use_am else 0.0) for i, rev in enumerate(revenues)]
+    return total_capex, year1_opex, recurring, revenues, net
+
+
+def test_baseline_dashboard_numbers():
+    result = scenario_engine.evaluate(**scenario_engine.normalize_inputs())
+    assert result['total_capex'][0] == 5.7e9
+    assert f"${result['year1_opex'][0] / 1e9:.2f}B" == "$1.86B"
+    assert f"${result['annual_opex'][0] / 1e9:.2f}B" == "$0.89B"
+    assert f"${result['year1_revenue'][0] / 1e9:.2f}B" == "$1.45B"
+    assert result['annual_amortization'][0] == 570e6
+
+
+@pytest.mark.parametrize('inputs', [
+    (15, 12, False, 0, 60.0, False, True),
+    (15, 12, True, 200, 60.0, True, True),
+    (30, 20, True, 80, 75.5, True, False),
+    (5, 3, True, 10, 20.0, False, False),
+    (40, 12, False, 120, 60.0, True, True),
+])
+def test_evaluate_matches_the_original_dashboard(inputs):
+    crew, contestants, spectators_on, spectators, price, scale, amort = inputs
+    result = scenario_engine.evaluate(crew_count=crew, contestant_count=contestants, include_spectators=spectators_on,
+                                      spectator_count=spectators, ticket_price=price, scale_capex=scale, use_amort=amort)
+    total_capex, year1_opex, annual_opex, revenues, net = dashboard_reference(*inputs)
+    assert result['total_capex'][0] == pytest.approx(total_capex)
+    assert result['year1_opex'][0] == pytest.approx(year1_opex)
+    assert result['annual_opex'][0] == pytest.approx(annual_opex)
+    np.testing.assert_allclose(result['revenues'][0], revenues)
+    np.testing.assert_allclose(result['net_no_amort'][0], net)
+
+
+def test_evaluate_broadcasts_scenarios():
+    crew = np.array([5, 15, 40])
+    result = scenario_engine.evaluate(crew_count=crew, scale_capex=True)
+    assert result['revenues'].shape == (3, 10)
+    for i, n in enumerate(crew):
+        single = scenario_engine.evaluate(crew_count=int(n), scale_capex=True)
+        np.testing.assert_allclose(result['net_with_amort'][i], single['net_with_amort'][0])
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import scenario_engine
+import sensitivity
+
+INPUTS = scenario_engine.normalize_inputs(include_spectators=[1], spectator_count=40)
+
+
+def profit(**changes):
+    return sensitivity.cumulative_profit(scenario_engine.evaluate(**{**INPUTS, **changes}))[0]
+
+
+def test_tornado_matches_single_evaluations():
+    base, rows = sensitivity.tornado(INPUTS, 10)
+    assert base == pytest.approx(profit())
+    by_name = {name: (low, high) for name, low, high in rows}
+    assert by_name['ticket_price'] == pytest.approx((profit(ticket_price=54.0), profit(ticket_price=66.0)))
+    assert by_name['sponsorship'] == pytest.approx((profit(sponsorship=540e6), profit(sponsorship=660e6)))
+    swings = [abs(high - low) for _, low, high in rows]
+    assert swings == sorted(swings, reverse=True)
+
+
+def test_heatmap_matches_single_evaluations():
+    x, y, z = sensitivity.heatmap(INPUTS, 'crew_count', 'ticket_price', 20, steps=5)
+    assert z.shape == (5, 5)
+    assert x[0] == pytest.approx(12) and x[-1] == pytest.approx(18)
+    assert z[1, 3] == pytest.approx(profit(crew_count=x[3], ticket_price=y[1]))
+
+
+def test_zero_parameters_sweep_their_input_range():
+    values = sensitivity.sweep_range(scenario_engine.normalize_inputs(), 'spectator_count', steps=3)
+    np.testing.assert_allclose(values, [0, 100, 200])
+
+
+def test_heatmap_needs_two_parameters():
+    with pytest.raises(ValueError):
+        sensitivity.heatmap(INPUTS, 'crew_count', 'crew_count')
+
+
+def test_results_are_memoized_until_cleared():
+    sensitivity.cache_clear()
+    first = sensitivity.heatmap(INPUTS, 'crew_count', 'ticket_price', steps=4)
+    assert sensitivity.heatmap(INPUTS, 'crew_count', 'ticket_price', steps=4) is first
+    sensitivity.cache_clear()
+    assert sensitivity.heatmap(INPUTS, 'crew_count', 'ticket_price', steps=4) is not first
@@ -0,0 +1,63 @@
+import pytest
+from flask import Flask
+
+import static_assets
+
+PIL = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / 'chart.png'
+    PIL.new('RGB', (1000, 500), 'navy').save(path)
+    return path
+
+
+def test_build_variants(image, tmp_path):
+    cache = tmp_path / 'cache'
+    original, variants = static_assets.build_variants(image, cache, widths=(480, 800, 1200))
+    assert [width for _, width in variants] == [480, 800, 1000]  # wider than the source: one at the source width
+    assert (cache / original).read_bytes() == image.read_bytes()
+    for name, width in variants:
+        with PIL.open(cache / name) as variant:
+            assert variant.format == 'WEBP' and variant.size == (width, width // 2)
+    assert not list(cache.glob('*.tmp'))
+
+
+def test_build_variants_keeps_existing_files(image, tmp_path):
+    cache = tmp_path / 'cache'
+    _, variants = static_assets.build_variants(image, cache, widths=(480,))
+    target = cache / variants[0][0]
+    mtime = target.stat().st_mtime_ns
+    static_assets.build_variants(image, cache, widths=(480,))
+    assert target.stat().st_mtime_ns == mtime
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path):
+    target = tmp_path / 'out.webp'
+
+    def fail(f):
+        f.write(b'partial')
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        static_assets._write_atomic(target, fail)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_missing_image(tmp_path):
+    assert static_assets.build_variants(tmp_path / 'missing.png', tmp_path / 'cache') is None
+    assert static_assets.image_sources(tmp_path / 'missing.png', Flask(__name__), tmp_path / 'cache') is None
+
+
+def test_image_route_caching(image, tmp_path):
+    server = Flask(__name__)
+    sources = static_assets.image_sources(image, server, tmp_path / 'cache')
+    assert (sources['width'], sources['height']) == (1000, 500)
+    client = server.test_client()
+    response = client.get(sources['src'])
+    assert response.status_code == 200 and 'immutable' in response.headers['Cache-Control']
+    assert client.get(sources['src'], headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    url, width = sources['srcset'].split(', ')[0].split()
+    assert client.get(url).status_code == 200 and width == '480w'
+    assert client.get(f'{static_assets.IMAGE_ROUTE}/missing.webp').status_code == 404
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import scenario_engine
+import timeseries
+
+
+@pytest.mark.parametrize('periods_per_year', [1, 4, 12])
+def test_annual_totals_match_engine(periods_per_year):
+    projected = timeseries.project(10, periods_per_year, crew_count=np.array([10, 15, 30]), include_spectators=True, spectator_count=80)
+    evaluated = scenario_engine.evaluate(10, crew_count=np.array([10, 15, 30]), include_spectators=True, spectator_count=80)
+    for key in ('revenues', 'opex', 'net_no_amort', 'net_with_amort'):
+        np.testing.assert_allclose(timeseries.to_annual(projected[key], periods_per_year), evaluated[key])
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'amort_years': 5}, {'amort_years': 12.5}, {'manual_amort': True, 'manual_amort_M': 1000.0}])
+def test_total_amortization_equals_total_capex(kwargs):
+    result = timeseries.project(50, 12, **kwargs)
+    charged = result['net_no_amort'] - result['net_with_amort']
+    assert charged.sum() == pytest.approx(result['total_capex'][0])
+    assert (charged >= 0).all()
+
+
+def test_cash_position_starts_below_capex():
+    result = timeseries.project(1, 12)
+    operating = result['revenues'] - result['opex']
+    assert result['cash_position'][0, 0] == pytest.approx(operating[0, 0] - result['total_capex'][0])
+    assert result['cash_position'][0, -1] == pytest.approx(operating.sum() - result['total_capex'][0])
+
+
+def test_event_starts_validation():
+    assert timeseries.event_starts(12, 4).tolist() == [0, 3, 6, 9]
+    with pytest.raises(ValueError):
+        timeseries.event_starts(12, 13)
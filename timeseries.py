@@ -0,0 +1,80 @@
+"""Long-horizon, sub-annual projections built on the scenario engine.
+
+All periods of all scenarios are computed as contiguous (n_scenarios,
+n_periods) arrays, e.g. 50 years at monthly resolution is 600 periods per
+scenario. Event-driven flows (contestant/spectator transport, prize pool,
+their cargo and ticket sales) are booked at the start of each event; yearly
+flows (salaries, crew cargo, docked vehicle, sponsorship, broadcasting,
+VR/AR, merchandising) are spread evenly over the periods of the year.
+
+With the defaults for events_per_year, crew_rotation_years and compounding,
+summing the periods of each year reproduces scenario_engine.evaluate().
+"""
+import numpy as np
+
+import scenario_engine
+
+COMPOUNDING = ('annual', 'periodic')
+
+
+def event_starts(periods_per_year=12, events_per_year=1):
+    """Period offsets within a year at which events begin (evenly spaced)."""
+    if not 1 <= events_per_year <= periods_per_year:
+        raise ValueError("events_per_year must be between 1 and periods_per_year")
+    return np.unique((np.arange(events_per_year) * periods_per_year) // events_per_year)
+
+
+def project(horizon_years=50, periods_per_year=12, events_per_year=1, crew_rotation_years=None, compounding='annual', **kwargs):
+    """Project a batch of scenarios period by period.
+
+    Scenario keyword arguments are the same as scenario_engine.evaluate().
+    events_per_year is the number of contestant stays per year (e.g. 4 for one
+    3-month stay per quarter); each event flies the configured contestants and
+    spectators. crew_rotation_years re-flies the whole crew at that interval
+    (None: the crew is deployed once). compounding='annual' steps revenue
+    growth once a year, 'periodic' compounds it every period.
+
+    Returns a dict with 'time' (years since start, shape (T,)), the (n,)
+    arrays total_capex and annual_amortization, and (n, T) arrays revenues,
+    opex, net_no_amort, net_with_amort and cash_position. cash_position is the
+    running cash balance with CAPEX paid up front, whatever the amortization
+    setting. Amortization is spread evenly over the periods of each year and
+    stops once total_capex has been charged.
+    """
+    if compounding not in COMPOUNDING:
+        raise ValueError(f"compounding must be one of {COMPOUNDING}")
+    c = scenario_engine.components(**kwargs)
+    n_periods = horizon_years * periods_per_year
+    t = np.arange(n_periods)
+    events = np.isin(t % periods_per_year, event_starts(periods_per_year, events_per_year)).astype(float)
+    deployments = np.zeros(n_periods)
+    rotation = n_periods if crew_rotation_years is None else max(int(round(crew_rotation_years * periods_per_year)), 1)
+    deployments[::rotation] = 1.0
+
+    # Revenue
+    exponent = t // periods_per_year if compounding == 'annual' else t / periods_per_year
+    growth = (1 + c['revenue_growth'])[:, None] ** exponent
+    revenues = (c['base_revenue'][:, None] / periods_per_year + c['ticket_revenue'][:, None] * events) * growth
+
+    # OPEX
+    opex = (c['running_opex'][:, None] / periods_per_year + c['event_opex'][:, None] * events +
+            c['crew_deployment'][:, None] * deployments)
+
+    # Profit and cash
+    operating = revenues - opex
+    net_no_amort = operating.copy()
+    net_no_amort[:, 0] -= np.where(c['use_amort'], 0.0, c['total_capex'])
+    net_with_amort = operating - scenario_engine.amortization(c['total_capex'], c['annual_amortization'], n_periods, periods_per_year)
+    cash_position = np.cumsum(operating, axis=1) - c['total_capex'][:, None]
+
+    return {
+        'time': t / periods_per_year, 'total_capex': c['total_capex'], 'annual_amortization': c['annual_amortization'],
+        'revenues': revenues, 'opex': opex, 'net_no_amort': net_no_amort, 'net_with_amort': net_with_amort,
+        'cash_position': cash_position,
+    }
+
+
+def to_annual(series, periods_per_year=12):
+    """Sum an (n, T) flow array into (n, T // periods_per_year) yearly totals."""
+    n, n_periods = series.shape
+    return series[:, :n_periods - n_periods % periods_per_year].reshape(n, -1, periods_per_year).sum(axis=2)